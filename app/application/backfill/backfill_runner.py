@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Tuple
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.repositories.i_practice_repo import IPracticeRepo
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.shared.enums import ReportMode
+from app.shared.utils import RatePacer
+
+logger = logging.getLogger(__name__)
+
+# Generates the reports of a chunk and returns (practice_id, outcome, seconds) per practice
+ChunkRenderer = Callable[[List[PracticeDataDTO]], Awaitable[List[Tuple[int, str, float]]]]
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Progress of a backfill run: every practice up to last_id has been processed."""
+    selection: dict
+    last_id: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    failed_ids: List[int] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: str, selection: dict) -> "BackfillCheckpoint":
+        if not os.path.exists(path):
+            return cls(selection)
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("selection") != selection:
+            raise ValueError(f"Checkpoint {path} belongs to a different selection, use another path or --restart")
+        return cls(**data)
+
+    def save(self, path: str):
+        # Replaced atomically, so a crash leaves either the previous or the new checkpoint
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(temp_path, path)
+
+
+class BackfillRunner:
+    """
+    Regenerates the reports of the practices matching a filter, without Kafka.
+
+    Practices are read in ID order in batches; each batch is split into one chunk
+    per worker and the chunks are generated in parallel. After every batch the
+    last practice ID is checkpointed, so an interrupted run resumes after it.
+    Chunks are paced to rate_per_second reports on average, leaving the databases
+    and the storage volume to the live consumers.
+
+    MySQL does not store the scale of a practice, so it is taken from the report
+    metadata; practices without one are titled without it.
+    """
+
+    def __init__(
+        self,
+        practice_repo: IPracticeRepo,
+        metadata_service: MetadataPracticeService,
+        render_chunk: ChunkRenderer,
+        practice_filter: PracticeFilter,
+        checkpoint_path: str,
+        batch_size: int,
+        workers: int,
+        rate_per_second: float,
+        report_mode: ReportMode = ReportMode.FULL,
+        progress_interval_seconds: float = 10.0,
+    ):
+        self.practice_repo = practice_repo
+        self.metadata_service = metadata_service
+        self.render_chunk = render_chunk
+        self.practice_filter = practice_filter
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.pacer = RatePacer(rate_per_second)
+        self.report_mode = report_mode
+        self.progress_interval_seconds = progress_interval_seconds
+
+    async def run(self, restart: bool = False) -> BackfillCheckpoint:
+        selection = selection_key(self.practice_filter, self.report_mode)
+        checkpoint = BackfillCheckpoint(selection) if restart else BackfillCheckpoint.load(self.checkpoint_path, selection)
+        total = await self.practice_repo.count_by_filter(self.practice_filter)
+        already_done = sum(checkpoint.outcomes.values())
+        if checkpoint.last_id:
+            logger.info("Resuming backfill after practice %s (%s of %s done)", checkpoint.last_id, already_done, total)
+        else:
+            logger.info("Starting backfill of %s practices", total)
+
+        start = time.perf_counter()
+        last_report = start
+        done = 0
+        while True:
+            practices = await self.practice_repo.find_by_filter(
+                self.practice_filter, checkpoint.last_id, self.batch_size
+            )
+            if not practices:
+                break
+
+            for results in await asyncio.gather(*(
+                self._render(chunk) for chunk in _chunks(practices, self.workers)
+            )):
+                for practice_id, outcome, _ in results:
+                    checkpoint.outcomes[outcome] = checkpoint.outcomes.get(outcome, 0) + 1
+                    if outcome == "failed":
+                        checkpoint.failed_ids.append(practice_id)
+                done += len(results)
+
+            checkpoint.last_id = practices[-1].id
+            await asyncio.to_thread(checkpoint.save, self.checkpoint_path)
+
+            now = time.perf_counter()
+            if now - last_report >= self.progress_interval_seconds:
+                last_report = now
+                self._log_progress(checkpoint, total, done, now - start)
+
+        self._log_progress(checkpoint, total, done, time.perf_counter() - start)
+        return checkpoint
+
+    async def _render(self, practices: List[Practice]) -> List[Tuple[int, str, float]]:
+        await self.pacer.acquire(len(practices))
+        scales = await self.metadata_service.get_scales(
+            [(practice.id_student, practice.id) for practice in practices]
+        )
+        return await self.render_chunk([
+            PracticeDataDTO.from_practice(
+                practice, self.report_mode, scale=scales.get((practice.id_student, practice.id))
+            )
+            for practice in practices
+        ])
+
+    def _log_progress(self, checkpoint: BackfillCheckpoint, total: int, done: int, elapsed: float):
+        processed = sum(checkpoint.outcomes.values())
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(total - processed, 0)
+        eta = f"{remaining / rate / 60:.1f}m" if rate > 0 else "unknown"
+        logger.info(
+            "Backfill progress: %s/%s (%.1f%%), %.2f reports/s, ETA %s, outcomes %s",
+            processed, total, 100 * processed / total if total else 100.0, rate, eta, checkpoint.outcomes,
+        )
+
+
+def selection_key(practice_filter: PracticeFilter, report_mode: ReportMode) -> dict:
+    """JSON form of what a run selects, stored in its checkpoint."""
+    return {
+        "date_from": practice_filter.date_from.isoformat() if practice_filter.date_from else None,
+        "date_to": practice_filter.date_to.isoformat() if practice_filter.date_to else None,
+        "uid": practice_filter.uid,
+        "practice_ids": sorted(practice_filter.practice_ids),
+        "report_mode": report_mode.value,
+    }
+
+
+def _chunks(practices: List[Practice], count: int) -> List[List[Practice]]:
+    size = -(-len(practices) // max(count, 1))
+    return [practices[i:i + size] for i in range(0, len(practices), size)]
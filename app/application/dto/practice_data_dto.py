@@ -1,4 +1,7 @@
 from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+from app.domain.entities.practice import Practice
+from app.shared.enums import ReportFormat, ReportMode
 
 @dataclass
 class PracticeDataDTO:
@@ -13,4 +16,40 @@ class PracticeDataDTO:
     duration: int
     bpm: int
     figure: float
-    octaves: int
\ No newline at end of file
+    octaves: int
+    report_mode: ReportMode = ReportMode.FULL
+    # Identifies the delivery in the job journal (topic-partition-offset); None is not journaled
+    job_key: Optional[str] = None
+    # Output formats of this job; None uses the configured ones
+    output_formats: Optional[FrozenSet[ReportFormat]] = None
+
+    @classmethod
+    def from_practice(
+        cls,
+        practice: Practice,
+        report_mode: ReportMode = ReportMode.FULL,
+        output_formats: Optional[FrozenSet[ReportFormat]] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> "PracticeDataDTO":
+        """
+        Report request for a practice read from MySQL rather than received from Kafka.
+        MySQL does not store the scale: pass the (scale, scale type) known from the
+        metadata (MetadataPracticeService.get_scales), otherwise the request has none.
+        """
+        scale_name, scale_type = scale or (practice.scale, practice.scale_type)
+        return cls(
+            uid=practice.id_student,
+            practice_id=practice.id,
+            date=practice.date,
+            time=practice.time,
+            scale=scale_name,
+            scale_type=scale_type,
+            num_postural_errors=practice.num_postural_errors,
+            num_musical_errors=practice.num_musical_errors,
+            duration=practice.duration,
+            bpm=int(practice.bpm),
+            figure=float(practice.figure),
+            octaves=int(practice.octaves),
+            report_mode=report_mode,
+            output_formats=output_formats,
+        )
\ No newline at end of file
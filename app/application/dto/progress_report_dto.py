@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+from datetime import date
+
+@dataclass
+class ProgressReportDTO:
+    uid: str
+    date_from: date     # inclusive
+    date_to: date       # inclusive
\ No newline at end of file
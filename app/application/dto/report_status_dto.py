@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Optional
+from app.shared.enums import ReportState
+
+@dataclass
+class ReportStatusDTO:
+    uid: str
+    practice_id: int
+    state: ReportState
+    pdf_path: Optional[str] = None
+    size: Optional[int] = None
+    modified_at: Optional[float] = None
+    # 0 while rendering, n when n - 1 jobs start before it; None when not queued here
+    queue_position: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "uid": self.uid,
+            "practice_id": self.practice_id,
+            "state": self.state.value,
+            "size": self.size,
+            "modified_at": self.modified_at,
+            "queue_position": self.queue_position,
+        }
\ No newline at end of file
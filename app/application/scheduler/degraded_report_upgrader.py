@@ -0,0 +1,129 @@
+import asyncio
+import dataclasses
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.domain.services.cost_estimator_service import CostEstimatorService
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.practice_service import PracticeService
+from app.shared.enums import ReportMode
+
+logger = logging.getLogger(__name__)
+
+
+class DegradedReportUpgrader:
+    """
+    Low-priority pass that regenerates degraded reports at full detail.
+
+    Degraded practices are remembered in memory (latest request per practice)
+    and resubmitted one at a time as background jobs, only while the consumer
+    is caught up and no foreground job is waiting. At startup the queue is
+    rebuilt from the reports flagged ``report_degraded`` in the metadata, so
+    pending upgrades survive a restart; their practice is read from MySQL when
+    their turn comes.
+    """
+
+    def __init__(
+        self,
+        scheduler: ReportScheduler,
+        cost_estimator: CostEstimatorService,
+        run_report: Callable[[PracticeDataDTO], Awaitable[Any]],
+        is_lagging: Callable[[], Awaitable[bool]],
+        interval_seconds: float,
+        max_queued: int,
+        metadata_service: Optional[MetadataPracticeService] = None,
+        practice_service: Optional[PracticeService] = None,
+    ):
+        self.scheduler = scheduler
+        self.cost_estimator = cost_estimator
+        self.run_report = run_report
+        self.is_lagging = is_lagging
+        self.interval_seconds = interval_seconds
+        self.max_queued = max_queued
+        self.metadata_service = metadata_service
+        self.practice_service = practice_service
+        # practice_id -> (uid, request); restored entries have no request until loaded
+        self._queue: "OrderedDict[int, Tuple[str, Optional[PracticeDataDTO]]]" = OrderedDict()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, practice_data: PracticeDataDTO):
+        """Remember a degraded report so it is upgraded to full detail later."""
+        self._queue.pop(practice_data.practice_id, None)
+        # Upgrades are not journaled, their delivery is already committed
+        self._queue[practice_data.practice_id] = (
+            practice_data.uid,
+            dataclasses.replace(practice_data, report_mode=ReportMode.FULL, job_key=None),
+        )
+        self._trim()
+
+    async def restore(self) -> int:
+        """Queue the degraded reports stored in the metadata; returns how many were added."""
+        if self.metadata_service is None or self.practice_service is None:
+            return 0
+        restored = 0
+        for uid, practice_id in await self.metadata_service.find_degraded_reports(self.max_queued):
+            if practice_id not in self._queue:
+                self._queue[practice_id] = (uid, None)
+                restored += 1
+        self._trim()
+        if restored:
+            logger.info("Restored %s degraded reports to upgrade", restored)
+        return restored
+
+    def _trim(self):
+        while len(self._queue) > self.max_queued:
+            dropped_id, _ = self._queue.popitem(last=False)
+            logger.warning("Degraded upgrade queue full, practice %s will stay degraded", dropped_id)
+
+    async def _request(self, practice_id: int, uid: str) -> Optional[PracticeDataDTO]:
+        """
+        Full-detail request of a restored practice, None if it no longer exists or
+        its scale is unknown: the degraded report is titled with the scale of the
+        original request, and an upgrade without it would lose the title.
+        """
+        practice = await self.practice_service.get_practice(practice_id)
+        if practice is None or practice.id_student != uid:
+            logger.info("Degraded practice %s no longer exists, not upgrading it", practice_id)
+            return None
+        scale = await self.metadata_service.get_scale(uid, practice_id)
+        if scale is None:
+            logger.info("Scale of degraded practice %s is not stored, not upgrading it", practice_id)
+            return None
+        return PracticeDataDTO.from_practice(practice, scale=scale)
+
+    async def run(self):
+        try:
+            await self.restore()
+        except Exception as e:
+            logger.warning("Could not restore degraded reports to upgrade: %s", e)
+
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+
+            if not self._queue or self.scheduler.pending > 0 or await self.is_lagging():
+                continue
+
+            practice_id, (uid, practice_data) = self._queue.popitem(last=False)
+            try:
+                if practice_data is None:
+                    practice_data = await self._request(practice_id, uid)
+                    if practice_data is None:
+                        continue
+                cost = await self.cost_estimator.estimate(practice_data.uid, practice_data.practice_id)
+                await self.scheduler.submit(
+                    cost,
+                    lambda: self.run_report(practice_data),
+                    key=practice_data.practice_id,
+                    background=True,
+                )
+                logger.info("Upgraded degraded report for practice %s", practice_data.practice_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error upgrading report for practice %s: %s", practice_id, e, exc_info=True)
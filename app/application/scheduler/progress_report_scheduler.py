@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Awaitable, Callable
+
+from app.application.dto.progress_report_dto import ProgressReportDTO
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.application.use_cases.generate_progress_report_use_case import PROGRESS_REPORT_COST
+from app.domain.services.pdf_service import PDFService
+from app.domain.services.progress_report_service import ProgressReportService
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressReportScheduler:
+    """
+    Periodic pass that generates the progress report of every student who
+    practised in the last complete period.
+
+    Reports are submitted as background jobs, so they only run while no
+    practice report is waiting. Reports already stored for the period are
+    skipped: a restart, or another replica with the schedule enabled, does not
+    render them again once saved.
+    """
+
+    def __init__(
+        self,
+        scheduler: ReportScheduler,
+        progress_service: ProgressReportService,
+        pdf_service: PDFService,
+        run_report: Callable[[ProgressReportDTO], Awaitable[Any]],
+        period_days: int,
+        interval_seconds: float,
+    ):
+        self.scheduler = scheduler
+        self.progress_service = progress_service
+        self.pdf_service = pdf_service
+        self.run_report = run_report
+        self.period_days = period_days
+        self.interval_seconds = interval_seconds
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once(date.today())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error scheduling progress reports: %s", e, exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, today: date) -> int:
+        """Generate the missing progress reports of the last complete period; returns how many were rendered."""
+        date_from, date_to = ProgressReportService.last_period(today, self.period_days)
+        uids = await self.progress_service.students_with_practices(date_from, date_to)
+
+        jobs = []
+        for uid in uids:
+            if await self.pdf_service.stat_report(self.pdf_service.progress_pdf_path(uid, date_from, date_to)):
+                continue
+            request = ProgressReportDTO(uid, date_from, date_to)
+            jobs.append(self.scheduler.submit(
+                PROGRESS_REPORT_COST,
+                lambda request=request: self.run_report(request),
+                key=("progress", uid),
+                background=True,
+            ))
+        if not jobs:
+            return 0
+
+        logger.info("Generating %s progress reports from %s to %s", len(jobs), date_from, date_to)
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        if failed:
+            logger.warning("%s of %s progress reports from %s to %s failed", failed, len(jobs), date_from, date_to)
+        return len(jobs) - failed
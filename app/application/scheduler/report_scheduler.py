@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.domain.entities.job_cost import JobCost
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _PendingJob:
+    priority: float
+    seq: int
+    cost: JobCost = field(compare=False)
+    job: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    key: Any = field(default=None, compare=False)
+    background: bool = field(default=False, compare=False)
+    started: bool = field(default=False, compare=False)
+    task: Optional[asyncio.Task] = field(default=None, compare=False)
+
+
+class ReportScheduler:
+    """
+    Cost-aware admission for report jobs.
+
+    Pending jobs are started shortest-job-first, by estimated seconds. A job is
+    only admitted while the estimated memory in flight stays under the budget;
+    a job larger than the whole budget still runs, but alone. Jobs that waited
+    longer than ``max_wait_seconds`` are promoted ahead of cheaper ones so heavy
+    practices are never starved. Background jobs only run when no foreground
+    job is waiting. Cancelling the future returned by ``submit`` cancels the
+    job if it is running, or drops it from the queue if it is not.
+    """
+
+    def __init__(self, max_concurrency: int, memory_budget_bytes: int, max_wait_seconds: float):
+        self.max_concurrency = max_concurrency
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_wait_seconds = max_wait_seconds
+
+        self._heap: List[_PendingJob] = []
+        self._arrivals: Deque[_PendingJob] = deque()
+        self._seq = itertools.count()
+        # Pending and running jobs by key, for status lookups
+        self._by_key: Dict[Any, List[_PendingJob]] = {}
+        self._running = 0
+        self._memory_in_flight = 0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for entry in self._arrivals if not entry.started and not entry.future.cancelled())
+
+    @property
+    def memory_in_flight(self) -> int:
+        return self._memory_in_flight
+
+    def submit(
+        self,
+        cost: JobCost,
+        job: Callable[[], Awaitable[Any]],
+        key: Any = None,
+        background: bool = False,
+    ) -> asyncio.Future:
+        """Queue a job and return a future with its result."""
+        entry = _PendingJob(
+            priority=math.inf if background else cost.estimated_seconds,
+            seq=next(self._seq),
+            cost=cost,
+            job=job,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.monotonic(),
+            key=key,
+            background=background,
+        )
+        entry.future.add_done_callback(lambda _, entry=entry: self._on_done(entry))
+        heapq.heappush(self._heap, entry)
+        if key is not None:
+            self._by_key.setdefault(key, []).append(entry)
+        if not background:
+            self._arrivals.append(entry)
+        self._dispatch()
+        return entry.future
+
+    def position(self, key: Any) -> Optional[int]:
+        """
+        Queue position of the job with this key: 0 once running, n when n - 1
+        pending jobs start before it, None if no job has the key. Promotion of
+        jobs waiting past max_wait_seconds is not anticipated.
+        """
+        entries = self._by_key.get(key)
+        if not entries:
+            return None
+        if any(entry.started for entry in entries):
+            return 0
+        first = min(entries)
+        return 1 + sum(1 for entry in self._heap if not self._skippable(entry) and entry < first)
+
+    def job_for(self, key: Any) -> Optional[asyncio.Future]:
+        """Future of a pending or running foreground job with this key, to wait for it instead of submitting again."""
+        for entry in self._by_key.get(key, ()):
+            if not entry.background and not entry.future.done():
+                return entry.future
+        return None
+
+    def _on_done(self, entry: _PendingJob):
+        if not entry.future.cancelled():
+            return
+        if entry.task is not None:
+            entry.task.cancel()
+        elif entry.key is not None:
+            # Still queued: it is skipped when it reaches the front
+            self._forget(entry)
+
+    @staticmethod
+    def _skippable(entry: _PendingJob) -> bool:
+        # Started through the other index, or cancelled while queued
+        return entry.started or entry.future.cancelled()
+
+    def _next_candidate(self) -> Optional[_PendingJob]:
+        while self._arrivals and self._skippable(self._arrivals[0]):
+            self._arrivals.popleft()
+        while self._heap and self._skippable(self._heap[0]):
+            heapq.heappop(self._heap)
+
+        if not self._heap:
+            return None
+
+        if self._arrivals:
+            oldest = self._arrivals[0]
+            if time.monotonic() - oldest.enqueued_at >= self.max_wait_seconds:
+                return oldest
+        return self._heap[0]
+
+    def _fits(self, entry: _PendingJob) -> bool:
+        if self._running == 0:
+            return True
+        return self._memory_in_flight + entry.cost.estimated_memory_bytes <= self.memory_budget_bytes
+
+    def _dispatch(self):
+        while self._running < self.max_concurrency:
+            entry = self._next_candidate()
+            if entry is None or not self._fits(entry):
+                return
+
+            entry.started = True
+            self._running += 1
+            self._memory_in_flight += entry.cost.estimated_memory_bytes
+            logger.debug(
+                "Admitting job %s (%.2f s, %.1f MB), in flight: %s jobs, %.1f MB",
+                entry.key,
+                entry.cost.estimated_seconds,
+                entry.cost.estimated_memory_bytes / (1024 * 1024),
+                self._running,
+                self._memory_in_flight / (1024 * 1024),
+            )
+            entry.task = asyncio.create_task(self._run(entry))
+
+    async def _run(self, entry: _PendingJob):
+        try:
+            result = await entry.job()
+            if not entry.future.done():
+                entry.future.set_result(result)
+        except BaseException as e:
+            if not entry.future.done():
+                entry.future.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            if entry.key is not None:
+                self._forget(entry)
+            self._running -= 1
+            self._memory_in_flight -= entry.cost.estimated_memory_bytes
+            self._dispatch()
+
+    def _forget(self, entry: _PendingJob):
+        entries = self._by_key.get(entry.key, [])
+        if entry in entries:
+            entries.remove(entry)
+        if not entries:
+            self._by_key.pop(entry.key, None)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, FrozenSet
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.dto.report_status_dto import ReportStatusDTO
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.core import metrics
+from app.core.exceptions import PracticeLeasedException, PracticeNotReadyException, ReportsServiceException
+from app.domain.services.cost_estimator_service import CostEstimatorService
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.pdf_service import PDF_ONLY, PDFService
+from app.domain.services.practice_service import PracticeService
+from app.shared.constants import COST_FALLBACK_POSTURAL_ERRORS
+from app.shared.enums import ReportFormat, ReportMode, ReportState
+from app.shared.single_flight import SingleFlight
+from app.shared.utils import StageDeadlines, with_deadline
+
+logger = logging.getLogger(__name__)
+
+ON_DEMAND_TOTAL = metrics.counter(
+    "report_on_demand_total", "On-demand report requests by how they were answered", ["result"]
+)
+
+
+class FetchReportUseCase:
+    """
+    On-demand access to practice reports.
+
+    A report stored at full detail is served as is. One that is missing or stale
+    (degraded, its PDF deferred or its file gone) is generated through the scheduler, joining
+    the job already queued for the practice when there is one. Concurrent
+    requests for the same practice share a single generation, and a request
+    that stops waiting leaves it running for the others.
+    """
+
+    def __init__(
+        self,
+        metadata_service: MetadataPracticeService,
+        practice_service: PracticeService,
+        pdf_service: PDFService,
+        scheduler: ReportScheduler,
+        cost_estimator: CostEstimatorService,
+        run_report: Callable[[PracticeDataDTO], Awaitable[Any]],
+        deadlines: StageDeadlines = StageDeadlines(),
+        output_formats: FrozenSet[ReportFormat] = PDF_ONLY,
+    ):
+        self.metadata_service = metadata_service
+        self.practice_service = practice_service
+        self.pdf_service = pdf_service
+        self.scheduler = scheduler
+        self.cost_estimator = cost_estimator
+        self.run_report = run_report
+        self.deadlines = deadlines
+        # A requested PDF is rendered along with the configured formats, deferred or not
+        self.output_formats = output_formats | PDF_ONLY
+        self._generations: SingleFlight[int, str] = SingleFlight()
+
+    async def status(self, uid: str, practice_id: int) -> ReportStatusDTO:
+        """Where the report of the practice stands, without triggering anything."""
+        report = await with_deadline(
+            self.metadata_service.get_report(uid, practice_id), self.deadlines.db, "db_fetch"
+        )
+        if report is None:
+            return ReportStatusDTO(uid, practice_id, ReportState.MISSING)
+
+        pdf_path, degraded = report
+        position = self.scheduler.position(practice_id)
+        generating = practice_id in self._generations or position is not None
+        if generating and position is None:
+            # Still estimating the cost, about to be queued
+            position = self.scheduler.pending + 1
+
+        if pdf_path == "None":
+            return ReportStatusDTO(uid, practice_id, ReportState.NO_ERRORS)
+        if pdf_path:
+            stat = await self.pdf_service.stat_report(pdf_path)
+            if stat is not None and not degraded:
+                size, modified_at = stat
+                return ReportStatusDTO(uid, practice_id, ReportState.READY, pdf_path, size, modified_at)
+            state = ReportState.STALE
+        elif await self.metadata_service.is_video_and_audio_done(uid, practice_id):
+            state = ReportState.PENDING
+        else:
+            return ReportStatusDTO(uid, practice_id, ReportState.NOT_READY)
+
+        if generating:
+            return ReportStatusDTO(uid, practice_id, ReportState.GENERATING, queue_position=position)
+        return ReportStatusDTO(uid, practice_id, state)
+
+    async def fetch(self, uid: str, practice_id: int, wait_seconds: float) -> ReportStatusDTO:
+        """
+        Status of the report, generating it first if it is missing or stale.
+        Waits up to wait_seconds for the generation; past that the status says
+        it is still generating and a later request picks up the result.
+        """
+        status = await self.status(uid, practice_id)
+        if status.state not in (ReportState.PENDING, ReportState.STALE, ReportState.GENERATING):
+            ON_DEMAND_TOTAL.inc(result=status.state.value)
+            return status
+
+        generation = self._generations.run(practice_id, lambda: self._generate(uid, practice_id))
+        done, _ = await asyncio.wait({generation}, timeout=wait_seconds)
+        if not done:
+            ON_DEMAND_TOTAL.inc(result="timeout")
+            return await self.status(uid, practice_id)
+
+        if not generation.cancelled():
+            error = generation.exception()
+            if isinstance(error, PracticeLeasedException):
+                # Another replica is generating it; its result shows up in the metadata
+                ON_DEMAND_TOTAL.inc(result="leased")
+                return ReportStatusDTO(uid, practice_id, ReportState.GENERATING)
+            if error is not None and not isinstance(error, PracticeNotReadyException):
+                ON_DEMAND_TOTAL.inc(result="failed")
+                raise error
+
+        status = await self.status(uid, practice_id)
+        ON_DEMAND_TOTAL.inc(result=f"generated_{status.state.value}")
+        return status
+
+    def read(self, status: ReportStatusDTO, start: int, end: int) -> AsyncIterator[bytes]:
+        """Stream the bytes [start, end) of a ready report."""
+        return self.pdf_service.read_report(status.pdf_path, start, end)
+
+    async def _generate(self, uid: str, practice_id: int) -> str:
+        # A job already queued for the practice (by the consumer or the upgrader) is joined instead
+        queued = self.scheduler.job_for(practice_id)
+        if queued is not None:
+            logger.info("Report of practice %s already queued, waiting for it", practice_id)
+            # Shielded: a shutdown cancelling this generation must not cancel the consumer's job
+            return await asyncio.shield(queued)
+
+        practice = await with_deadline(
+            self.practice_service.get_practice(practice_id), self.deadlines.db, "db_fetch"
+        )
+        if practice is None or practice.id_student != uid:
+            raise ReportsServiceException(f"Practice {practice_id} not found", "404")
+
+        try:
+            cost = await with_deadline(self.cost_estimator.estimate(uid, practice_id), self.deadlines.db, "estimate")
+        except Exception as e:
+            logger.warning("Could not estimate cost for practice %s, using fallback: %s", practice_id, e)
+            cost = CostEstimatorService.compute(COST_FALLBACK_POSTURAL_ERRORS, 0, None)
+
+        # MySQL does not store the scale; without one in the metadata the title leaves it out
+        scale = await with_deadline(
+            self.metadata_service.get_scale(uid, practice_id), self.deadlines.db, "db_fetch"
+        )
+        practice_data = PracticeDataDTO.from_practice(practice, ReportMode.FULL, self.output_formats, scale)
+        logger.info("Generating report of practice %s on demand", practice_id)
+        return await self.scheduler.submit(cost, lambda: self.run_report(practice_data), key=practice_id)
@@ -1,15 +1,34 @@
 import logging
+from contextlib import nullcontext
+from typing import FrozenSet, Optional
 from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.core import metrics
+from app.core.exceptions import PracticeLeasedException, PracticeNotReadyException
+from app.core.logging import bind_log_context
+from app.core.profiling import JobProfiler, job_profiler
+from app.domain.entities.job_record import JobRecord
 from app.domain.entities.practice import Practice
+from app.domain.entities.practice_lease import PracticeLease
+from app.domain.services.job_journal_service import JobJournalService
 from app.domain.services.metadata_service import MetadataPracticeService
 from app.domain.services.musical_error_service import MusicalErrorService
-from app.domain.services.pdf_service import PDFService
+from app.domain.services.pdf_service import PDF_ONLY, PDFService
 from app.domain.services.postural_error_service import PosturalErrorService
+from app.domain.services.practice_lease_service import PracticeLeaseService
 from app.domain.services.practice_service import PracticeService
+from app.domain.services.student_service import StudentService
 from app.domain.services.video_service import VideoService
+from app.shared.enums import JobStage, ReportFormat
+from app.shared.utils import StageDeadlines, with_deadline
 
 logger = logging.getLogger(__name__)
 
+REPORTS_TOTAL = metrics.counter(
+    "reports_total", "Report generations by outcome (rendered, skipped_no_errors, not_ready, leased, failed)", ["outcome"]
+)
+REPORTS_IN_PROGRESS = metrics.gauge("reports_in_progress", "Report generations currently executing")
+
+
 class GeneratePDFUseCase:
     def __init__(
         self,
@@ -17,39 +36,117 @@ class GeneratePDFUseCase:
         postural_error_service: PosturalErrorService,
         musical_error_service: MusicalErrorService,
         practice_service: PracticeService,
-        pdf_service: PDFService
+        student_service: StudentService,
+        pdf_service: PDFService,
+        deadlines: StageDeadlines = StageDeadlines(),
+        profiler: JobProfiler = job_profiler,
+        journal_service: Optional[JobJournalService] = None,
+        lease_service: Optional[PracticeLeaseService] = None,
+        output_formats: FrozenSet[ReportFormat] = PDF_ONLY
     ):
         self.metadata_service = metadata_service
         self.postural_error_service = postural_error_service
         self.musical_error_service = musical_error_service
         self.practice_service = practice_service
+        self.student_service = student_service
         self.pdf_service = pdf_service
+        self.deadlines = deadlines
+        self.profiler = profiler
+        self.journal_service = journal_service
+        self.lease_service = lease_service
+        self.output_formats = output_formats
         
 
     async def execute(self, practice_data: PracticeDataDTO) -> str:
-        # Check if audio and video analysis are done
-        processing_done = await self.metadata_service.is_video_and_audio_done(practice_data.uid, practice_data.practice_id)
-        logger.info(f"Audio and video processing done: {processing_done}")
+        outcome = "failed"
+        try:
+            async with self.profiler.profile(
+                practice_data.uid, practice_data.practice_id, report_mode=practice_data.report_mode.value
+            ):
+                # Bound here as well for jobs not started by the consumer, like degraded report upgrades
+                with bind_log_context(practice_id=practice_data.practice_id, uid=practice_data.uid), \
+                        REPORTS_IN_PROGRESS.track_inprogress(), metrics.STAGE_SECONDS.time(stage="execute"):
+                    async with self._lease(practice_data.practice_id) as lease:
+                        pdf_path = await self._execute(practice_data, lease)
+            outcome = "skipped_no_errors" if pdf_path == "None" else "rendered"
+            return pdf_path
+        except PracticeNotReadyException:
+            outcome = "not_ready"
+            raise
+        except PracticeLeasedException:
+            outcome = "leased"
+            raise
+        finally:
+            REPORTS_TOTAL.inc(outcome=outcome)
+
+    async def _execute(self, practice_data: PracticeDataDTO, lease: Optional[PracticeLease] = None) -> str:
+        # A redelivered job resumes after the last stage it completed before a restart
+        progress = await self._get_progress(practice_data)
+        if progress and progress.stage is JobStage.COMPLETED:
+            logger.info("Report for practice %s was completed before a restart", practice_data.practice_id)
+            return progress.data["pdf_path"]
+        if progress:
+            logger.info("Resuming practice %s after stage %s", practice_data.practice_id, progress.stage.name)
+
+        # Check if audio and video analysis are done (already checked when resuming)
+        processing_done = progress is not None or await with_deadline(
+            self.metadata_service.is_video_and_audio_done(practice_data.uid, practice_data.practice_id),
+            self.deadlines.readiness,
+            "readiness",
+        )
+        logger.info("Audio and video processing done: %s", processing_done)
 
         if processing_done:
             # 1. Get errors
-            logger.info(f"Fetching errors for practice ID: {practice_data.practice_id}")
-            postural_errors = await self.postural_error_service.get_errors_by_practice(practice_data.practice_id)
-            logger.info(f"Found postural errors: {postural_errors}")
+            logger.info("Fetching errors for practice ID: %s", practice_data.practice_id)
+            postural_errors = await with_deadline(
+                self.postural_error_service.get_errors_by_practice(practice_data.practice_id),
+                self.deadlines.db,
+                "db_fetch",
+            )
+            logger.info("Found %s postural errors", len(postural_errors))
+            logger.debug("Postural errors: %s", postural_errors)
             
-            logger.info(f"Fetching musical errors for practice ID: {practice_data.practice_id}")
-            musical_errors = await self.musical_error_service.get_errors_by_practice(practice_data.practice_id)
-            logger.info(f"Found musical errors: {musical_errors}")
+            logger.info("Fetching musical errors for practice ID: %s", practice_data.practice_id)
+            musical_errors = await with_deadline(
+                self.musical_error_service.get_errors_by_practice(practice_data.practice_id),
+                self.deadlines.db,
+                "db_fetch",
+            )
+            logger.info("Found %s musical errors", len(musical_errors))
+            logger.debug("Musical errors: %s", musical_errors)
             
-            # 2. Update Practice Data (number of errors)
-            logger.info(f"Updating practice data for practice ID: {practice_data.practice_id}")
-            practice_with_postural_updated = await self.practice_service.update_num_postural_errors(practice_data.practice_id, len(postural_errors))
-            practice_with_musical_updated= await self.practice_service.update_num_musical_errors(practice_data.practice_id, len(musical_errors))
-            logger.info("PRACTICE OF STUDENT: " + practice_with_postural_updated.student_name)
-            logger.info(f"Updated practice data with {practice_with_postural_updated.num_postural_errors} postural errors.")
-            logger.info(f"Updated practice data with {practice_with_musical_updated.num_musical_errors} musical errors.")
+            # 2. Update Practice Data (number of errors), already stored when resuming
+            if progress:
+                practice_with_postural_updated = practice_with_musical_updated = await with_deadline(
+                    self.practice_service.get_practice(practice_data.practice_id),
+                    self.deadlines.db,
+                    "db_fetch",
+                )
+            else:
+                logger.info("Updating practice data for practice ID: %s", practice_data.practice_id)
+                practice_with_postural_updated = await with_deadline(
+                    self.practice_service.update_num_postural_errors(practice_data.practice_id, len(postural_errors)),
+                    self.deadlines.db,
+                    "db_update",
+                )
+                practice_with_musical_updated = await with_deadline(
+                    self.practice_service.update_num_musical_errors(practice_data.practice_id, len(musical_errors)),
+                    self.deadlines.db,
+                    "db_update",
+                )
+                await self._checkpoint(practice_data, JobStage.COUNTED)
+            student_name = await with_deadline(
+                self.student_service.get_student_name(practice_with_postural_updated.id_student),
+                self.deadlines.db,
+                "db_fetch",
+            )
+            logger.info("PRACTICE OF STUDENT: %s", student_name)
+            logger.info("Updated practice data with %s postural errors.", practice_with_postural_updated.num_postural_errors)
+            logger.info("Updated practice data with %s musical errors.", practice_with_musical_updated.num_musical_errors)
             
             pdf_path: str = "None"
+            degraded = False
             
             # 3. Generate PDF
             if len(postural_errors) > 0 or len(musical_errors) > 0:
@@ -62,7 +159,7 @@ class GeneratePDFUseCase:
                 num_musical_errors=practice_with_musical_updated.num_musical_errors,
                 duration=practice_with_postural_updated.duration,
                 id_student=practice_with_postural_updated.id_student,
-                student_name=practice_with_postural_updated.student_name,
+                student_name=student_name or "",
                 scale=practice_data.scale,
                 scale_type=practice_data.scale_type,
                 bpm=practice_data.bpm,
@@ -70,18 +167,79 @@ class GeneratePDFUseCase:
                 octaves=practice_data.octaves
                 )
             
-                logger.info(f"Generating PDF for practice {practice_data.practice_id}")
-                pdf_path = await self.pdf_service.generate_pdf(practice, postural_errors, musical_errors)
-                logger.info(f"PDF generated at path: {pdf_path}")
+                if progress and progress.stage is JobStage.PDF_SAVED:
+                    pdf_path = progress.data["pdf_path"]
+                    logger.info("PDF already generated at path: %s", pdf_path)
+                else:
+                    screenshots = progress.data.get("screenshots") if progress and progress.stage is JobStage.SCREENSHOTS else None
+
+                    async def on_screenshots(extracted: dict):
+                        await self._checkpoint(practice_data, JobStage.SCREENSHOTS, screenshots=extracted)
+
+                    formats = practice_data.output_formats or self.output_formats
+                    logger.info("Generating PDF for practice %s", practice_data.practice_id)
+                    pdf_path = await self.pdf_service.generate_pdf(
+                        practice, postural_errors, musical_errors, practice_data.report_mode,
+                        screenshots=screenshots, on_screenshots=on_screenshots,
+                        before_save=lambda: self._ensure_lease(lease),
+                        formats=formats
+                    )
+                    logger.info("PDF generated at path: %s", pdf_path)
+                    await self._checkpoint(
+                        practice_data, JobStage.PDF_SAVED,
+                        pdf_path=pdf_path, pdf_deferred=ReportFormat.PDF not in formats
+                    )
+                degraded = practice_data.report_mode.degraded
                 
                 
-            logger.info(f"Saving PDF path to metadata for practice {practice_data.practice_id}")
-            await self.metadata_service.save_pdf_path(practice_data.uid, practice_data.practice_id, pdf_path)
-            logger.info(f"PDF path saved successfully for practice {practice_data.practice_id}")
+            # Stored only if the analyses are still done, so a re-analysis started
+            # meanwhile is not shadowed by this report, and only while no worker that
+            # took the lease over has stored a newer one (the token is in the update filter)
+            logger.info("Saving PDF path to metadata for practice %s", practice_data.practice_id)
+            await self._ensure_lease(lease)
+            saved = await with_deadline(
+                self.metadata_service.save_pdf_path_if_ready(
+                    practice_data.uid, practice_data.practice_id, pdf_path, degraded=degraded,
+                    fencing_token=lease.token if lease else None,
+                    # Stored so a regeneration from MySQL (upgrade, backfill, API) keeps the title
+                    scale=(practice_data.scale, practice_data.scale_type) if practice_data.scale else None,
+                ),
+                self.deadlines.save,
+                "save_metadata",
+            )
+            if saved:
+                # With write-behind, buffered: the conditions are checked when it is flushed
+                logger.info("PDF path saved successfully for practice %s", practice_data.practice_id)
+            else:
+                logger.warning(
+                    "Processing of practice %s changed during generation, report path not saved", practice_data.practice_id
+                )
+            await self._checkpoint(practice_data, JobStage.COMPLETED, pdf_path=pdf_path)
 
             return pdf_path
             
         else:
-            error_msg = f"Audio and video processing not completed for practice ID: {practice_data.practice_id}"
-            logger.error(error_msg)
-            raise Exception(error_msg)
\ No newline at end of file
+            error = PracticeNotReadyException(practice_data.practice_id)
+            logger.error(error.message)
+            raise error
+
+    def _lease(self, practice_id: int):
+        """Holds the practice lease while the report is generated (no lease without a lease service)."""
+        if self.lease_service is None:
+            return nullcontext()
+        return self.lease_service.hold(practice_id)
+
+    async def _ensure_lease(self, lease: Optional[PracticeLease]):
+        if lease is not None:
+            await self.lease_service.ensure_held(lease)
+
+    async def _get_progress(self, practice_data: PracticeDataDTO) -> Optional[JobRecord]:
+        if self.journal_service is None:
+            return None
+        return await self.journal_service.get_progress(practice_data.job_key)
+
+    async def _checkpoint(self, practice_data: PracticeDataDTO, stage: JobStage, **data):
+        if self.journal_service is not None:
+            await self.journal_service.checkpoint(
+                practice_data.job_key, practice_data.uid, practice_data.practice_id, stage, **data
+            )
\ No newline at end of file
@@ -0,0 +1,58 @@
+import logging
+from app.application.dto.progress_report_dto import ProgressReportDTO
+from app.core import metrics
+from app.core.logging import bind_log_context
+from app.domain.entities.job_cost import JobCost
+from app.domain.services.pdf_service import PDFService
+from app.domain.services.progress_report_service import ProgressReportService
+from app.domain.services.student_service import StudentService
+from app.shared import constants
+from app.shared.utils import StageDeadlines, with_deadline
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_REPORTS_TOTAL = metrics.counter(
+    "progress_reports_total", "Progress report generations by outcome (rendered, failed)", ["outcome"]
+)
+
+# A few aggregate queries and a PDF of tables, without screenshots
+PROGRESS_REPORT_COST = JobCost(
+    num_postural_errors=0,
+    num_musical_errors=0,
+    estimated_memory_bytes=constants.COST_BASE_MEMORY_BYTES,
+    estimated_seconds=constants.COST_BASE_SECONDS,
+)
+
+
+class GenerateProgressReportUseCase:
+    def __init__(
+        self,
+        progress_service: ProgressReportService,
+        student_service: StudentService,
+        pdf_service: PDFService,
+        deadlines: StageDeadlines = StageDeadlines()
+    ):
+        self.progress_service = progress_service
+        self.student_service = student_service
+        self.pdf_service = pdf_service
+        self.deadlines = deadlines
+
+    async def execute(self, request: ProgressReportDTO) -> str:
+        """Generate the progress report of a student over the requested dates and return its path."""
+        outcome = "failed"
+        try:
+            with bind_log_context(uid=request.uid), metrics.STAGE_SECONDS.time(stage="execute_progress"):
+                logger.info("Generating progress report for uid=%s from %s to %s", request.uid, request.date_from, request.date_to)
+                student_name = await with_deadline(
+                    self.student_service.get_student_name(request.uid), self.deadlines.db, "db_fetch"
+                )
+                report = await with_deadline(
+                    self.progress_service.build_report(request.uid, student_name, request.date_from, request.date_to),
+                    self.deadlines.db,
+                    "db_aggregate",
+                )
+                pdf_path = await self.pdf_service.generate_progress_pdf(report)
+            outcome = "rendered"
+            return pdf_path
+        finally:
+            PROGRESS_REPORTS_TOTAL.inc(outcome=outcome)
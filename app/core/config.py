@@ -1,6 +1,7 @@
+import os
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -18,6 +19,11 @@ class Settings(BaseSettings):
     KAFKA_INPUT_TOPIC: str
     KAFKA_AUTO_OFFSET_RESET: str = "earliest"
     KAFKA_GROUP_ID: str
+    KAFKA_STUDENT_INVALIDATION_TOPIC: Optional[str] = None
+    KAFKA_PROGRESS_REPORT_TOPIC: Optional[str] = None    # progress report requests, consumed by one replica
+    KAFKA_PARTITION_ASSIGNMENT_STRATEGY: str = "sticky"   # sticky, roundrobin or range
+    KAFKA_REBALANCE_DRAIN_TIMEOUT_SECONDS: float = 20.0  # wait for in-flight jobs of revoked partitions
+    KAFKA_REBALANCE_TIMEOUT_SECONDS: float = 60.0        # time members get to rejoin; drain plus commit must fit
 
     # MySQL
     MYSQL_HOST: str
@@ -25,6 +31,12 @@ class Settings(BaseSettings):
     MYSQL_USER: str
     MYSQL_PASSWORD: str
     MYSQL_DB: str
+    MYSQL_POOL_SIZE: int = 10
+    MYSQL_MAX_OVERFLOW: int = 5
+    MYSQL_POOL_TIMEOUT: float = 30.0
+    MYSQL_POOL_RECYCLE: int = 3600
+    MYSQL_POOL_PRE_PING: bool = True
+    MYSQL_POOL_MIN_SIZE: int = 3   # connections opened at startup
 
     @property
     def ASYNC_MYSQL_URL(self) -> str:
@@ -40,12 +52,21 @@ class Settings(BaseSettings):
             f"@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
         )
 
+    # Create missing indexes at startup instead of only warning about them
+    DB_AUTO_MIGRATE: bool = False
+
     # MongoDB
     MONGO_HOST: str
     MONGO_PORT: int
     MONGO_USER: str
     MONGO_PASSWORD: str
     MONGO_DB: str
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 3
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 30000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000
 
     @property
     def MONGO_URI(self) -> str:
@@ -57,10 +78,116 @@ class Settings(BaseSettings):
     # Storage
     HOST_PATH: str
     CONTAINER_PATH: str
+    STORAGE_BACKEND: str = "local"             # local (CONTAINER_PATH volume) or s3, for videos and PDFs
+
+    # S3-compatible object storage (STORAGE_BACKEND=s3)
+    S3_ENDPOINT_URL: str = ""                  # e.g. http://minio:9000; AWS S3 of S3_REGION when empty
+    S3_BUCKET: str = ""
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_PREFIX: str = ""                        # key prefix, e.g. "reports-service/"
+    S3_MAX_CONNECTIONS: int = 10               # per process, kept alive and reused
+    S3_MULTIPART_PART_SIZE_MB: int = 8         # larger reports are uploaded in parts (5 MB minimum)
+    S3_UPLOAD_CONCURRENCY: int = 4             # parts of one report sent at once
+    S3_PRESIGNED_URL_EXPIRES_SECONDS: int = 900  # video URLs handed to OpenCV, must outlast extraction
+
+    # Scheduler
+    SCHEDULER_MAX_CONCURRENCY: int = 3
+    SCHEDULER_MEMORY_BUDGET_MB: int = 1024
+    SCHEDULER_MAX_WAIT_SECONDS: float = 120.0
+    SCHEDULER_MAX_QUEUED: int = 50
+
+    # Degraded reports under consumer lag (0 disables a threshold)
+    DEGRADE_TEXT_ONLY_LAG_SECONDS: float = 600.0
+    DEGRADE_SUMMARY_LAG_SECONDS: float = 1800.0
+    DEGRADE_TEXT_ONLY_LAG_MESSAGES: int = 500
+    DEGRADE_SUMMARY_LAG_MESSAGES: int = 2000
+    DEGRADE_UPGRADE_INTERVAL_SECONDS: float = 5.0
+    DEGRADE_IDLE_RESET_SECONDS: float = 60.0     # lag is cleared after this long without records; 0 disables
+    DEGRADE_UPGRADE_MAX_QUEUED: int = 10000
+
+    # Student display data cache
+    STUDENT_CACHE_MAX_SIZE: int = 10000
+    STUDENT_CACHE_TTL_SECONDS: float = 600.0
+
+    # Write-behind coalescing of counter and report path writes
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 200
+    WRITE_BEHIND_MAX_BATCH: int = 500
+
+    # Stage deadlines, in seconds (0 disables the deadline)
+    STAGE_TIMEOUT_READINESS_SECONDS: float = 10.0
+    STAGE_TIMEOUT_DB_SECONDS: float = 30.0
+    STAGE_TIMEOUT_EXTRACTION_SECONDS: float = 120.0
+    STAGE_TIMEOUT_RENDER_SECONDS: float = 120.0
+    STAGE_TIMEOUT_SAVE_SECONDS: float = 30.0
+
+    # Metrics
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "0.0.0.0"
+    METRICS_PORT: int = 9100
+
+    # On-demand report API
+    REPORT_API_ENABLED: bool = False
+    REPORT_API_HOST: str = "127.0.0.1"
+    REPORT_API_PORT: int = 8000
+    REPORT_API_TOKEN: str = ""                 # bearer token required by every request; without it the API does not start
+    REPORT_API_WAIT_SECONDS: float = 20.0      # default wait when the report has to be generated
+    REPORT_API_MAX_WAIT_SECONDS: float = 60.0
+
+    # Startup
+    STARTUP_BUDGET_SECONDS: float = 30.0       # import to first consumed message; 0 disables the check
+    PRELOAD_HEAVY_MODULES: bool = True         # import OpenCV/ReportLab in the background once consuming
+
+    # Job journal (stage checkpoints so redelivered reports resume after a restart)
+    JOB_JOURNAL_ENABLED: bool = True
+    JOB_JOURNAL_DIR: str = ""                  # defaults to CONTAINER_PATH/.journal, must survive restarts
+    JOB_JOURNAL_RETENTION_HOURS: float = 24.0  # unfinished jobs older than this are dropped at startup
+
+    # Report outputs: pdf, json and/or html. Without pdf, the PDF is rendered the
+    # first time it is requested through the report API (the metadata path points to it)
+    REPORT_OUTPUT_FORMATS: str = "pdf"
+    # Keep thumbnails and a manifest per report, so re-analyses only extract the frames of
+    # new or corrected errors and outputs rendered from the same content are not redone.
+    # PDFs then embed the 480px JPEG thumbnails instead of full-resolution screenshots
+    REPORT_INCREMENTAL_ENABLED: bool = False
+
+    # Progress reports: a student's practices over a period, from aggregate queries.
+    # Periods are aligned to Mondays when their length is a multiple of 7 days
+    PROGRESS_REPORT_PERIOD_DAYS: int = 7
+    PROGRESS_REPORT_TOP_N: int = 5
+    PROGRESS_REPORT_SCHEDULE_ENABLED: bool = False    # every student who practised in the last complete period
+    PROGRESS_REPORT_SCHEDULE_INTERVAL_HOURS: float = 24.0
+
+    # Report leases (one worker per practice across replicas)
+    REPORT_LEASE_ENABLED: bool = True
+    REPORT_LEASE_TTL_SECONDS: float = 60.0     # renewed every third of it while the report is generated
+    REPORT_LEASE_RETRY_SECONDS: float = 10.0   # a message whose practice is leased elsewhere is retried after this
+
+    # Event loop monitor
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 100.0
+    LOOP_BLOCKED_THRESHOLD_MS: float = 250.0   # stack of the blocking call is logged beyond this
+
+    # Profiling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_EVERY: int = 100          # profile one report in every N when enabled
+    PROFILING_OUTPUT_DIR: str = "/tmp/reports-service-profiles"
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TRACEMALLOC: bool = True
+    PROFILING_TRACEMALLOC_FRAMES: int = 10
+    PROFILING_TRACEMALLOC_TOP: int = 50
+    PROFILING_SIGNAL_JOBS: int = 1             # jobs profiled after each SIGUSR2
+    PROFILING_MAX_ARMED_JOBS: int = 10         # cap on jobs armed per student at any time
 
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_JSON: bool = True                      # JSON lines; LOG_FORMAT is used when false
+    LOG_QUEUE_SIZE: int = 10000                # records beyond this are dropped, never block the loop
+    LOG_RATE_LIMIT_PER_SECOND: float = 10.0    # per logger and message, below WARNING; 0 disables
+    LOG_RATE_LIMIT_BURST: int = 50
     
     class Config:
         case_sensitive = True
@@ -71,6 +198,7 @@ class Settings(BaseSettings):
         self.DEBUG = self.APP_ENV == "development"
         self.RELOAD = self.DEBUG
         self.LOG_LEVEL = "DEBUG" if self.DEBUG else self.LOG_LEVEL
+        self.JOB_JOURNAL_DIR = self.JOB_JOURNAL_DIR or os.path.join(self.CONTAINER_PATH, ".journal")
 
 
 settings = Settings()
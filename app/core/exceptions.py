@@ -13,4 +13,35 @@ class DatabaseConnectionException(ReportsServiceException):
 class ValidationException(ReportsServiceException):
     """Data validation error"""
     def __init__(self, message: str = "Validation error"):
-        super().__init__(message, "400")
\ No newline at end of file
+        super().__init__(message, "400")
+
+class PracticeNotReadyException(ReportsServiceException):
+    """Audio and video analysis of the practice are not completed yet"""
+    def __init__(self, practice_id: int):
+        self.practice_id = practice_id
+        super().__init__(f"Audio and video processing not completed for practice ID: {practice_id}", "409")
+
+class StageTimeoutException(ReportsServiceException):
+    """A report generation stage exceeded its deadline"""
+    def __init__(self, stage: str, timeout: float):
+        self.stage = stage
+        self.timeout = timeout
+        super().__init__(f"Stage '{stage}' exceeded its deadline of {timeout}s", "504")
+
+class PracticeLeasedException(ReportsServiceException):
+    """Another worker holds the lease of the practice and is generating its report"""
+    def __init__(self, practice_id: int):
+        self.practice_id = practice_id
+        super().__init__(f"Report of practice ID {practice_id} is being generated by another worker", "409")
+
+class LeaseLostException(ReportsServiceException):
+    """The lease of the practice expired or was taken over before the report was stored"""
+    def __init__(self, practice_id: int):
+        self.practice_id = practice_id
+        super().__init__(f"Lease of practice ID {practice_id} lost, report not stored", "409")
+
+class ObjectStorageException(ReportsServiceException):
+    """The object storage rejected a request or could not be reached"""
+    def __init__(self, message: str, status: int = 0):
+        self.status = status
+        super().__init__(message, "502")
@@ -1,14 +1,176 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional, Tuple
+from app.core import metrics
 from app.core.config import settings
 
+LOGS_DROPPED = metrics.counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+LOGS_SUPPRESSED = metrics.counter("log_records_suppressed_total", "Log records suppressed by rate limiting")
+
+# Fields attached to every record logged in the current context (practice_id, uid, partition, offset)
+_log_context: ContextVar[Dict[str, object]] = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "context", "suppressed"}
+
+# Rate limiter state is bounded; templates come from code, so this is only hit by dynamic messages
+MAX_RATE_LIMIT_KEYS = 10000
+
+_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def bind_log_context(**fields) -> Iterator[None]:
+    """Attach fields to every record logged in this context, including tasks created inside it."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Snapshots the log context on the logging thread, before the record crosses the queue."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _log_context.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, message template) for records below WARNING. With lazy
+    formatting the template is the same for every practice, so a chatty line is limited
+    as a whole; the number of suppressed records is reported on the next one let through.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        super().__init__()
+        self.rate = rate_per_second
+        self.burst = burst
+        self._buckets: Dict[Tuple[str, object], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_RATE_LIMIT_KEYS:
+                    self._buckets.clear()
+                # [tokens, last refill, suppressed since last emitted]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                LOGS_SUPPRESSED.inc()
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread and drops
+    records instead of blocking when the queue is full. Arguments are formatted
+    later, so they should not be mutated after logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOGS_DROPPED.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS})
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ContextTextFormatter(logging.Formatter):
+    """Plain text format with the log context appended."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = dict(getattr(record, "context", {}))
+        if getattr(record, "suppressed", 0):
+            fields["suppressed"] = record.suppressed
+        if not fields:
+            return text
+        context = " ".join(f"{key}={value}" for key, value in fields.items())
+        first_line, newline, rest = text.partition("\n")
+        return f"{first_line} [{context}]{newline}{rest}"
+
+
 def configure_logging():
-    """Configures logging for the application."""
-
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
-        format=settings.LOG_FORMAT,
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
-    
+    """
+    Configures logging for the application: records are put on a queue by the
+    caller and formatted and written by a background listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if settings.LOG_JSON else ContextTextFormatter(settings.LOG_FORMAT))
+
+    queue_handler = DeferredQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(ContextFilter())
+    if settings.LOG_RATE_LIMIT_PER_SECOND > 0:
+        queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_PER_SECOND, settings.LOG_RATE_LIMIT_BURST))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(shutdown_logging)
+
     logging.getLogger("kafka").setLevel(logging.INFO)
+
+
+def shutdown_logging():
+    """Stops the listener after writing the records still in the queue."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,106 @@
+"""
+Event loop health: a heartbeat task measures scheduling lag, and a watchdog
+thread captures the loop thread's stack when the heartbeat stalls, so blocking
+calls show up as call sites instead of unexplained latency spikes.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional, Set
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the loop heartbeat was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_LAG_LAST = metrics.gauge("event_loop_lag_last_seconds", "Lag of the latest loop heartbeat")
+LOOP_BLOCKED_TOTAL = metrics.counter("event_loop_blocked_total", "Times the loop was blocked beyond the threshold")
+
+# Frames from these files are where the loop waits or dispatches, not what blocks it
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_REPORTED_SITES = 1000
+
+
+def _call_site(frames: traceback.StackSummary) -> str:
+    """Innermost frame in service code, or the innermost frame at all."""
+    for frame in reversed(frames):
+        if frame.filename.startswith(_APP_ROOT):
+            return f"{frame.filename}:{frame.lineno} ({frame.name})"
+    last = frames[-1]
+    return f"{last.filename}:{last.lineno} ({last.name})"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, blocked_threshold: float):
+        self.interval = interval
+        self.blocked_threshold = blocked_threshold
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._reported_sites: Set[str] = set()
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop_watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            "Event loop monitor started (interval %.0f ms, blocked threshold %.0f ms)",
+            self.interval * 1000,
+            self.blocked_threshold * 1000,
+        )
+
+    async def stop(self):
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+    def _watch(self):
+        # One capture per stall: the beat time identifies the stall already reported
+        reported_beat = None
+        while not self._stop_event.wait(self.interval / 2):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat
+            if stalled < self.blocked_threshold + self.interval or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat
+            LOOP_BLOCKED_TOTAL.inc()
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            frames = traceback.extract_stack(frame)
+            site = _call_site(frames)
+            if site in self._reported_sites or len(self._reported_sites) >= MAX_REPORTED_SITES:
+                continue
+            self._reported_sites.add(site)
+            logger.warning(
+                "Event loop blocked for over %.0f ms at %s\n%s",
+                (stalled - self.interval) * 1000,
+                site,
+                "".join(traceback.format_list(frames)),
+            )
@@ -0,0 +1,200 @@
+"""
+Opt-in profiling of individual report jobs.
+
+A profiled job gets a sampling profile of every thread (the event loop and the
+render pool; screenshot extraction runs in a child process and only shows up
+in the stage timings) and a tracemalloc diff. Jobs are picked one in every
+PROFILING_SAMPLE_EVERY when PROFILING_ENABLED is set, or armed at runtime with
+SIGUSR2 or a POST to the /profile endpoint, optionally for a single student.
+
+Only one job is profiled at a time. Samples and allocations are process-wide,
+so work of other reports running concurrently is included in the artefacts.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILED_JOBS = metrics.counter("profiled_jobs_total", "Report jobs captured by the profiler")
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all other threads at a fixed interval, in collapsed (flame graph) format."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="job_profiler", daemon=True)
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.total = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.total += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class JobProfiler:
+    def __init__(self):
+        self.enabled = settings.PROFILING_ENABLED
+        self.sample_every = max(settings.PROFILING_SAMPLE_EVERY, 1)
+        self.output_dir = settings.PROFILING_OUTPUT_DIR
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.trace_allocations = settings.PROFILING_TRACEMALLOC
+        self.max_armed = max(settings.PROFILING_MAX_ARMED_JOBS, 1)
+        self._jobs_seen = 0
+        self._busy = False
+        # uid (None for any student) -> jobs still to profile
+        self._armed: Dict[Optional[str], int] = {}
+
+    def arm(self, jobs: int = 1, uid: Optional[str] = None):
+        """
+        Profile the next `jobs` reports, only those of `uid` if given. The jobs
+        armed per student add up to at most PROFILING_MAX_ARMED_JOBS.
+        """
+        if jobs < 1:
+            raise ValueError(f"jobs must be positive, got {jobs}")
+        self._armed[uid] = min(self._armed.get(uid, 0) + jobs, self.max_armed)
+        logger.info("Profiler armed for %s job(s) of student %s", self._armed[uid], uid or "any")
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "busy": self._busy,
+            "armed": {uid or "*": jobs for uid, jobs in self._armed.items()},
+            "output_dir": self.output_dir,
+        }
+
+    def _should_profile(self, uid: str) -> bool:
+        self._jobs_seen += 1
+        if self._busy:
+            return False
+        for key in (uid, None):
+            if self._armed.get(key, 0) > 0:
+                self._armed[key] -= 1
+                if not self._armed[key]:
+                    del self._armed[key]
+                return True
+        return self.enabled and self._jobs_seen % self.sample_every == 0
+
+    @asynccontextmanager
+    async def profile(self, uid: str, practice_id: int, **tags) -> AsyncIterator[None]:
+        """Profile the wrapped job if it is picked; otherwise a no-op."""
+        if not self._should_profile(uid):
+            yield
+            return
+
+        self._busy = True
+        started_tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        before = tracemalloc.take_snapshot() if self.trace_allocations else None
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            with metrics.collect_stages() as stages:
+                yield
+        except BaseException as e:
+            outcome = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall_seconds = time.perf_counter() - start
+            sampler.stop()
+            after = tracemalloc.take_snapshot() if before is not None else None
+            if started_tracing:
+                tracemalloc.stop()
+            self._busy = False
+
+            summary = {
+                "uid": uid,
+                "practice_id": practice_id,
+                **tags,
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(time.time() - wall_seconds)),
+                "wall_seconds": wall_seconds,
+                "outcome": outcome,
+                "stages": stages,
+                "samples": sampler.total,
+                "sample_interval_ms": self.interval * 1000,
+            }
+            try:
+                path = await asyncio.to_thread(self._write_artefacts, summary, sampler, before, after)
+                PROFILED_JOBS.inc()
+                logger.info("Profile of practice %s written to %s", practice_id, path)
+            except Exception as e:
+                logger.error("Could not write profile of practice %s: %s", practice_id, e, exc_info=True)
+
+    def _write_artefacts(self, summary: dict, sampler: StackSampler, before, after) -> str:
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"{timestamp}_practice_{summary['practice_id']}")
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, "summary.json"), "w") as summary_file:
+            json.dump(summary, summary_file, indent=2, default=str)
+        with open(os.path.join(path, "stacks.folded"), "w") as stacks_file:
+            stacks_file.write(sampler.collapsed())
+
+        if before is not None and after is not None:
+            # The sampler's own bookkeeping is not part of the job
+            own = (tracemalloc.Filter(False, __file__),)
+            stats = after.filter_traces(own).compare_to(before.filter_traces(own), "lineno")
+            with open(os.path.join(path, "tracemalloc.txt"), "w") as alloc_file:
+                alloc_file.write(f"Top {settings.PROFILING_TRACEMALLOC_TOP} allocation differences during the job\n")
+                for stat in stats[:settings.PROFILING_TRACEMALLOC_TOP]:
+                    alloc_file.write(f"{stat}\n")
+        return path
+
+
+# Global instance
+job_profiler = JobProfiler()
+
+
+async def profile_handler(method: str, query: Dict[str, str]):
+    """
+    POST /profile?jobs=N&uid=UID arms the profiler for 1 <= N <= PROFILING_MAX_ARMED_JOBS
+    jobs (1 by default); GET only reports its status.
+    """
+    if method == "POST":
+        try:
+            jobs = int(query.get("jobs", "1"))
+        except ValueError:
+            jobs = 0
+        if not 1 <= jobs <= job_profiler.max_armed:
+            message = f"jobs must be an integer between 1 and {job_profiler.max_armed}\n"
+            return 400, "text/plain; charset=utf-8", message.encode()
+        job_profiler.arm(jobs, query.get("uid") or None)
+    elif "jobs" in query or "uid" in query:
+        return 405, "text/plain; charset=utf-8", b"use POST to arm the profiler\n"
+    return 200, "application/json", json.dumps(job_profiler.status()).encode()
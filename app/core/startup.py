@@ -0,0 +1,45 @@
+"""
+Startup milestones, timed from the moment this module is imported (first
+import in app.main) and checked against STARTUP_BUDGET_SECONDS once the first
+message is consumed. On an idle topic that milestone also includes the wait
+for traffic, so the earlier milestones are logged with it.
+"""
+import logging
+import time
+from typing import Dict
+from app.core import metrics
+
+_IMPORT_STARTED = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MILESTONE_SECONDS = metrics.gauge(
+    "startup_milestone_seconds", "Seconds from service import to each startup milestone", ["milestone"]
+)
+
+_milestones: Dict[str, float] = {}
+
+
+def mark(milestone: str) -> float:
+    """Record a milestone the first time it is reached and return its elapsed time."""
+    if milestone in _milestones:
+        return _milestones[milestone]
+    elapsed = time.perf_counter() - _IMPORT_STARTED
+    _milestones[milestone] = elapsed
+    STARTUP_MILESTONE_SECONDS.set(elapsed, milestone=milestone)
+    logger.info("Startup milestone %s reached after %.2fs", milestone, elapsed)
+    return elapsed
+
+
+def check_budget(milestone: str, budget_seconds: float):
+    """Warn when a milestone was reached later than the startup budget allows."""
+    elapsed = _milestones.get(milestone)
+    if elapsed is None or budget_seconds <= 0:
+        return
+    breakdown = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in _milestones.items())
+    if elapsed > budget_seconds:
+        logger.warning(
+            "Startup budget exceeded: %s after %.2fs (budget %.2fs; %s)", milestone, elapsed, budget_seconds, breakdown
+        )
+    else:
+        logger.info("Startup within budget: %s after %.2fs (budget %.2fs; %s)", milestone, elapsed, budget_seconds, breakdown)
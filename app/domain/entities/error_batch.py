@@ -0,0 +1,263 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Sequence, Tuple
+from app.domain.entities.musical_error import MusicalError
+from app.domain.entities.postural_error import PosturalError
+from app.shared.utils import LazyModule
+
+# NumPy is imported on first use: app.main imports the interfaces and services
+# naming these types, and starting needs no numpy
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+
+def _parse_mmss(value: str) -> float:
+    """Seconds of a mm:ss (or plain seconds) timestamp, 0.0 if malformed."""
+    try:
+        if ':' in value:
+            parts = value.split(':')
+            return int(parts[0]) * 60 + float(parts[1])
+        return float(value)
+    except (ValueError, IndexError):
+        return 0.0
+
+
+def parse_mmss(values: Sequence) -> "np.ndarray":
+    """Seconds of many mm:ss (or plain seconds) timestamps at once; malformed ones are 0.0."""
+    text = np.asarray([str(value) for value in values], dtype=str)
+    if not len(text):
+        return np.zeros(0)
+    head, separator, tail = np.char.partition(text, ":").T
+    has_minutes = separator == ":"
+    try:
+        minutes = np.where(has_minutes, head, "0").astype(np.int64)
+        return minutes * 60 + np.where(has_minutes, tail, head).astype(np.float64)
+    except ValueError:
+        # Some value does not parse: only then one by one
+        return np.fromiter((_parse_mmss(value) for value in text), np.float64, len(text))
+
+
+@dataclass(frozen=True, eq=False)
+class StringColumn:
+    """
+    Strings stored once each: codes index into the distinct values, in order of
+    first appearance. Counting and grouping work on the codes.
+    """
+    codes: "np.ndarray"
+    values: Tuple
+
+    @classmethod
+    def from_values(cls, values: Iterable) -> "StringColumn":
+        index = {}
+        codes = np.fromiter((index.setdefault(value, len(index)) for value in values), np.int32)
+        return cls(codes, tuple(index))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, position: int):
+        return self.values[self.codes[position]]
+
+    def __iter__(self) -> Iterator:
+        values = self.values
+        return (values[code] for code in self.codes.tolist())
+
+    def take(self, positions) -> "StringColumn":
+        return StringColumn(self.codes[positions], self.values)
+
+    def seconds(self) -> "np.ndarray":
+        """Timestamps as seconds, each distinct value parsed once."""
+        return parse_mmss(self.values)[self.codes] if len(self.codes) else np.zeros(0)
+
+
+def _most_common(codes: "np.ndarray", top_n: int) -> List[Tuple[int, int]]:
+    """(code, count) of the most frequent codes; ties in order of first appearance, as Counter.most_common."""
+    if not len(codes):
+        return []
+    distinct, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))[:top_n]
+    return list(zip(distinct[order].tolist(), counts[order].tolist()))
+
+
+def _group_positions(practice_ids: "np.ndarray") -> Dict[int, "np.ndarray"]:
+    """Positions of the rows of each practice, keeping their order."""
+    order = np.argsort(practice_ids, kind="stable")
+    distinct, starts = np.unique(practice_ids[order], return_index=True)
+    return dict(zip(distinct.tolist(), np.split(order, starts[1:])))
+
+
+@dataclass(frozen=True, eq=False)
+class PosturalErrorBatch:
+    """
+    Postural errors as columns instead of one PosturalError per row: NumPy arrays
+    for the numbers and interned strings for the text. Iterating yields
+    PosturalError entities for callers that want rows.
+    """
+    ids: "np.ndarray"
+    min_sec_init: StringColumn
+    min_sec_end: StringColumn
+    frames: "np.ndarray"
+    explications: StringColumn
+    practice_ids: "np.ndarray"
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "PosturalErrorBatch":
+        """Build from rows in PosturalError field order, such as database rows."""
+        columns = tuple(zip(*rows)) or ((),) * 6
+        ids, min_sec_init, min_sec_end, frames, explications, practice_ids = columns
+        return cls(
+            np.array(ids, dtype=np.int64),
+            StringColumn.from_values(min_sec_init),
+            StringColumn.from_values(min_sec_end),
+            np.array(frames, dtype=np.int64),
+            StringColumn.from_values(explications),
+            np.array(practice_ids, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_errors(cls, errors: Iterable[PosturalError]) -> "PosturalErrorBatch":
+        return cls.from_rows(
+            (e.id, e.min_sec_init, e.min_sec_end, e.frame, e.explication, e.id_practice) for e in errors
+        )
+
+    @classmethod
+    def empty(cls) -> "PosturalErrorBatch":
+        return cls.from_rows(())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> PosturalError:
+        return PosturalError(
+            int(self.ids[position]), self.min_sec_init[position], self.min_sec_end[position],
+            int(self.frames[position]), self.explications[position], int(self.practice_ids[position]),
+        )
+
+    def __iter__(self) -> Iterator[PosturalError]:
+        return (
+            PosturalError(*row) for row in zip(
+                self.ids.tolist(), self.min_sec_init, self.min_sec_end, self.frames.tolist(),
+                self.explications, self.practice_ids.tolist(),
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"PosturalErrorBatch({len(self)} errors, {len(self.explications.values)} kinds)"
+
+    @cached_property
+    def start_seconds(self) -> "np.ndarray":
+        return self.min_sec_init.seconds()
+
+    @cached_property
+    def end_seconds(self) -> "np.ndarray":
+        return self.min_sec_end.seconds()
+
+    @property
+    def durations(self) -> "np.ndarray":
+        return self.end_seconds - self.start_seconds
+
+    def take(self, positions) -> "PosturalErrorBatch":
+        """The errors at these positions, in that order."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return PosturalErrorBatch(
+            self.ids[positions], self.min_sec_init.take(positions), self.min_sec_end.take(positions),
+            self.frames[positions], self.explications.take(positions), self.practice_ids[positions],
+        )
+
+    def sorted_by_start(self) -> "PosturalErrorBatch":
+        """Errors in video order; equal start times keep their order."""
+        return self.take(np.argsort(self.start_seconds, kind="stable"))
+
+    def group_by_practice(self) -> Dict[int, "PosturalErrorBatch"]:
+        return {
+            practice_id: self.take(positions)
+            for practice_id, positions in _group_positions(self.practice_ids).items()
+        }
+
+    def most_common_explications(self, top_n: int) -> List[Tuple[str, int]]:
+        values = self.explications.values
+        return [(values[code], count) for code, count in _most_common(self.explications.codes, top_n)]
+
+
+@dataclass(frozen=True, eq=False)
+class MusicalErrorBatch:
+    """Musical error counterpart of PosturalErrorBatch."""
+    ids: "np.ndarray"
+    min_sec: StringColumn
+    notes_played: StringColumn
+    notes_correct: StringColumn
+    practice_ids: "np.ndarray"
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "MusicalErrorBatch":
+        """Build from rows in MusicalError field order, such as database rows."""
+        columns = tuple(zip(*rows)) or ((),) * 5
+        ids, min_sec, notes_played, notes_correct, practice_ids = columns
+        return cls(
+            np.array(ids, dtype=np.int64),
+            StringColumn.from_values(min_sec),
+            StringColumn.from_values(notes_played),
+            StringColumn.from_values(notes_correct),
+            np.array(practice_ids, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_errors(cls, errors: Iterable[MusicalError]) -> "MusicalErrorBatch":
+        return cls.from_rows((e.id, e.min_sec, e.note_played, e.note_correct, e.id_practice) for e in errors)
+
+    @classmethod
+    def empty(cls) -> "MusicalErrorBatch":
+        return cls.from_rows(())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> MusicalError:
+        return MusicalError(
+            int(self.ids[position]), self.min_sec[position], self.notes_played[position],
+            self.notes_correct[position], int(self.practice_ids[position]),
+        )
+
+    def __iter__(self) -> Iterator[MusicalError]:
+        return (
+            MusicalError(*row) for row in zip(
+                self.ids.tolist(), self.min_sec, self.notes_played, self.notes_correct, self.practice_ids.tolist()
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"MusicalErrorBatch({len(self)} errors)"
+
+    @cached_property
+    def seconds(self) -> "np.ndarray":
+        return self.min_sec.seconds()
+
+    def take(self, positions) -> "MusicalErrorBatch":
+        """The errors at these positions, in that order."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return MusicalErrorBatch(
+            self.ids[positions], self.min_sec.take(positions), self.notes_played.take(positions),
+            self.notes_correct.take(positions), self.practice_ids[positions],
+        )
+
+    def sorted_by_time(self) -> "MusicalErrorBatch":
+        """Errors in video order; equal times keep their order."""
+        return self.take(np.argsort(self.seconds, kind="stable"))
+
+    def group_by_practice(self) -> Dict[int, "MusicalErrorBatch"]:
+        return {
+            practice_id: self.take(positions)
+            for practice_id, positions in _group_positions(self.practice_ids).items()
+        }
+
+    def most_common_wrong_notes(self, top_n: int) -> List[Tuple[Tuple[str, str], int]]:
+        """((note played, correct note), count) of the most frequent wrong notes."""
+        correct_kinds = max(len(self.notes_correct.values), 1)
+        pairs = self.notes_played.codes.astype(np.int64) * correct_kinds + self.notes_correct.codes
+        played, correct = self.notes_played.values, self.notes_correct.values
+        return [
+            ((played[pair // correct_kinds], correct[pair % correct_kinds]), count)
+            for pair, count in _most_common(pairs, top_n)
+        ]
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+@dataclass
+class JobCost:
+    num_postural_errors: int
+    num_musical_errors: int
+    estimated_memory_bytes: int
+    estimated_seconds: float
+
+    @property
+    def renders(self) -> bool:
+        """Practices without errors skip PDF rendering entirely."""
+        return self.num_postural_errors > 0 or self.num_musical_errors > 0
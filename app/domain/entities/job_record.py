@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from app.shared.enums import JobStage
+
+@dataclass
+class JobRecord:
+    job_key: str
+    uid: str
+    practice_id: int
+    stage: JobStage
+    # Outputs of the completed stages: error counts, screenshot paths, pdf path
+    data: dict = field(default_factory=dict)
\ No newline at end of file
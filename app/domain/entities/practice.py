@@ -15,4 +15,13 @@ class Practice:
     scale_type: str
     bpm: int
     figure: float
-    octaves: int
\ No newline at end of file
+    octaves: int
+
+
+def report_title(scale: str, scale_type: str) -> str:
+    """Title of a practice report; the scale is left out when it is not known."""
+    if not scale:
+        return "Reporte de practica"
+    if not scale_type:
+        return f"Reporte de practica: Escala {scale}"
+    return f"Reporte de practica: Escala {scale}, {scale_type}"
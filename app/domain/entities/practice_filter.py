@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+
+@dataclass(frozen=True)
+class PracticeFilter:
+    """Selection of practices; unset fields do not restrict it."""
+    date_from: Optional[date] = None    # inclusive
+    date_to: Optional[date] = None      # inclusive
+    uid: Optional[str] = None
+    practice_ids: List[int] = field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+@dataclass
+class PracticeLease:
+    practice_id: int
+    owner: str
+    # Increases with every grant, so a holder whose lease expired and was taken
+    # over can tell its token is no longer the current one
+    token: int
+    ttl_seconds: float
\ No newline at end of file
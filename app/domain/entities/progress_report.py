@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+from app.shared.utils import LazyModule
+
+# NumPy is imported on first use, as in error_batch
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule("numpy")
+
+
+@dataclass(frozen=True)
+class ProgressTrend:
+    """Errors of the practices sharing a scale, BPM or figure."""
+    key: float
+    practices: int
+    postural_mean: float
+    musical_mean: float
+    # Errors per practice in the later half of these practices minus the earlier half; None under two practices
+    change: Optional[float]
+
+
+@dataclass(frozen=True, eq=False)
+class PracticeErrorCounts:
+    """
+    Error counts of a student's practices over a period, as columns with one
+    element per practice, in practice date order.
+    """
+    practice_ids: "np.ndarray"
+    dates: "np.ndarray"
+    scale_ids: "np.ndarray"
+    bpms: "np.ndarray"
+    figures: "np.ndarray"
+    postural: "np.ndarray"
+    musical: "np.ndarray"
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "PracticeErrorCounts":
+        """Build from (id, datetime, scale id, bpm, figure, postural count, musical count) rows in date order."""
+        columns = tuple(zip(*rows)) or ((),) * 7
+        practice_ids, dates, scale_ids, bpms, figures, postural, musical = columns
+        return cls(
+            np.array(practice_ids, dtype=np.int64),
+            np.array(dates, dtype="datetime64[s]"),
+            np.array(scale_ids, dtype=np.int64),
+            np.array(bpms, dtype=np.int64),
+            np.array(figures, dtype=np.float64),
+            np.array(postural, dtype=np.int64),
+            np.array(musical, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.practice_ids)
+
+    @property
+    def totals(self) -> "np.ndarray":
+        return self.postural + self.musical
+
+    def trends(self, keys: "np.ndarray") -> List[ProgressTrend]:
+        """Trend of the practices grouped by the given column (scale_ids, bpms or figures), by key."""
+        if not len(keys):
+            return []
+        distinct, groups, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        # Position of each practice within its group, in date order
+        order = np.argsort(groups, kind="stable")
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[order] = np.arange(len(keys)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+        halves = sizes // 2
+        earlier = rank < halves[groups]
+        later = rank >= (sizes - halves)[groups]
+        totals = self.totals
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = (
+                np.bincount(groups, totals * later, len(distinct)) / halves
+                - np.bincount(groups, totals * earlier, len(distinct)) / halves
+            )
+        postural_mean = np.bincount(groups, self.postural, len(distinct)) / sizes
+        musical_mean = np.bincount(groups, self.musical, len(distinct)) / sizes
+
+        return [
+            ProgressTrend(key, practices, postural, musical, None if practices < 2 else delta)
+            for key, practices, postural, musical, delta in zip(
+                distinct.tolist(), sizes.tolist(), postural_mean.tolist(), musical_mean.tolist(), change.tolist()
+            )
+        ]
+
+
+@dataclass
+class ProgressReport:
+    """Summary of a student's practices between two dates (inclusive)."""
+    uid: str
+    student_name: str
+    date_from: date
+    date_to: date
+    counts: PracticeErrorCounts
+    by_scale: List[ProgressTrend]
+    by_bpm: List[ProgressTrend]
+    by_figure: List[ProgressTrend]
+    top_explications: List[Tuple[str, int]]
+    top_wrong_notes: List[Tuple[Tuple[str, str], int]]
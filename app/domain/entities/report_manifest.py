@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+@dataclass
+class ReportManifest:
+    practice_id: int
+    # Output format -> digest of the content it was last rendered from
+    rendered: Dict[str, str] = field(default_factory=dict)
+    # Digests of the error rows, in report order
+    postural_rows: List[str] = field(default_factory=list)
+    musical_rows: List[str] = field(default_factory=list)
+    # Frames that had a stored thumbnail
+    frames: List[int] = field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+@dataclass
+class VideoInfo:
+    width: int
+    height: int
+    fps: float
+    frame_count: int
+
+    @property
+    def frame_bytes(self) -> int:
+        """Size of one decoded BGR frame in memory."""
+        return self.width * self.height * 3
@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.domain.entities.job_record import JobRecord
+from app.shared.enums import JobStage
+
+
+class IJobJournalRepo(ABC):
+    @abstractmethod
+    async def get(self, job_key: str) -> Optional[JobRecord]:
+        """Gets the progress of a job, or None if it never completed a stage or its artefacts are gone."""
+        pass
+
+    @abstractmethod
+    async def record(self, job_key: str, uid: str, practice_id: int, stage: JobStage, data: dict) -> None:
+        """Durably records that a job completed a stage, merging the stage outputs into its data."""
+        pass
+
+    @abstractmethod
+    async def forget(self, job_key: str) -> None:
+        """Removes a job once its message is committed, with any leftover artefacts."""
+        pass
+
+    @abstractmethod
+    async def prune(self, max_age_seconds: float) -> int:
+        """Removes jobs not updated within max_age_seconds and returns how many were removed."""
+        pass
\ No newline at end of file
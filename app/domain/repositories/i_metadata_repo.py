@@ -1,13 +1,59 @@
 from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
 
 class IMetadataRepo(ABC):
     
     @abstractmethod
-    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str) -> bool:
-        """Saves the PDF path for a specific practice ID."""
+    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str, degraded: bool = False) -> bool:
+        """Saves the PDF path for a specific practice ID, flagging reduced-detail reports as degraded."""
         pass
     
     @abstractmethod
-    async def is_video_and_audio_done(self, uid: str, practice_id: int, pdf_path: str) -> bool:
+    async def save_pdf_path_if_ready(
+        self,
+        uid: str,
+        practice_id: int,
+        pdf_path: str,
+        degraded: bool = False,
+        fencing_token: Optional[int] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        """
+        Saves the PDF path only if audio and video processing are still done, in one
+        conditional update. With a fencing token, the update is also rejected once a
+        report with a newer token was stored for the practice. The (scale, scale type)
+        of the request, when known, is stored along so the report can be regenerated
+        with the same title.
+
+        Returns whether the path was saved. A write-behind implementation only buffers
+        the write and returns True: the conditions are checked when it is flushed.
+        """
+        pass
+
+    @abstractmethod
+    async def get_processing_flags(self, uid: str, practice_id: int) -> Optional[Tuple[bool, bool]]:
+        """Returns (audio_done, video_done) for a specific practice ID, or None if the practice is not found."""
+        pass
+    
+    @abstractmethod
+    async def get_report(self, uid: str, practice_id: int) -> Optional[Tuple[Optional[str], bool]]:
+        """Returns (report path, degraded) for a specific practice ID, or None if the practice is not found."""
+        pass
+
+    @abstractmethod
+    async def find_degraded_reports(self, limit: int) -> List[Tuple[str, int]]:
+        """Returns (uid, practice_id) of up to limit practices whose stored report is degraded."""
+        pass
+
+    @abstractmethod
+    async def get_scales(self, practices: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[str, str]]:
+        """
+        (scale, scale type) of each (uid, practice_id) whose scale is known: stored
+        with its report or in the practice metadata. Unknown practices are left out.
+        """
+        pass
+
+    @abstractmethod
+    async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
         """Checks if both video and audio processing are done for a specific practice ID."""
         pass
\ No newline at end of file
@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
-from app.domain.entities.musical_error import MusicalError
+from typing import Dict, List
+from app.domain.entities.error_batch import MusicalErrorBatch
 
 class IMusicalErrorRepo(ABC):
     
     @abstractmethod
-    async def get_by_practice(self, practice_id: int) -> list[MusicalError]:
+    async def get_by_practice(self, practice_id: int) -> MusicalErrorBatch:
         """Gets musical errors by practice ID."""
+        pass
+
+    @abstractmethod
+    async def count_by_practice(self, practice_id: int) -> int:
+        """Counts musical errors by practice ID."""
+        pass
+
+    @abstractmethod
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, MusicalErrorBatch]:
+        """Gets the musical errors of many practices at once, keyed by practice ID (every ID present)."""
         pass
\ No newline at end of file
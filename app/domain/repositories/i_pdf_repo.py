@@ -1,22 +1,50 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import AsyncIterator, Dict, Optional, Tuple
 from app.domain.entities.practice import Practice
-from app.domain.entities.postural_error import PosturalError
-from app.domain.entities.musical_error import MusicalError
+from app.domain.entities.progress_report import ProgressReport
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.shared.enums import ReportMode
 
 class IPDFRepo(ABC):
     @abstractmethod
     async def generate_pdf_content(
         self, 
         practice: Practice, 
-        postural_errors: List[PosturalError], 
-        musical_errors: List[MusicalError],
-        screenshots: Dict[int, str]
+        postural_errors: PosturalErrorBatch, 
+        musical_errors: MusicalErrorBatch,
+        screenshots: Dict[int, str],
+        mode: ReportMode = ReportMode.FULL,
+        keep_screenshots: bool = False
     ) -> bytes:
-        """Generate PDF content as bytes."""
+        """Generate PDF content as bytes, with the level of detail given by mode. Screenshots are removed unless kept."""
+        pass
+
+    @abstractmethod
+    async def generate_progress_pdf_content(self, report: ProgressReport) -> bytes:
+        """Generate the PDF content of a student's progress report as bytes."""
+        pass
+
+    @abstractmethod
+    def get_pdf_path(self, uid: str, filename: str) -> str:
+        """Path a PDF with this filename is saved at."""
         pass
     
     @abstractmethod
     async def save_pdf(self, uid: str, filename: str, content: bytes) -> str:
         """Save PDF content and return the file path."""
+        pass
+
+    @abstractmethod
+    async def delete_pdf(self, pdf_path: str) -> None:
+        """Remove a saved PDF; nothing happens if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def stat_pdf(self, pdf_path: str) -> Optional[Tuple[int, float]]:
+        """Return (size in bytes, modification time) of a saved PDF, or None if it does not exist."""
+        pass
+
+    @abstractmethod
+    def read_pdf(self, pdf_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the bytes of a saved PDF from start up to end (exclusive), in chunks."""
         pass
\ No newline at end of file
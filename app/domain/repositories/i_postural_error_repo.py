@@ -1,10 +1,21 @@
 from abc import ABC, abstractmethod
+from typing import Dict, List
 
-from app.domain.entities.postural_error import PosturalError
+from app.domain.entities.error_batch import PosturalErrorBatch
 
 class IPosturalErrorRepo(ABC):
 
     @abstractmethod
-    async def get_by_practice(self, practice_id: int) -> list[PosturalError]:
+    async def get_by_practice(self, practice_id: int) -> PosturalErrorBatch:
         """Gets postural errors by practice ID."""
+        pass
+
+    @abstractmethod
+    async def count_by_practice(self, practice_id: int) -> int:
+        """Counts postural errors by practice ID."""
+        pass
+
+    @abstractmethod
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, PosturalErrorBatch]:
+        """Gets the postural errors of many practices at once, keyed by practice ID (every ID present)."""
         pass
\ No newline at end of file
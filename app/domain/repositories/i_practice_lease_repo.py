@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.domain.entities.practice_lease import PracticeLease
+
+
+class IPracticeLeaseRepo(ABC):
+    @abstractmethod
+    async def acquire(self, practice_id: int, owner: str, ttl_seconds: float) -> Optional[PracticeLease]:
+        """Takes the lease of a practice with a new fencing token, or returns None if another owner holds it."""
+        pass
+
+    @abstractmethod
+    async def renew(self, lease: PracticeLease) -> bool:
+        """Extends the lease by its TTL; False if it expired and was taken over meanwhile."""
+        pass
+
+    @abstractmethod
+    async def is_current(self, lease: PracticeLease) -> bool:
+        """Whether the lease is unexpired and its token is still the latest granted for the practice."""
+        pass
+
+    @abstractmethod
+    async def release(self, lease: PracticeLease) -> None:
+        """Gives the lease up, if still held with this token."""
+        pass
\ No newline at end of file
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional
 from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
 
 
 class IPracticeRepo(ABC):
+    @abstractmethod
+    async def get_by_id(self, practice_id: int) -> Optional[Practice]:
+        """Gets a practice by ID."""
+        pass
+
     @abstractmethod
     async def update_num_postural_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
         """Updates the number of postural errors for a given practice ID."""
@@ -12,4 +18,14 @@ class IPracticeRepo(ABC):
     @abstractmethod
     async def update_num_musical_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
         """Updates the number of musical errors for a given practice ID."""
+        pass
+
+    @abstractmethod
+    async def find_by_filter(self, practice_filter: PracticeFilter, after_id: int, limit: int) -> List[Practice]:
+        """Gets up to limit practices matching the filter with an ID above after_id, in ID order."""
+        pass
+
+    @abstractmethod
+    async def count_by_filter(self, practice_filter: PracticeFilter) -> int:
+        """Counts the practices matching the filter."""
         pass
\ No newline at end of file
@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import List, Tuple
+from app.domain.entities.progress_report import PracticeErrorCounts
+
+class IProgressRepo(ABC):
+    """Aggregates over a student's practices and errors, for progress reports."""
+
+    @abstractmethod
+    async def get_error_counts(self, uid: str, date_from: date, date_to: date) -> PracticeErrorCounts:
+        """Gets the postural and musical error counts of each practice of the student between the dates (inclusive)."""
+        pass
+
+    @abstractmethod
+    async def get_top_explications(self, uid: str, date_from: date, date_to: date, limit: int) -> List[Tuple[str, int]]:
+        """Gets the most frequent postural error explications of the student between the dates, with their counts."""
+        pass
+
+    @abstractmethod
+    async def get_top_wrong_notes(
+        self, uid: str, date_from: date, date_to: date, limit: int
+    ) -> List[Tuple[Tuple[str, str], int]]:
+        """Gets the most frequent (note played, correct note) pairs of the student between the dates, with their counts."""
+        pass
+
+    @abstractmethod
+    async def get_students_with_practices(self, date_from: date, date_to: date) -> List[str]:
+        """Gets the uids of the students with practices between the dates (inclusive)."""
+        pass
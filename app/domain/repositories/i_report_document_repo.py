@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from app.domain.entities.practice import Practice
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.domain.entities.report_manifest import ReportManifest
+from app.shared.enums import ReportFormat, ReportMode
+
+class IReportDocumentRepo(ABC):
+    """Lightweight report outputs (JSON, HTML) and the error thumbnails they show."""
+
+    @abstractmethod
+    async def find_thumbnails(self, uid: str, practice_id: int, frames: List[int]) -> Dict[int, str]:
+        """Return frame -> path of the stored thumbnails among the given frames."""
+        pass
+
+    @abstractmethod
+    async def save_thumbnails(self, uid: str, practice_id: int, screenshots: List[Tuple[int, str]]) -> Dict[int, str]:
+        """Store (frame, screenshot path) pairs as thumbnails, removing the screenshots; return frame -> thumbnail path."""
+        pass
+
+    @abstractmethod
+    async def remove_thumbnails(self, uid: str, practice_id: int, frames: List[int]) -> None:
+        """Remove the stored thumbnails of these frames, if any."""
+        pass
+
+    @abstractmethod
+    async def generate_document(
+        self,
+        report_format: ReportFormat,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        thumbnails: Dict[int, str],
+        mode: ReportMode = ReportMode.FULL
+    ) -> bytes:
+        """Generate a JSON or HTML report; thumbnails maps postural error index to thumbnail path."""
+        pass
+
+    @abstractmethod
+    async def save_document(self, uid: str, filename: str, content: bytes) -> str:
+        """Save a report document and return the file path."""
+        pass
+
+    @abstractmethod
+    async def document_exists(self, uid: str, filename: str) -> bool:
+        """Whether a report document with this filename is saved."""
+        pass
+
+    @abstractmethod
+    async def load_manifest(self, uid: str, practice_id: int) -> Optional[ReportManifest]:
+        """Manifest of the last render of the practice report, or None if there is none."""
+        pass
+
+    @abstractmethod
+    async def save_manifest(self, uid: str, manifest: ReportManifest) -> None:
+        """Store the manifest of a render, replacing the previous one."""
+        pass
\ No newline at end of file
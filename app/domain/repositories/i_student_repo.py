@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.domain.entities.student import Student
+
+
+class IStudentRepo(ABC):
+    @abstractmethod
+    async def get_by_uid(self, uid: str) -> Optional[Student]:
+        """Gets the student display data by UID."""
+        pass
@@ -1,14 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
-from app.domain.entities.postural_error import PosturalError
+from typing import Dict, Optional
+from app.domain.entities.error_batch import PosturalErrorBatch
+from app.domain.entities.video_info import VideoInfo
 
 class IVideoRepo(ABC):
     @abstractmethod
     async def get_video(self, uid: str, practice_id: int) -> str:
         """Retrieve the video file path for the given practice ID."""
         pass
+
+    @abstractmethod
+    async def get_video_info(self, uid: str, practice_id: int) -> Optional[VideoInfo]:
+        """Read resolution, frame rate and frame count from the container metadata, without decoding frames."""
+        pass
     
     @abstractmethod
-    async def extract_screenshots_for_errors(self, uid: str, practice_id: int, postural_errors: List[PosturalError]) -> Dict[int, str]:
+    async def extract_screenshots_for_errors(self, uid: str, practice_id: int, postural_errors: PosturalErrorBatch) -> Dict[int, str]:
         """Extract screenshots for postural errors and return a mapping of error index to screenshot path."""
         pass
\ No newline at end of file
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from app.domain.entities.job_cost import JobCost
+from app.domain.entities.video_info import VideoInfo
+from app.domain.repositories.i_musical_error_repo import IMusicalErrorRepo
+from app.domain.repositories.i_postural_error_repo import IPosturalErrorRepo
+from app.domain.repositories.i_video_repo import IVideoRepo
+from app.shared import constants
+
+logger = logging.getLogger(__name__)
+
+
+class CostEstimatorService:
+    """Estimates the memory and time a report job will take before it is admitted."""
+
+    def __init__(
+        self,
+        postural_error_repo: IPosturalErrorRepo,
+        musical_error_repo: IMusicalErrorRepo,
+        video_repo: IVideoRepo,
+    ):
+        self.postural_error_repo = postural_error_repo
+        self.musical_error_repo = musical_error_repo
+        self.video_repo = video_repo
+
+    async def estimate(self, uid: str, practice_id: int) -> JobCost:
+        """Estimate the cost of the report for a practice from error counts and video metadata."""
+        num_postural, num_musical = await asyncio.gather(
+            self.postural_error_repo.count_by_practice(practice_id),
+            self.musical_error_repo.count_by_practice(practice_id),
+        )
+
+        video_info = None
+        if num_postural > 0:
+            # Only screenshots depend on the video, so skip opening it otherwise
+            video_info = await self.video_repo.get_video_info(uid, practice_id)
+
+        cost = self.compute(num_postural, num_musical, video_info)
+        logger.debug(
+            "Estimated cost for practice_id=%s: %s postural, %s musical, %.1f MB, %.2f s",
+            practice_id,
+            num_postural,
+            num_musical,
+            cost.estimated_memory_bytes / (1024 * 1024),
+            cost.estimated_seconds,
+        )
+        return cost
+
+    @staticmethod
+    def compute(num_postural: int, num_musical: int, video_info: VideoInfo | None) -> JobCost:
+        """Pure cost model, kept separate from the lookups so it can be reused with known counts."""
+        if num_postural == 0 and num_musical == 0:
+            return JobCost(0, 0, estimated_memory_bytes=0, estimated_seconds=0.0)
+
+        if video_info and video_info.width > 0 and video_info.height > 0:
+            frame_bytes = video_info.frame_bytes
+        else:
+            frame_bytes = constants.COST_DEFAULT_FRAME_WIDTH * constants.COST_DEFAULT_FRAME_HEIGHT * 3
+        megapixels = frame_bytes / 3 / 1_000_000
+
+        memory = constants.COST_BASE_MEMORY_BYTES + num_musical * constants.COST_BYTES_PER_MUSICAL_ERROR
+        seconds = constants.COST_BASE_SECONDS + num_musical * constants.COST_SECONDS_PER_MUSICAL_ERROR
+
+        if num_postural > 0:
+            memory += int(frame_bytes * constants.COST_DECODER_FRAMES)
+            if video_info and video_info.frame_count > 0:
+                memory += video_info.frame_count * constants.COST_INDEX_BYTES_PER_FRAME
+            memory += int(num_postural * frame_bytes * constants.COST_SCREENSHOT_RETENTION)
+            seconds += num_postural * megapixels * constants.COST_SECONDS_PER_SCREENSHOT_MEGAPIXEL
+
+        return JobCost(
+            num_postural_errors=num_postural,
+            num_musical_errors=num_musical,
+            estimated_memory_bytes=memory,
+            estimated_seconds=seconds,
+        )
@@ -0,0 +1,40 @@
+import logging
+from typing import Optional
+from app.domain.entities.job_record import JobRecord
+from app.domain.repositories.i_job_journal_repo import IJobJournalRepo
+from app.shared.enums import JobStage
+
+logger = logging.getLogger(__name__)
+
+
+class JobJournalService:
+    """Stage checkpoints of report jobs, so a redelivered job resumes instead of starting over."""
+
+    def __init__(self, journal_repo: IJobJournalRepo):
+        self.journal_repo = journal_repo
+
+    async def get_progress(self, job_key: Optional[str]) -> Optional[JobRecord]:
+        if not job_key:
+            return None
+        try:
+            return await self.journal_repo.get(job_key)
+        except Exception as e:
+            # Without the journal the job just runs from the start
+            logger.warning("Could not read job journal for %s: %s", job_key, e)
+            return None
+
+    async def checkpoint(self, job_key: Optional[str], uid: str, practice_id: int, stage: JobStage, **data) -> None:
+        if not job_key:
+            return
+        try:
+            await self.journal_repo.record(job_key, uid, practice_id, stage, data)
+        except Exception as e:
+            logger.warning("Could not record stage %s of job %s: %s", stage.name, job_key, e)
+
+    async def forget(self, job_key: Optional[str]) -> None:
+        if not job_key:
+            return
+        try:
+            await self.journal_repo.forget(job_key)
+        except Exception as e:
+            logger.warning("Could not remove job %s from the journal: %s", job_key, e)
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, List, Optional, Tuple
 from app.domain.repositories.i_metadata_repo import IMetadataRepo
 from app.core.exceptions import (
     ReportsServiceException,
@@ -14,10 +15,10 @@ class MetadataPracticeService:
     def __init__(self, metadata_repo: IMetadataRepo):
         self.metadata_repo = metadata_repo
 
-    async def save_pdf_path(self, uid: str, practice_id: str, pdf_path: str) -> str:
+    async def save_pdf_path(self, uid: str, practice_id: str, pdf_path: str, degraded: bool = False) -> str:
         """Save the PDF path associated with a practice."""
         try:
-            saved_path = await self.metadata_repo.save_pdf_path(uid, practice_id, pdf_path)
+            saved_path = await self.metadata_repo.save_pdf_path(uid, practice_id, pdf_path, degraded)
             logger.info("PDF path saved for practice_id=%s -> %s", practice_id, saved_path)
             return saved_path
 
@@ -31,9 +32,69 @@ class MetadataPracticeService:
                 f"Unexpected error saving PDF path: {str(e)}"
             )
             
+    async def save_pdf_path_if_ready(
+        self,
+        uid: str,
+        practice_id: int,
+        pdf_path: str,
+        degraded: bool = False,
+        fencing_token: Optional[int] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        """
+        Save the PDF path only if audio and video processing are still done (and the
+        token is not superseded), with the (scale, scale type) of the request if known.
+        """
+        try:
+            # The caller logs the outcome
+            return await self.metadata_repo.save_pdf_path_if_ready(
+                uid, practice_id, pdf_path, degraded, fencing_token, scale
+            )
+
+        except DatabaseConnectionException as db_err:
+            logger.error("Database error while saving PDF path: %s", db_err)
+            raise
+
+        except Exception as e:
+            logger.exception("Unexpected error in save_pdf_path_if_ready")
+            raise ReportsServiceException(
+                f"Unexpected error saving PDF path: {str(e)}"
+            )
+
     async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
         try:
             return await self.metadata_repo.is_video_and_audio_done(uid, practice_id)
         except DatabaseConnectionException as db_err:
             logger.error("Database error while checking video and audio status: %s", db_err)
-            raise
\ No newline at end of file
+            raise
+
+    async def get_report(self, uid: str, practice_id: int) -> Optional[Tuple[Optional[str], bool]]:
+        """(report path, degraded) of the practice, or None if the practice is not found."""
+        try:
+            return await self.metadata_repo.get_report(uid, practice_id)
+        except DatabaseConnectionException as db_err:
+            logger.error("Database error while reading the report path: %s", db_err)
+            raise
+
+    async def find_degraded_reports(self, limit: int) -> List[Tuple[str, int]]:
+        """(uid, practice_id) of practices whose stored report is degraded, up to limit."""
+        try:
+            return await self.metadata_repo.find_degraded_reports(limit)
+        except DatabaseConnectionException as db_err:
+            logger.error("Database error while listing degraded reports: %s", db_err)
+            raise
+
+    async def get_scales(self, practices: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[str, str]]:
+        """
+        (scale, scale type) of each (uid, practice_id) whose scale is known. MySQL
+        does not store it, so requests rebuilt from a practice take it from here.
+        """
+        try:
+            return await self.metadata_repo.get_scales(practices)
+        except DatabaseConnectionException as db_err:
+            logger.error("Database error while reading practice scales: %s", db_err)
+            raise
+
+    async def get_scale(self, uid: str, practice_id: int) -> Optional[Tuple[str, str]]:
+        """(scale, scale type) of the practice, or None if it is not known."""
+        return (await self.get_scales([(uid, practice_id)])).get((uid, practice_id))
\ No newline at end of file
@@ -1,6 +1,5 @@
 import logging
-from typing import List
-from app.domain.entities.musical_error import MusicalError
+from app.domain.entities.error_batch import MusicalErrorBatch
 from app.domain.repositories.i_musical_error_repo import IMusicalErrorRepo
 from app.core.exceptions import (
     ReportsServiceException,
@@ -15,7 +14,7 @@ class MusicalErrorService:
     def __init__(self, musical_error_repo: IMusicalErrorRepo):
         self.musical_error_repo = musical_error_repo
 
-    async def get_errors_by_practice(self, id_practice: int) -> List[MusicalError]:
+    async def get_errors_by_practice(self, id_practice: int) -> MusicalErrorBatch:
         """Get musical errors associated with a specific practice session."""
 
         try:
@@ -23,7 +22,7 @@ class MusicalErrorService:
 
             if errors is None:
                 logger.info("No musical errors found for practice %s", id_practice)
-                return []
+                return MusicalErrorBatch.empty()
 
             return errors
 
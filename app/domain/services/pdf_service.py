@@ -1,81 +1,374 @@
 import asyncio
-from typing import List
+import contextvars
+import hashlib
+import json
+from collections import Counter
+from dataclasses import asdict
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
 import logging
+import time
 from concurrent.futures import ThreadPoolExecutor
-from app.domain.entities.musical_error import MusicalError
-from app.domain.entities.postural_error import PosturalError
+from datetime import date
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
 from app.domain.entities.practice import Practice
+from app.domain.entities.progress_report import ProgressReport
+from app.domain.entities.report_manifest import ReportManifest
 from app.domain.repositories.i_pdf_repo import IPDFRepo
+from app.domain.repositories.i_report_document_repo import IReportDocumentRepo
 from app.domain.repositories.i_video_repo import IVideoRepo
+from app.core import metrics
+from app.core.exceptions import StageTimeoutException
+from app.shared.enums import ReportFormat, ReportMode
+from app.shared.utils import StageDeadlines, with_deadline
 
 logger = logging.getLogger(__name__)
 
+PDF_ONLY = frozenset({ReportFormat.PDF})
+
+# Part of every content digest: bump it when the report layouts change, so
+# outputs rendered by older code are not taken as current
+RENDER_VERSION = 1
+
+RENDERS_TOTAL = metrics.counter(
+    "report_incremental_renders_total", "Report generations by what had to be rendered again", ["result"]
+)
+FRAMES_TOTAL = metrics.counter(
+    "report_incremental_frames_total", "Postural error frames by where their screenshot came from", ["source"]
+)
+
+
+def _names(formats: FrozenSet[ReportFormat]) -> str:
+    return ", ".join(sorted(report_format.value for report_format in formats))
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def _postural_rows(errors: PosturalErrorBatch) -> List[str]:
+    # Row ids are left out: a re-analysis inserting the same error again does not change the report
+    return [
+        _digest(list(row))
+        for row in zip(errors.min_sec_init, errors.min_sec_end, errors.frames.tolist(), errors.explications)
+    ]
+
+
+def _musical_rows(errors: MusicalErrorBatch) -> List[str]:
+    return [_digest(list(row)) for row in zip(errors.min_sec, errors.notes_played, errors.notes_correct)]
+
+
+def _changed_rows(previous: List[str], current: List[str]) -> int:
+    """Rows added or removed between two renders; a corrected row counts as both."""
+    before, after = Counter(previous), Counter(current)
+    return sum((after - before).values()) + sum((before - after).values())
+
+
+def _progress_filename(date_from: date, date_to: date) -> str:
+    return f"progress_{date_from.isoformat()}_{date_to.isoformat()}.pdf"
+
+
 class PDFService:
     """Domain service for PDF generation and management"""
 
-    def __init__(self, pdf_repo: IPDFRepo, video_repo: IVideoRepo):
+    def __init__(
+        self,
+        pdf_repo: IPDFRepo,
+        video_repo: IVideoRepo,
+        deadlines: StageDeadlines = StageDeadlines(),
+        document_repo: Optional[IReportDocumentRepo] = None
+    ):
         self.pdf_repo = pdf_repo
         self.video_repo = video_repo
-        # Thread pool for CPU-intensive operations (video processing and PDF generation)
+        self.deadlines = deadlines
+        # JSON/HTML outputs, stored thumbnails and render manifests; PDF only, rendered in full, without it
+        self.document_repo = document_repo
+        # Thread pool for CPU-intensive operations (PDF generation)
         self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="pdf_processing")
 
-    async def generate_pdf(self, practice: Practice, postural_errors: List[PosturalError], musical_errors: List[MusicalError]) -> str:
-        """Generate a PDF report for the given practice and errors."""
-        logger.info(f"Generating PDF for practice {practice.id}")
+    async def generate_pdf(
+        self,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        mode: ReportMode = ReportMode.FULL,
+        screenshots: Optional[dict] = None,
+        on_screenshots: Optional[Callable[[dict], Awaitable[None]]] = None,
+        before_save: Optional[Callable[[], Awaitable[None]]] = None,
+        formats: FrozenSet[ReportFormat] = PDF_ONLY
+    ) -> str:
+        """
+        Generate the report of the given practice and errors in the given formats
+        and return the PDF path.
+        Screenshots already extracted by an interrupted run are reused instead of decoding
+        the video again; on_screenshots is awaited with newly extracted ones.
+        before_save is awaited right before writing the files and may raise to prevent it.
+        Without PDF among the formats it is not rendered, the path it will be saved at
+        is returned. Other formats need a document repository.
+
+        With a document repository the report is updated incrementally: screenshots are
+        kept as thumbnails by frame and only the frames without one are extracted, and
+        the outputs whose manifest shows they were rendered from the same content are
+        left as they are.
+        """
+        logger.info("Generating %s report for practice %s (%s)", mode.value, practice.id, _names(formats))
+        start = time.perf_counter()
+        filename = f"report_{practice.id}.pdf"
+        pdf_path = self.pdf_repo.get_pdf_path(practice.id_student, filename)
+        incremental = self.document_repo is not None
+        if formats != PDF_ONLY and not incremental:
+            raise ValueError(f"Report formats {_names(formats)} need a document repository")
         
         try:
-            # Extract screenshots in thread pool (CPU-intensive with OpenCV)
-            logger.debug(f"Starting screenshot extraction for practice_id={practice.id}")
             loop = asyncio.get_event_loop()
-            screenshots = await loop.run_in_executor(
-                self._executor,
-                self._extract_screenshots_sync,
-                practice.id_student,
-                practice.id,
-                postural_errors
-            )
-            logger.debug(f"Screenshot extraction completed for practice_id={practice.id}")
-            
-            # Generate PDF content in thread pool (CPU-intensive with ReportLab)
-            logger.debug(f"Starting PDF generation for practice_id={practice.id}")
-            pdf_content = await loop.run_in_executor(
-                self._executor,
-                self._generate_pdf_content_sync,
-                practice,
-                postural_errors,
-                musical_errors,
-                screenshots
-            )
-            logger.debug(f"PDF generation completed for practice_id={practice.id}")
-            
-            # Save PDF (I/O operation, keep async)
-            filename = f"report_{practice.id}.pdf"
-            pdf_path = await self.pdf_repo.save_pdf(practice.id_student, filename, pdf_content)
-            
-            logger.info(f"PDF generated successfully for practice {practice.id}")
+            manifest = await self.document_repo.load_manifest(practice.id_student, practice.id) if incremental else None
+            # Degraded reports skip video decoding entirely
+            thumbnails = {}
+            if incremental and mode is ReportMode.FULL:
+                thumbnails = await self._stored_thumbnails(practice, postural_errors)
+            if screenshots is None:
+                screenshots = {}
+                missing = [index for index in range(len(postural_errors)) if index not in thumbnails]
+                if mode is ReportMode.FULL and missing:
+                    screenshots = await self._extract_screenshots(practice, postural_errors, missing)
+                if on_screenshots:
+                    await on_screenshots(screenshots)
+            if mode is ReportMode.FULL:
+                FRAMES_TOTAL.inc(len(thumbnails), source="stored")
+                FRAMES_TOTAL.inc(len(screenshots), source="extracted")
+            if incremental:
+                # Only the extracted screenshots are journaled: forgetting a job removes them
+                thumbnails.update(await self._save_thumbnails(practice, postural_errors, screenshots))
+                screenshots = thumbnails
+
+            postural_rows = _postural_rows(postural_errors)
+            musical_rows = _musical_rows(musical_errors)
+            digest = _digest([
+                RENDER_VERSION, asdict(practice), mode.value, postural_rows, musical_rows,
+                sorted(index for index, path in screenshots.items() if path),
+            ])
+            rendered = dict(manifest.rendered) if manifest else {}
+            removed_pdf = False
+            pending = [
+                report_format for report_format in sorted(formats, key=lambda f: f.value)
+                if not await self._is_current(report_format, rendered, digest, practice, pdf_path)
+            ]
+            if manifest:
+                logger.info(
+                    "Practice %s: %s postural and %s musical rows changed, %s of %s outputs to render",
+                    practice.id, _changed_rows(manifest.postural_rows, postural_rows),
+                    _changed_rows(manifest.musical_rows, musical_rows), len(pending), len(formats),
+                )
+            if incremental:
+                RENDERS_TOTAL.inc(result="unchanged" if not pending else "updated" if manifest else "new")
+
+            for report_format in pending:
+                if report_format is ReportFormat.PDF:
+                    continue
+                await self._generate_document(
+                    report_format, practice, postural_errors, musical_errors, screenshots, mode, before_save
+                )
+                rendered[report_format.value] = digest
+
+            if ReportFormat.PDF in pending:
+                # Generate PDF content in thread pool (CPU-intensive with ReportLab).
+                # On timeout the thread cannot be interrupted, but the job stops waiting for it.
+                logger.debug("Starting PDF generation for practice_id=%s", practice.id)
+                # The context is copied so per-job state (stage timings) follows into the thread
+                context = contextvars.copy_context()
+                pdf_content = await with_deadline(
+                    loop.run_in_executor(
+                        self._executor,
+                        context.run,
+                        self._generate_pdf_content_sync,
+                        practice,
+                        postural_errors,
+                        musical_errors,
+                        screenshots,
+                        mode,
+                        incremental
+                    ),
+                    self.deadlines.render,
+                    "render",
+                )
+                logger.debug("PDF generation completed for practice_id=%s", practice.id)
+                
+                # Save PDF (I/O operation, keep async)
+                if before_save:
+                    await before_save()
+                pdf_path = await with_deadline(
+                    self.pdf_repo.save_pdf(practice.id_student, filename, pdf_content),
+                    self.deadlines.save,
+                    "save",
+                )
+                rendered[ReportFormat.PDF.value] = digest
+                logger.info("PDF generated successfully for practice %s", practice.id)
+            elif ReportFormat.PDF not in formats:
+                outdated = rendered.get(ReportFormat.PDF.value, digest) != digest
+                if incremental and (manifest is None or outdated):
+                    # A PDF of other content must not be served until it is rendered again
+                    if before_save:
+                        await before_save()
+                    await self.pdf_repo.delete_pdf(pdf_path)
+                    rendered.pop(ReportFormat.PDF.value, None)
+                    removed_pdf = True
+                logger.info("PDF of practice %s deferred until requested", practice.id)
+            else:
+                logger.info("PDF of practice %s unchanged since its last render", practice.id)
+
+            if incremental and (pending or removed_pdf or manifest is None):
+                await self._save_manifest(
+                    practice, postural_errors, manifest, rendered, postural_rows, musical_rows, screenshots
+                )
             return pdf_path
             
         except Exception as e:
-            logger.error(f"Error generating PDF for practice {practice.id}: {e}", exc_info=True)
+            logger.error("Error generating PDF for practice %s: %s", practice.id, e, exc_info=True)
             raise
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage=f"generate_pdf_{mode.value}")
+
+    async def _is_current(
+        self, report_format: ReportFormat, rendered: Dict[str, str], digest: str, practice: Practice, pdf_path: str
+    ) -> bool:
+        """Whether the stored output in this format was rendered from the same content and still exists."""
+        if rendered.get(report_format.value) != digest:
+            return False
+        if report_format is ReportFormat.PDF:
+            return await self.pdf_repo.stat_pdf(pdf_path) is not None
+        return await self.document_repo.document_exists(
+            practice.id_student, f"report_{practice.id}.{report_format.value}"
+        )
+
+    async def _save_manifest(
+        self,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        previous: Optional[ReportManifest],
+        rendered: Dict[str, str],
+        postural_rows: List[str],
+        musical_rows: List[str],
+        thumbnails: dict
+    ):
+        frames = postural_errors.frames.tolist()
+        # Degraded renders use no thumbnails but keep the stored ones of current errors
+        with_thumbnail = {frames[index] for index, path in thumbnails.items() if path}
+        with_thumbnail |= set(previous.frames) & set(frames) if previous else set()
+        await self.document_repo.save_manifest(
+            practice.id_student,
+            ReportManifest(practice.id, rendered, postural_rows, musical_rows, sorted(with_thumbnail)),
+        )
+        # Thumbnails of frames no error points at any more (corrected or removed errors)
+        stale = sorted(set(previous.frames) - set(frames)) if previous else []
+        if stale:
+            await self.document_repo.remove_thumbnails(practice.id_student, practice.id, stale)
+            logger.info("Removed %s stale thumbnails of practice %s", len(stale), practice.id)
     
-    def _extract_screenshots_sync(self, uid: str, practice_id: int, postural_errors: List[PosturalError]) -> dict:
-        """Synchronous wrapper for screenshot extraction to run in thread pool."""
+    async def _stored_thumbnails(self, practice: Practice, postural_errors: PosturalErrorBatch) -> dict:
+        """Stored thumbnails by error index, for the errors whose frame has one."""
+        frames = postural_errors.frames.tolist()
+        thumbnails = await self.document_repo.find_thumbnails(practice.id_student, practice.id, frames)
+        if thumbnails:
+            logger.info("Reusing %s stored thumbnails for practice %s", len(thumbnails), practice.id)
+        return {index: thumbnails[frame] for index, frame in enumerate(frames) if frame in thumbnails}
+
+    async def _save_thumbnails(self, practice: Practice, postural_errors: PosturalErrorBatch, screenshots: dict) -> dict:
+        """Turn screenshots by error index into stored thumbnails by error index."""
+        frames = postural_errors.frames.tolist()
+        by_frame = [(frames[index], path) for index, path in screenshots.items() if path]
+        thumbnails = await self.document_repo.save_thumbnails(practice.id_student, practice.id, by_frame)
+        return {index: thumbnails[frame] for index, frame in enumerate(frames) if frame in thumbnails}
+
+    async def _generate_document(
+        self,
+        report_format: ReportFormat,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        thumbnails: dict,
+        mode: ReportMode,
+        before_save: Optional[Callable[[], Awaitable[None]]]
+    ) -> str:
+        content = await self.document_repo.generate_document(
+            report_format, practice, postural_errors, musical_errors, thumbnails, mode
+        )
+        if before_save:
+            await before_save()
+        return await with_deadline(
+            self.document_repo.save_document(practice.id_student, f"report_{practice.id}.{report_format.value}", content),
+            self.deadlines.save,
+            "save",
+        )
+
+    def progress_pdf_path(self, uid: str, date_from: date, date_to: date) -> str:
+        """Path the progress report of a student over these dates is saved at."""
+        return self.pdf_repo.get_pdf_path(uid, _progress_filename(date_from, date_to))
+
+    async def generate_progress_pdf(self, report: ProgressReport) -> str:
+        """Render a student's progress report, replacing a previous one of the same period, and return its path."""
+        start = time.perf_counter()
+        filename = _progress_filename(report.date_from, report.date_to)
         try:
-            # Create a new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.video_repo.extract_screenshots_for_errors(uid, practice_id, postural_errors)
-                )
-            finally:
-                loop.close()
+            loop = asyncio.get_event_loop()
+            context = contextvars.copy_context()
+            pdf_content = await with_deadline(
+                loop.run_in_executor(self._executor, context.run, self._generate_progress_content_sync, report),
+                self.deadlines.render,
+                "render",
+            )
+            pdf_path = await with_deadline(
+                self.pdf_repo.save_pdf(report.uid, filename, pdf_content),
+                self.deadlines.save,
+                "save",
+            )
+            logger.info("Progress report of uid=%s from %s to %s generated", report.uid, report.date_from, report.date_to)
+            return pdf_path
+        except Exception as e:
+            logger.error("Error generating progress report for uid=%s: %s", report.uid, e, exc_info=True)
+            raise
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="generate_progress_pdf")
+
+    async def stat_report(self, pdf_path: str) -> Optional[Tuple[int, float]]:
+        """(size, modification time) of a stored report, or None if the file is missing."""
+        return await self.pdf_repo.stat_pdf(pdf_path)
+
+    def read_report(self, pdf_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Stream the bytes [start, end) of a stored report."""
+        return self.pdf_repo.read_pdf(pdf_path, start, end)
+
+    async def _extract_screenshots(self, practice: Practice, postural_errors: PosturalErrorBatch, indexes: List[int]) -> dict:
+        """
+        Extract the screenshots of the errors at these indexes under the extraction
+        deadline, falling back to none on timeout. Keyed by index in postural_errors.
+        """
+        logger.debug("Starting extraction of %s screenshots for practice_id=%s", len(indexes), practice.id)
+        try:
+            extracted = await with_deadline(
+                self.video_repo.extract_screenshots_for_errors(
+                    practice.id_student, practice.id, postural_errors.take(indexes)
+                ),
+                self.deadlines.extraction,
+                "extraction",
+            )
+            screenshots = {indexes[position]: path for position, path in extracted.items()}
+        except StageTimeoutException as e:
+            logger.warning("%s for practice_id=%s, rendering without screenshots", e.message, practice.id)
+            return {}
         except Exception as e:
-            logger.error(f"Error extracting screenshots: {e}")
+            logger.error("Error extracting screenshots: %s", e)
             return {}
+        logger.debug("Screenshot extraction completed for practice_id=%s", practice.id)
+        return screenshots
     
-    def _generate_pdf_content_sync(self, practice: Practice, postural_errors: List[PosturalError], musical_errors: List[MusicalError], screenshots: dict) -> bytes:
+    def _generate_progress_content_sync(self, report: ProgressReport) -> bytes:
+        """Synchronous wrapper for progress report rendering to run in thread pool."""
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.pdf_repo.generate_progress_pdf_content(report))
+        finally:
+            loop.close()
+
+    def _generate_pdf_content_sync(self, practice: Practice, postural_errors: PosturalErrorBatch, musical_errors: MusicalErrorBatch, screenshots: dict, mode: ReportMode, keep_screenshots: bool = False) -> bytes:
         """Synchronous wrapper for PDF content generation to run in thread pool."""
         try:
             # Create a new event loop for this thread
@@ -83,12 +376,12 @@ class PDFService:
             asyncio.set_event_loop(loop)
             try:
                 return loop.run_until_complete(
-                    self.pdf_repo.generate_pdf_content(practice, postural_errors, musical_errors, screenshots)
+                    self.pdf_repo.generate_pdf_content(practice, postural_errors, musical_errors, screenshots, mode, keep_screenshots)
                 )
             finally:
                 loop.close()
         except Exception as e:
-            logger.error(f"Error generating PDF content: {e}")
+            logger.error("Error generating PDF content: %s", e)
             raise
 
     def __del__(self):
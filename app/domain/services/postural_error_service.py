@@ -1,6 +1,5 @@
 import logging
-from typing import List
-from app.domain.entities.postural_error import PosturalError
+from app.domain.entities.error_batch import PosturalErrorBatch
 from app.domain.repositories.i_postural_error_repo import IPosturalErrorRepo
 from app.core.exceptions import (
     ReportsServiceException,
@@ -15,7 +14,7 @@ class PosturalErrorService:
     def __init__(self, postural_error_repo: IPosturalErrorRepo):
         self.postural_error_repo = postural_error_repo
 
-    async def get_errors_by_practice(self, id_practice: int) -> List[PosturalError]:
+    async def get_errors_by_practice(self, id_practice: int) -> PosturalErrorBatch:
         """Get postural errors associated with a specific practice session."""
         
         try:
@@ -23,7 +22,7 @@ class PosturalErrorService:
 
             if errors is None:
                 logger.info("No postural errors found for practice %s", id_practice)
-                return []
+                return PosturalErrorBatch.empty()
 
             return errors
 
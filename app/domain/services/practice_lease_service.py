@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from app.core.exceptions import LeaseLostException, PracticeLeasedException
+from app.domain.entities.practice_lease import PracticeLease
+from app.domain.repositories.i_practice_lease_repo import IPracticeLeaseRepo
+
+logger = logging.getLogger(__name__)
+
+
+class PracticeLeaseService:
+    """
+    Per-practice leases, so only one worker across replicas generates a report at a time.
+
+    The lease is renewed in the background every third of its TTL while held. Writers
+    check it right before storing anything: a worker that stalled past the TTL and was
+    taken over finds its fencing token superseded and stores nothing.
+    """
+
+    def __init__(self, lease_repo: IPracticeLeaseRepo, owner: str, ttl_seconds: float):
+        self.lease_repo = lease_repo
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+
+    @asynccontextmanager
+    async def hold(self, practice_id: int) -> AsyncIterator[PracticeLease]:
+        lease = await self.lease_repo.acquire(practice_id, self.owner, self.ttl_seconds)
+        if lease is None:
+            raise PracticeLeasedException(practice_id)
+
+        renewal = asyncio.create_task(self._renew(lease))
+        try:
+            yield lease
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+            try:
+                await self.lease_repo.release(lease)
+            except Exception as e:
+                # It expires on its own after the TTL
+                logger.warning("Could not release lease of practice %s: %s", practice_id, e)
+
+    async def ensure_held(self, lease: PracticeLease) -> None:
+        if not await self.lease_repo.is_current(lease):
+            raise LeaseLostException(lease.practice_id)
+
+    async def _renew(self, lease: PracticeLease):
+        while True:
+            await asyncio.sleep(lease.ttl_seconds / 3)
+            try:
+                if not await self.lease_repo.renew(lease):
+                    logger.warning("Lease of practice %s was taken over (token %s)", lease.practice_id, lease.token)
+                    return
+            except Exception as e:
+                # Retried on the next tick; the lease survives while the TTL has not elapsed
+                logger.warning("Could not renew lease of practice %s: %s", lease.practice_id, e)
\ No newline at end of file
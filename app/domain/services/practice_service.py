@@ -7,6 +7,9 @@ class PracticeService:
     def __init__(self, practice_repository: IPracticeRepo):
         self.practice_repository = practice_repository
 
+    async def get_practice(self, practice_id: int) -> Optional[Practice]:
+        return await self.practice_repository.get_by_id(practice_id)
+
     async def update_num_postural_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
         return await self.practice_repository.update_num_postural_errors(practice_id, num_errors)
     
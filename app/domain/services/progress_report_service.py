@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import List, Tuple
+from app.domain.entities.progress_report import ProgressReport
+from app.domain.repositories.i_progress_repo import IProgressRepo
+
+logger = logging.getLogger(__name__)
+
+# A Monday: periods of whole weeks run Monday to Sunday
+PERIOD_ANCHOR = date(2024, 1, 1)
+
+
+class ProgressReportService:
+    """Builds a student's progress report from aggregates of their practices and errors."""
+
+    def __init__(self, progress_repo: IProgressRepo, top_n: int = 5):
+        self.progress_repo = progress_repo
+        self.top_n = top_n
+
+    @staticmethod
+    def last_period(today: date, period_days: int) -> Tuple[date, date]:
+        """
+        (first, last day) of the last complete period before today. Periods are
+        aligned to a fixed anchor, so every run within a period picks the same one.
+        """
+        elapsed = (today - PERIOD_ANCHOR).days // period_days
+        date_to = PERIOD_ANCHOR + timedelta(days=elapsed * period_days - 1)
+        return date_to - timedelta(days=period_days - 1), date_to
+
+    async def build_report(self, uid: str, student_name: str, date_from: date, date_to: date) -> ProgressReport:
+        counts, explications, wrong_notes = await asyncio.gather(
+            self.progress_repo.get_error_counts(uid, date_from, date_to),
+            self.progress_repo.get_top_explications(uid, date_from, date_to, self.top_n),
+            self.progress_repo.get_top_wrong_notes(uid, date_from, date_to, self.top_n),
+        )
+        logger.debug("Progress of uid=%s from %s to %s: %s practices", uid, date_from, date_to, len(counts))
+        return ProgressReport(
+            uid=uid,
+            student_name=student_name,
+            date_from=date_from,
+            date_to=date_to,
+            counts=counts,
+            by_scale=counts.trends(counts.scale_ids),
+            by_bpm=counts.trends(counts.bpms),
+            by_figure=counts.trends(counts.figures),
+            top_explications=explications,
+            top_wrong_notes=wrong_notes,
+        )
+
+    async def students_with_practices(self, date_from: date, date_to: date) -> List[str]:
+        return await self.progress_repo.get_students_with_practices(date_from, date_to)
@@ -0,0 +1,15 @@
+from typing import Optional
+from app.domain.entities.student import Student
+from app.domain.repositories.i_student_repo import IStudentRepo
+
+
+class StudentService:
+    def __init__(self, student_repository: IStudentRepo):
+        self.student_repository = student_repository
+
+    async def get_student(self, uid: str) -> Optional[Student]:
+        return await self.student_repository.get_by_uid(uid)
+
+    async def get_student_name(self, uid: str) -> Optional[str]:
+        student = await self.student_repository.get_by_uid(uid)
+        return student.name if student else None
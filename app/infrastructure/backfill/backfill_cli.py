@@ -0,0 +1,109 @@
+"""
+Regenerate the reports of historical practices straight from MySQL, without Kafka.
+
+    python -m app.infrastructure.backfill.backfill_cli --from 2025-01-01 --to 2025-03-31
+    python -m app.infrastructure.backfill.backfill_cli --uid <uid>
+    python -m app.infrastructure.backfill.backfill_cli --ids 12,15,20 --workers 4 --rate 5
+
+Progress is checkpointed after every batch; running the same selection again
+resumes after the last checkpointed practice (--restart starts over).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import List
+from app.application.backfill.backfill_runner import BackfillRunner, selection_key
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.core.config import settings
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.infrastructure.backfill import backfill_worker
+from app.infrastructure.database.mongo_connection import mongo_connection
+from app.infrastructure.database.mysql_connection import mysql_connection
+from app.infrastructure.repositories.mongo_metadata_repo import MongoMetadataRepo
+from app.infrastructure.repositories.mysql_practice_repo import MySQLPracticeRepository
+from app.shared.enums import ReportMode
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_ids(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _default_checkpoint_path(practice_filter: PracticeFilter, report_mode: ReportMode) -> str:
+    digest = hashlib.sha1(
+        json.dumps(selection_key(practice_filter, report_mode), sort_keys=True).encode()
+    ).hexdigest()[:12]
+    return os.path.join(settings.CONTAINER_PATH, ".backfill", f"{digest}.json")
+
+
+async def _main(args: argparse.Namespace):
+    practice_filter = PracticeFilter(
+        date_from=args.date_from, date_to=args.date_to, uid=args.uid, practice_ids=args.ids or []
+    )
+    report_mode = ReportMode(args.mode)
+    checkpoint_path = args.checkpoint or _default_checkpoint_path(practice_filter, report_mode)
+
+    # forkserver, like screenshot extraction: workers start clean instead of inheriting this loop
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=backfill_worker.init_worker,
+        initargs=(args.nice,),
+    )
+    loop = asyncio.get_running_loop()
+
+    async def render_chunk(practices: List[PracticeDataDTO]):
+        return await loop.run_in_executor(executor, backfill_worker.run_chunk, practices)
+
+    runner = BackfillRunner(
+        MySQLPracticeRepository(),
+        MetadataPracticeService(MongoMetadataRepo()),
+        render_chunk,
+        practice_filter,
+        checkpoint_path,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        rate_per_second=args.rate,
+        report_mode=report_mode,
+    )
+    logger.info("Backfill checkpoint: %s", checkpoint_path)
+    try:
+        checkpoint = await runner.run(restart=args.restart)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        await mysql_connection.close_connections()
+        await mongo_connection.close()
+
+    if checkpoint.failed_ids:
+        logger.warning("Failed practices: %s", ", ".join(map(str, checkpoint.failed_ids)))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    from app.core.logging import configure_logging
+
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Regenerate reports of historical practices.")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="first practice date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last practice date, inclusive")
+    parser.add_argument("--uid", help="only practices of this student")
+    parser.add_argument("--ids", type=_parse_ids, help="comma separated practice IDs")
+    parser.add_argument("--mode", choices=[mode.value for mode in ReportMode], default=ReportMode.FULL.value)
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (default: 2)")
+    parser.add_argument("--batch-size", type=int, default=50, help="practices per checkpoint (default: 50)")
+    parser.add_argument("--rate", type=float, default=2.0, help="average reports per second, 0 for no limit (default: 2)")
+    parser.add_argument("--nice", type=int, default=10, help="CPU niceness added to the workers (default: 10)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: derived from the selection)")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+    if not (args.date_from or args.date_to or args.uid or args.ids):
+        parser.error("select practices with --from/--to, --uid or --ids")
+    asyncio.run(_main(args))
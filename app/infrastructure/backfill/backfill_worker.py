@@ -0,0 +1,131 @@
+"""
+Worker process side of the backfill: one event loop, database pools and use case
+per process, reused for every chunk of practices the runner hands over.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import List, Optional, Tuple
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.use_cases.generate_pdf_use_case import GeneratePDFUseCase
+from app.core.config import settings
+from app.core.exceptions import PracticeLeasedException, PracticeNotReadyException
+from app.core.logging import bind_log_context, configure_logging
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.musical_error_service import MusicalErrorService
+from app.domain.services.pdf_service import PDF_ONLY, PDFService
+from app.domain.services.postural_error_service import PosturalErrorService
+from app.domain.services.practice_lease_service import PracticeLeaseService
+from app.domain.services.practice_service import PracticeService
+from app.domain.services.student_service import StudentService
+from app.infrastructure.repositories.cached_student_repo import CachedStudentRepository
+from app.infrastructure.repositories.local_report_document_repo import LocalReportDocumentRepository
+from app.infrastructure.repositories.mongo_metadata_repo import MongoMetadataRepo
+from app.infrastructure.repositories.mongo_practice_lease_repo import MongoPracticeLeaseRepo
+from app.infrastructure.repositories.mysql_musical_error_repo import MySQLMusicalErrorRepository
+from app.infrastructure.repositories.mysql_postural_error_repo import MySQLPosturalErrorRepository
+from app.infrastructure.repositories.mysql_practice_repo import MySQLPracticeRepository
+from app.infrastructure.repositories.mysql_student_repo import MySQLStudentRepository
+from app.infrastructure.repositories.prefetched_error_repo import (
+    PrefetchedMusicalErrorRepository,
+    PrefetchedPosturalErrorRepository,
+)
+from app.infrastructure.storage.backends import create_storage_repos
+from app.shared.cache import LRUTTLCache
+from app.shared.enums import ReportFormat
+from app.shared.utils import StageDeadlines
+
+logger = logging.getLogger(__name__)
+
+# (practice_id, outcome, seconds); outcome is a reports_total outcome
+ChunkResult = List[Tuple[int, str, float]]
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_use_case: Optional[GeneratePDFUseCase] = None
+_postural_errors: Optional[PrefetchedPosturalErrorRepository] = None
+_musical_errors: Optional[PrefetchedMusicalErrorRepository] = None
+
+
+def init_worker(niceness: int):
+    """Process pool initializer: lower the CPU priority below the live consumer and wire the use case."""
+    global _loop, _use_case, _postural_errors, _musical_errors
+
+    if niceness:
+        os.nice(niceness)
+    configure_logging()
+
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    _postural_errors = PrefetchedPosturalErrorRepository(MySQLPosturalErrorRepository())
+    _musical_errors = PrefetchedMusicalErrorRepository(MySQLMusicalErrorRepository())
+    student_repo = CachedStudentRepository(
+        MySQLStudentRepository(),
+        LRUTTLCache(settings.STUDENT_CACHE_MAX_SIZE, settings.STUDENT_CACHE_TTL_SECONDS, name="student"),
+    )
+    deadlines = StageDeadlines(
+        readiness=settings.STAGE_TIMEOUT_READINESS_SECONDS,
+        db=settings.STAGE_TIMEOUT_DB_SECONDS,
+        extraction=settings.STAGE_TIMEOUT_EXTRACTION_SECONDS,
+        render=settings.STAGE_TIMEOUT_RENDER_SECONDS,
+        save=settings.STAGE_TIMEOUT_SAVE_SECONDS,
+    )
+    lease_service = None
+    if settings.REPORT_LEASE_ENABLED:
+        # Shared with the live consumers, so a practice is never rendered by both at once
+        lease_service = PracticeLeaseService(
+            MongoPracticeLeaseRepo(),
+            f"{socket.gethostname()}-{os.getpid()}-backfill",
+            settings.REPORT_LEASE_TTL_SECONDS,
+        )
+
+    output_formats = ReportFormat.parse_list(settings.REPORT_OUTPUT_FORMATS)
+    keep_documents = output_formats != PDF_ONLY or settings.REPORT_INCREMENTAL_ENABLED
+    document_repo = LocalReportDocumentRepository() if keep_documents else None
+    # Per worker process: its S3 connections belong to this process's loop
+    pdf_repo, video_repo, _ = create_storage_repos()
+    _use_case = GeneratePDFUseCase(
+        MetadataPracticeService(MongoMetadataRepo()),
+        PosturalErrorService(_postural_errors),
+        MusicalErrorService(_musical_errors),
+        PracticeService(MySQLPracticeRepository()),
+        StudentService(student_repo),
+        PDFService(pdf_repo, video_repo, deadlines, document_repo),
+        deadlines,
+        lease_service=lease_service,
+        output_formats=output_formats,
+    )
+
+
+def run_chunk(practices: List[PracticeDataDTO]) -> ChunkResult:
+    """Process pool task: generate the reports of a chunk of practices, one after another."""
+    return _loop.run_until_complete(_run_chunk(practices))
+
+
+async def _run_chunk(practices: List[PracticeDataDTO]) -> ChunkResult:
+    practice_ids = [practice.practice_id for practice in practices]
+    # Two queries for the errors of the whole chunk instead of two per report
+    await asyncio.gather(_postural_errors.prefetch(practice_ids), _musical_errors.prefetch(practice_ids))
+
+    results = []
+    for practice in practices:
+        start = time.perf_counter()
+        with bind_log_context(practice_id=practice.practice_id, uid=practice.uid, backfill=True):
+            outcome = await _generate(practice)
+        results.append((practice.practice_id, outcome, time.perf_counter() - start))
+    return results
+
+
+async def _generate(practice: PracticeDataDTO) -> str:
+    try:
+        pdf_path = await _use_case.execute(practice)
+        return "skipped_no_errors" if pdf_path == "None" else "rendered"
+    except PracticeNotReadyException:
+        return "not_ready"
+    except PracticeLeasedException:
+        return "leased"
+    except Exception as e:
+        logger.error("Backfill of practice %s failed: %s", practice.practice_id, e, exc_info=True)
+        return "failed"
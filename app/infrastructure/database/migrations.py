@@ -0,0 +1,173 @@
+"""
+Index migrations for the hot lookup paths of the reports service.
+
+Every report filters the error tables by ``id_practice`` and the Mongo
+``users`` collection by ``uid`` + ``practices.id_practice``; progress reports
+select ``Practice`` rows by ``id_student`` + ``practice_datetime``; expired report
+leases are removed by a TTL index. This module verifies that those indexes
+exist and creates the missing ones.
+
+    python -m app.infrastructure.database.migrations          # create missing indexes
+    python -m app.infrastructure.database.migrations --check  # only report them
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Index, inspect
+
+from app.infrastructure.database.models.musical_error_model import MusicalErrorModel
+from app.infrastructure.database.models.postural_error_model import PosturalErrorModel
+from app.infrastructure.database.models.practice_model import PracticeModel
+from app.infrastructure.database.mongo_connection import mongo_connection
+from app.infrastructure.database.mysql_connection import mysql_connection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MongoIndex:
+    collection: str
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    # Makes it a TTL index: documents are removed this long after the indexed date
+    expire_after_seconds: Optional[int] = None
+    unique: bool = False
+
+
+MYSQL_INDEXES: List[Index] = [
+    index
+    for model in (PosturalErrorModel, MusicalErrorModel, PracticeModel)
+    for index in model.__table__.indexes
+]
+
+MONGO_INDEXES: List[MongoIndex] = [
+    MongoIndex("users", "ix_users_uid_practice", (("uid", 1), ("practices.id_practice", 1))),
+    MongoIndex("report_leases", "ix_report_leases_expires_at", (("expires_at", 1),), expire_after_seconds=0),
+]
+
+
+def _covers(
+    existing_columns: Sequence[str],
+    wanted_columns: Sequence[str],
+    existing_unique: bool = False,
+    unique: bool = False,
+) -> bool:
+    """
+    An existing index serves the lookup if the wanted columns are its leading columns.
+    Uniqueness is only enforced by a unique index on exactly the wanted columns.
+    """
+    if unique:
+        return existing_unique and list(existing_columns) == list(wanted_columns)
+    return list(existing_columns[:len(wanted_columns)]) == list(wanted_columns)
+
+
+def _mongo_covers(info: dict, index: MongoIndex) -> bool:
+    """Whether an entry of index_information() serves the index, TTL included."""
+    columns = [field for field, _ in info["key"]]
+    wanted = [field for field, _ in index.keys]
+    if index.expire_after_seconds is not None:
+        # Documents only expire through a TTL index on exactly the date field
+        return columns == wanted and info.get("expireAfterSeconds") == index.expire_after_seconds
+    return _covers(columns, wanted, bool(info.get("unique")), index.unique)
+
+
+async def ensure_mysql_indexes(create: bool = True) -> List[str]:
+    """Verify the MySQL indexes, creating the missing ones if asked. Returns the names still missing."""
+    mysql_connection.init_engine()
+
+    def _sync(sync_conn) -> List[str]:
+        inspector = inspect(sync_conn)
+        missing = []
+        for index in MYSQL_INDEXES:
+            table_name = index.table.name
+            wanted = [column.name for column in index.columns]
+            existing = [(entry["column_names"], bool(entry["unique"])) for entry in inspector.get_indexes(table_name)]
+            # Primary key and unique constraints are reported separately by MySQL's inspector
+            existing += [
+                (entry["column_names"], True) for entry in inspector.get_unique_constraints(table_name)
+            ]
+            if any(_covers(columns, wanted, unique, bool(index.unique)) for columns, unique in existing):
+                continue
+
+            if create:
+                logger.info("Creating index %s on %s(%s)", index.name, table_name, ', '.join(wanted))
+                index.create(sync_conn)
+            else:
+                missing.append(f"{table_name}.{index.name}")
+        return missing
+
+    async with mysql_connection.async_engine.begin() as conn:
+        return await conn.run_sync(_sync)
+
+
+async def ensure_mongo_indexes(create: bool = True) -> List[str]:
+    """Verify the Mongo indexes, creating the missing ones if asked. Returns the names still missing."""
+    db = mongo_connection.connect()
+    missing = []
+    for index in MONGO_INDEXES:
+        collection = db[index.collection]
+        existing = await collection.index_information()
+        if any(_mongo_covers(info, index) for info in existing.values()):
+            continue
+
+        # Mongo refuses a second index on the same keys with other options
+        conflicting = [name for name, info in existing.items() if list(info["key"]) == list(index.keys)]
+        if create and not conflicting:
+            logger.info("Creating index %s on %s", index.name, index.collection)
+            options = {}
+            if index.expire_after_seconds is not None:
+                options["expireAfterSeconds"] = index.expire_after_seconds
+            if index.unique:
+                options["unique"] = True
+            await collection.create_index(list(index.keys), name=index.name, **options)
+        else:
+            if conflicting:
+                logger.warning(
+                    "Index %s on %s has the keys of %s but not its options, drop it to create %s",
+                    conflicting[0], index.collection, index.name, index.name,
+                )
+            missing.append(f"{index.collection}.{index.name}")
+    return missing
+
+
+async def check_indexes(create: bool = False) -> List[str]:
+    """Startup check: warn about missing indexes (creating them first if asked)."""
+    missing = []
+    for name, ensure in (("MySQL", ensure_mysql_indexes), ("MongoDB", ensure_mongo_indexes)):
+        try:
+            missing += await ensure(create)
+        except Exception as e:
+            logger.warning("Could not verify %s indexes: %s", name, e)
+
+    if missing:
+        logger.warning(
+            "Missing indexes on hot lookup paths: %s. "
+            "Run 'python -m app.infrastructure.database.migrations' or set DB_AUTO_MIGRATE=true.",
+            ", ".join(missing),
+        )
+    else:
+        logger.info("Database indexes verified")
+    return missing
+
+
+async def _main(check_only: bool):
+    try:
+        missing = await check_indexes(create=not check_only)
+    finally:
+        await mysql_connection.close_connections()
+        await mongo_connection.close()
+    if missing:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    from app.core.logging import configure_logging
+
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Create or verify the reports service indexes.")
+    parser.add_argument("--check", action="store_true", help="only report missing indexes")
+    args = parser.parse_args()
+    asyncio.run(_main(args.check))
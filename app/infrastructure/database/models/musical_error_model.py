@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -17,4 +17,6 @@ class MusicalErrorModel(Base):
             "min_sec", "note_played", "note_correct", "id_practice",
             name="uq_musical_error"
         ),
+        # Every report filters by practice; the unique constraint does not lead with it
+        Index("ix_musical_error_id_practice", "id_practice"),
     )
\ No newline at end of file
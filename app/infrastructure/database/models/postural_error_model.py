@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -15,4 +15,6 @@ class PosturalErrorModel(Base):
     
     __table_args__ = (
         UniqueConstraint("min_sec_init", "min_sec_end", "explication", "id_practice", name="uq_postural_error"),
+        # Every report filters by practice; the unique constraint does not lead with it
+        Index("ix_postural_error_id_practice", "id_practice"),
     )
\ No newline at end of file
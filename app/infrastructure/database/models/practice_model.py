@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Numeric, String, ForeignKey, DateTime
+from sqlalchemy import Column, Index, Integer, Numeric, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 
 from app.infrastructure.database.models.base import Base
@@ -18,3 +18,8 @@ class PracticeModel(Base):
     id_scale = Column(Integer, nullable=False)
 
     student = relationship("StudentModel", back_populates="practices")
+
+    __table_args__ = (
+        # Progress reports select a student's practices over a date range
+        Index("ix_practice_student_datetime", "id_student", "practice_datetime"),
+    )
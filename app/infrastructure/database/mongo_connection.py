@@ -1,40 +1,117 @@
-import os
 import logging
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from app.core import metrics
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+POOL_WAIT_SECONDS = metrics.histogram(
+    "mongo_pool_wait_seconds",
+    "Time spent waiting to check out a MongoDB connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_CHECKED_OUT = metrics.gauge("mongo_pool_checked_out", "MongoDB connections currently checked out")
+POOL_OPEN = metrics.gauge("mongo_pool_open_connections", "MongoDB connections currently open")
+POOL_CHECKOUT_FAILURES = metrics.counter(
+    "mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts", ["reason"]
+)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Feeds the MongoDB pool gauges from the driver's connection pool events."""
+
+    def __init__(self):
+        # Checkout started/finished events for one operation come from the same thread
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._observe_wait()
+        POOL_CHECKED_OUT.inc()
+
+    def connection_check_out_failed(self, event):
+        self._observe_wait()
+        POOL_CHECKOUT_FAILURES.inc(reason=event.reason)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec()
+
+    def connection_created(self, event):
+        POOL_OPEN.inc()
+
+    def connection_closed(self, event):
+        POOL_OPEN.dec()
+
+    def _observe_wait(self):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+            self._local.started = None
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
 
 class MongoConnection:
     """MongoDB connection singleton"""
 
     def __init__(self):
-        mongo_user = os.getenv("MONGO_USER")
-        mongo_password = os.getenv("MONGO_PASSWORD")
-        mongo_host = os.getenv("MONGO_HOST", "localhost")
-        mongo_port = os.getenv("MONGO_PORT", "27017")
-        mongo_db = os.getenv("MONGO_DB", "keyfairy")
-
         # Build the MongoDB URI
-        self.mongo_uri = f"mongodb://{mongo_user}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_db}"
-        self.mongo_db_name = mongo_db
+        self.mongo_uri = settings.MONGO_URI
+        self.mongo_db_name = settings.MONGO_DB
         self.client: AsyncIOMotorClient | None = None
         self.db = None
 
     def connect(self):
         if self.client is None:
             try:
-                self.client = AsyncIOMotorClient(self.mongo_uri)
+                self.client = AsyncIOMotorClient(
+                    self.mongo_uri,
+                    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                    minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                    maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                    waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                    connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    event_listeners=[PoolMetricsListener()],
+                )
                 self.db = self.client[self.mongo_db_name]
                 logger.info(
                     "MongoDB connection established",
-                    extra={"db_name": self.mongo_db_name, "uri": self.mongo_uri},
+                    extra={"db_name": self.mongo_db_name},
                 )
             except Exception as e:
                 logger.exception("Error connecting to MongoDB")
                 raise RuntimeError(f"Failed to connect to MongoDB: {str(e)}")
         return self.db
 
+    async def warm_up(self):
+        """
+        Select the server and open a first connection eagerly; the driver then fills
+        the pool up to minPoolSize in the background.
+        """
+        db = self.connect()
+        start = time.perf_counter()
+        await db.command("ping")
+        logger.info("MongoDB connection warmed up in %.2fs", time.perf_counter() - start)
+
     async def close(self):
         if self.client:
             self.client.close()
@@ -1,23 +1,40 @@
-import os
+import asyncio
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import time
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+POOL_WAIT_SECONDS = metrics.histogram(
+    "mysql_pool_wait_seconds",
+    "Time spent waiting to check out a MySQL connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_CHECKED_OUT = metrics.gauge("mysql_pool_checked_out", "MySQL connections currently checked out")
+POOL_CHECKED_IN = metrics.gauge("mysql_pool_checked_in", "Idle MySQL connections open in the pool")
+POOL_OVERFLOW = metrics.gauge("mysql_pool_overflow", "MySQL connections open beyond pool_size")
+POOL_SIZE = metrics.gauge("mysql_pool_size", "Configured MySQL pool size")
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+
 class DatabaseConnection:
     """MySQL async connection manager using SQLAlchemy"""
 
     def __init__(self):
-        self.mysql_host = os.getenv("MYSQL_HOST", "localhost")
-        self.mysql_port = os.getenv("MYSQL_PORT", "3306")
-        self.mysql_user = os.getenv("MYSQL_USER", "root")
-        self.mysql_password = os.getenv("MYSQL_PASSWORD", "")
-        self.mysql_db = os.getenv("MYSQL_DB", "music_db")
-
-        self.async_database_url = (
-            f"mysql+aiomysql://{self.mysql_user}:{self.mysql_password}"
-            f"@{self.mysql_host}:{self.mysql_port}/{self.mysql_db}"
-        )
+        self.async_database_url = settings.ASYNC_MYSQL_URL
 
         self.async_engine = None
         self.async_session_factory: async_sessionmaker[AsyncSession] | None = None
@@ -29,28 +46,55 @@ class DatabaseConnection:
                 self.async_engine = create_async_engine(
                     self.async_database_url,
                     echo=False,
-                    pool_pre_ping=True,
-                    pool_recycle=3600,
-                    pool_size=10,      # número máximo de conexiones en el pool
-                    max_overflow=5,    # conexiones extra si se saturan
-                    pool_timeout=30,   # Timeout para obtener conexión del pool
+                    poolclass=InstrumentedAsyncAdaptedQueuePool,
+                    pool_pre_ping=settings.MYSQL_POOL_PRE_PING,
+                    pool_recycle=settings.MYSQL_POOL_RECYCLE,
+                    pool_size=settings.MYSQL_POOL_SIZE,        # número máximo de conexiones en el pool
+                    max_overflow=settings.MYSQL_MAX_OVERFLOW,  # conexiones extra si se saturan
+                    pool_timeout=settings.MYSQL_POOL_TIMEOUT,  # Timeout para obtener conexión del pool
                 )
                 self.async_session_factory = async_sessionmaker(
                     self.async_engine,
                     class_=AsyncSession,
                     expire_on_commit=False,
                 )
+
+                pool = self.async_engine.sync_engine.pool
+                POOL_CHECKED_OUT.set_function(pool.checkedout)
+                POOL_CHECKED_IN.set_function(pool.checkedin)
+                POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+                POOL_SIZE.set_function(pool.size)
+
                 logger.info("Async database engine created successfully")
             except Exception as e:
                 logger.error("Error creating async database engine", exc_info=True)
                 raise RuntimeError(f"Failed to create database connection: {e}")
 
+    async def warm_up(self, min_connections: int | None = None):
+        """Open the minimum pool connections eagerly, so the first jobs skip connection setup."""
+        self.init_engine()
+        count = min(settings.MYSQL_POOL_MIN_SIZE if min_connections is None else min_connections, settings.MYSQL_POOL_SIZE)
+        if count <= 0:
+            return
+
+        start = time.perf_counter()
+        connections = await asyncio.gather(*(self.async_engine.connect() for _ in range(count)))
+        # Closing returns them to the pool, where they stay open
+        await asyncio.gather(*(conn.close() for conn in connections))
+        logger.info("MySQL pool warmed up with %s connections in %.2fs", count, time.perf_counter() - start)
+
     def get_async_session(self) -> AsyncSession:
         """Gets a new async session."""
         if not self.async_session_factory:
             self.init_engine()
         return self.async_session_factory()
 
+    def get_async_connection(self) -> AsyncConnection:
+        """Gets a Core connection, for read paths that do not need ORM entities."""
+        if not self.async_engine:
+            self.init_engine()
+        return self.async_engine.connect()
+
     async def close_connections(self):
         """Closes the database engine connections."""
         if self.async_engine:
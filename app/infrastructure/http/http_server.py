@@ -0,0 +1,239 @@
+import asyncio
+import hmac
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+REQUEST_READ_TIMEOUT_SECONDS = 5
+MAX_REQUEST_LINE_BYTES = 8192
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_IDLE_SECONDS = 30
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    206: "Partial Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    204: "No Content",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    416: "Range Not Satisfiable",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+@dataclass
+class HttpRequest:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]   # names lower-cased
+    body: bytes = b""
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    content_type: str = "text/plain; charset=utf-8"
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    # Sent instead of body when set; Content-Length must then be given in headers
+    stream: Optional[AsyncIterator[bytes]] = None
+
+
+Handler = Callable[[HttpRequest], Awaitable[HttpResponse]]
+
+
+def text_response(status: int, text: str) -> HttpResponse:
+    return HttpResponse(status, body=f"{text}\n".encode())
+
+
+def bearer_authorized(request: HttpRequest, token: bytes) -> bool:
+    """Whether the request carries ``Authorization: Bearer <token>``, compared in constant time."""
+    scheme, _, given = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(given.strip().encode(), token)
+
+
+class _BadRequest(Exception):
+    def __init__(self, response: HttpResponse):
+        self.response = response
+
+
+class HttpServer:
+    """
+    Minimal HTTP server on the event loop: GET and HEAD by default, one request
+    per connection unless keep_alive is set.
+
+    Handlers get the parsed request and return a response whose body is either
+    in memory or streamed in chunks, so large files never sit in memory. Request
+    bodies are only read for the other methods allowed, up to max_body_bytes.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        name: str = "HTTP",
+        methods: Iterable[str] = ("GET", "HEAD"),
+        max_body_bytes: int = 0,
+        keep_alive: bool = False
+    ):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.methods = frozenset(methods)
+        self.max_body_bytes = max_body_bytes
+        self.keep_alive = keep_alive
+        self._routes: Dict[str, Handler] = {}
+        self._prefix_routes: Dict[str, Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    def add_route(self, path: str, handler: Handler, prefix: bool = False):
+        """Route requests for path, or for every path starting with it when prefix is set."""
+        (self._prefix_routes if prefix else self._routes)[path] = handler
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if not self.port:
+            # Port 0: the one picked by the system
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("%s server listening on %s:%s", self.name, self.host, self.port)
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            # Open connections (idle keep-alive ones included) would outlive the server otherwise;
+            # a cancelled handler only stops waiting, the work it waited for goes on
+            handlers = list(self._connections.values())
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            logger.info("%s server stopped", self.name)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections[writer] = asyncio.current_task()
+        try:
+            keep_open = True
+            first = True
+            while keep_open:
+                request = None
+                try:
+                    request, response = await self._respond(reader, first)
+                except Exception as e:
+                    logger.error("Error serving %s request: %s", self.name, e, exc_info=True)
+                    response = text_response(500, "internal error")
+                if response is None:
+                    # Idle keep-alive connection closed or timed out
+                    break
+                first = False
+                keep_open = (
+                    self.keep_alive
+                    and request is not None
+                    and request.headers.get("connection", "").lower() != "close"
+                    and response.status < 500
+                )
+
+                try:
+                    await self._write(
+                        writer, response, send_body=request is None or request.method != "HEAD", keep_open=keep_open
+                    )
+                except ConnectionError:
+                    break
+                finally:
+                    # Closes the file behind an unfinished stream (HEAD, client gone)
+                    if hasattr(response.stream, "aclose"):
+                        await response.stream.aclose()
+        except asyncio.CancelledError:
+            # Cancelled by close(); not re-raised, the stream callback would log it as an error
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, response: HttpResponse, send_body: bool, keep_open: bool):
+        headers = {"Content-Type": response.content_type, **response.headers}
+        if response.stream is None:
+            headers.setdefault("Content-Length", str(len(response.body)))
+        head = f"HTTP/1.1 {response.status} {_REASONS.get(response.status, '')}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        head += f"Connection: {'keep-alive' if keep_open else 'close'}\r\n\r\n"
+
+        writer.write(head.encode("latin-1"))
+        if send_body and response.stream is not None:
+            async for chunk in response.stream:
+                writer.write(chunk)
+                # Paced by the client: at most one chunk buffered per connection
+                await writer.drain()
+        elif send_body:
+            writer.write(response.body)
+        await writer.drain()
+
+    async def _respond(
+        self, reader: asyncio.StreamReader, first: bool
+    ) -> Tuple[Optional[HttpRequest], Optional[HttpResponse]]:
+        """The request and its response; no response when an idle keep-alive connection ends."""
+        try:
+            request_line = await asyncio.wait_for(
+                reader.readline(), REQUEST_READ_TIMEOUT_SECONDS if first else KEEP_ALIVE_IDLE_SECONDS
+            )
+        except (asyncio.TimeoutError, ValueError):
+            return None, text_response(400, "bad request") if first else None
+        if not request_line and not first:
+            return None, None
+
+        try:
+            headers = {}
+            for _ in range(MAX_HEADER_LINES):
+                line = await asyncio.wait_for(reader.readline(), REQUEST_READ_TIMEOUT_SECONDS)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except (asyncio.TimeoutError, ValueError):
+            return None, text_response(400, "bad request")
+
+        parts = request_line.decode("latin-1").split()
+        if len(request_line) > MAX_REQUEST_LINE_BYTES or len(parts) != 3:
+            return None, text_response(400, "bad request")
+        method, target, _ = parts
+        if method not in self.methods:
+            return None, text_response(405, "method not allowed")
+
+        try:
+            body = await self._read_body(reader, headers)
+        except _BadRequest as e:
+            return None, e.response
+
+        path, _, query_string = target.partition("?")
+        request = HttpRequest(method, path, dict(parse_qsl(query_string, keep_blank_values=True)), headers, body)
+        handler = self._routes.get(path) or next(
+            (handler for prefix, handler in self._prefix_routes.items() if path.startswith(prefix)), None
+        )
+        if handler is None:
+            return request, text_response(404, "not found")
+        return request, await handler(request)
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+        length = headers.get("content-length", "0")
+        if not length.isdigit() or "transfer-encoding" in headers:
+            raise _BadRequest(text_response(400, "bad request"))
+        if int(length) > self.max_body_bytes:
+            raise _BadRequest(text_response(413, "payload too large"))
+        if not int(length):
+            return b""
+        try:
+            return await asyncio.wait_for(reader.readexactly(int(length)), REQUEST_READ_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            raise _BadRequest(text_response(400, "bad request"))
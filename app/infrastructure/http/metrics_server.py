@@ -0,0 +1,61 @@
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+from app.core import metrics
+from app.infrastructure.http.http_server import HttpRequest, HttpResponse, HttpServer, bearer_authorized, text_response
+
+logger = logging.getLogger(__name__)
+
+# (status, content type, body)
+Response = Tuple[int, str, bytes]
+Handler = Callable[[Dict[str, str]], Awaitable[Response]]
+# Admin handlers also get the method: GET reads, POST changes something
+AdminHandler = Callable[[str, Dict[str, str]], Awaitable[Response]]
+
+
+async def _metrics_handler(query: Dict[str, str]) -> Response:
+    return 200, "text/plain; version=0.0.4; charset=utf-8", metrics.render_text().encode()
+
+
+async def _health_handler(query: Dict[str, str]) -> Response:
+    return 200, "text/plain; charset=utf-8", b"ok\n"
+
+
+class MetricsServer(HttpServer):
+    """
+    Scrape and admin endpoints, with handlers taking the query string and
+    returning (status, content type, body).
+
+    Scrape routes are open and read-only. Admin routes change the process, so
+    they need ``Authorization: Bearer <token>`` and are not served without a token.
+
+    Kept on the event loop on purpose: responses are small and in memory, and a
+    scrape that cannot be served is itself a signal that the loop is blocked.
+    """
+
+    def __init__(self, host: str, port: int):
+        super().__init__(host, port, name="Metrics", methods=("GET", "HEAD", "POST"))
+        self.route("/metrics", _metrics_handler)
+        self.route("/health", _health_handler)
+
+    def route(self, path: str, handler: Handler):
+        async def respond(request: HttpRequest) -> HttpResponse:
+            if request.method == "POST":
+                return text_response(405, "method not allowed")
+            status, content_type, body = await handler(request.query)
+            return HttpResponse(status, content_type, body)
+
+        self.add_route(path, respond)
+
+    def admin_route(self, path: str, handler: AdminHandler, token: str):
+        if not token:
+            logger.warning("No admin token configured, %s is not served", path)
+            return
+        expected = token.encode()
+
+        async def respond(request: HttpRequest) -> HttpResponse:
+            if not bearer_authorized(request, expected):
+                return HttpResponse(401, body=b"unauthorized\n", headers={"WWW-Authenticate": "Bearer"})
+            status, content_type, body = await handler(request.method, request.query)
+            return HttpResponse(status, content_type, body)
+
+        self.add_route(path, respond)
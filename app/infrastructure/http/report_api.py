@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+from email.utils import formatdate
+from typing import Optional, Tuple
+from app.application.dto.report_status_dto import ReportStatusDTO
+from app.application.use_cases.fetch_report_use_case import FetchReportUseCase
+from app.core import metrics
+from app.core.exceptions import ReportsServiceException, ValidationException
+from app.infrastructure.http.http_server import HttpRequest, HttpResponse, HttpServer, bearer_authorized
+from app.shared.enums import ReportState
+
+logger = logging.getLogger(__name__)
+
+API_REQUESTS_TOTAL = metrics.counter("report_api_requests_total", "Report API responses by route and status", ["route", "status"])
+
+# Seconds clients are told to wait before polling a report being generated
+RETRY_AFTER_SECONDS = 5
+
+# Status of /report when the report cannot be sent (yet)
+_REPORT_STATUS_CODES = {
+    ReportState.GENERATING: 202,
+    ReportState.PENDING: 202,
+    ReportState.STALE: 202,
+    ReportState.NOT_READY: 409,
+    ReportState.NO_ERRORS: 404,
+    ReportState.MISSING: 404,
+}
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end exclusive) of a single byte range. Malformed and multi-range
+    headers return None and the whole file is sent, as the RFC allows.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = spec.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise _RangeNotSatisfiable()
+            return max(size - length, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start >= size:
+        raise _RangeNotSatisfiable()
+    if end <= start:
+        return None
+    return start, min(end, size)
+
+
+def _etag(status: ReportStatusDTO) -> str:
+    return f'"{status.size:x}-{int(status.modified_at * 1_000_000):x}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _json_response(status: int, payload: dict, headers: Optional[dict] = None) -> HttpResponse:
+    return HttpResponse(status, "application/json", json.dumps(payload).encode(), headers or {})
+
+
+class ReportApi:
+    """
+    On-demand report endpoints.
+
+        GET /report?uid=<uid>&practice_id=<id>[&wait=<seconds>]
+            The PDF (ETag, conditional and single range requests supported). A
+            missing or stale report is generated first, waiting up to `wait`
+            seconds; past that 202 with the status, poll again later.
+        GET /report/status?uid=<uid>&practice_id=<id>
+            Report state and queue position as JSON, never triggers generation.
+
+    Every request must carry ``Authorization: Bearer <token>``; otherwise 401.
+    """
+
+    def __init__(
+        self,
+        fetch_report: FetchReportUseCase,
+        token: str,
+        default_wait_seconds: float,
+        max_wait_seconds: float,
+    ):
+        if not token:
+            raise ValueError("The report API requires a token")
+        self.fetch_report = fetch_report
+        self._token = token.encode()
+        self.default_wait_seconds = default_wait_seconds
+        self.max_wait_seconds = max_wait_seconds
+
+    def register(self, server: HttpServer):
+        server.add_route("/report", self.report)
+        server.add_route("/report/status", self.status)
+
+    async def report(self, request: HttpRequest) -> HttpResponse:
+        return await self._guard("report", request, self._report)
+
+    async def status(self, request: HttpRequest) -> HttpResponse:
+        return await self._guard("status", request, self._status)
+
+    async def _guard(self, route: str, request: HttpRequest, handler) -> HttpResponse:
+        try:
+            if not bearer_authorized(request, self._token):
+                response = _json_response(401, {"error": "unauthorized"}, {"WWW-Authenticate": "Bearer"})
+            else:
+                response = await handler(request)
+        except ReportsServiceException as e:
+            code = int(e.code) if e.code.isdigit() else 500
+            if code >= 500:
+                logger.error("Report API error: %s", e.message)
+            response = _json_response(code, {"error": e.message})
+        except Exception as e:
+            logger.error("Report API error: %s", e, exc_info=True)
+            response = _json_response(500, {"error": "internal error"})
+        API_REQUESTS_TOTAL.inc(route=route, status=response.status)
+        return response
+
+    async def _status(self, request: HttpRequest) -> HttpResponse:
+        uid, practice_id = self._practice(request)
+        status = await self.fetch_report.status(uid, practice_id)
+        return _json_response(404 if status.state is ReportState.MISSING else 200, status.to_dict())
+
+    async def _report(self, request: HttpRequest) -> HttpResponse:
+        uid, practice_id = self._practice(request)
+        try:
+            wait = float(request.query.get("wait", self.default_wait_seconds))
+        except ValueError:
+            raise ValidationException("wait must be a number of seconds")
+        wait = min(max(wait, 0.0), self.max_wait_seconds)
+
+        status = await self.fetch_report.fetch(uid, practice_id, wait)
+        if status.state is not ReportState.READY:
+            code = _REPORT_STATUS_CODES[status.state]
+            headers = {"Retry-After": str(RETRY_AFTER_SECONDS)} if code == 202 else None
+            return _json_response(code, status.to_dict(), headers)
+        return self._send_pdf(request, status)
+
+    def _send_pdf(self, request: HttpRequest, status: ReportStatusDTO) -> HttpResponse:
+        etag = _etag(status)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(status.modified_at, usegmt=True),
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, no-cache",
+        }
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return HttpResponse(304, headers=headers)
+
+        size = status.size
+        byte_range = None
+        range_header = request.headers.get("range")
+        # If-Range: the range only applies to the version the client already has part of
+        if range_header and request.headers.get("if-range", etag) == etag:
+            try:
+                byte_range = _parse_range(range_header, size)
+            except _RangeNotSatisfiable:
+                return HttpResponse(416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+        start, end = byte_range or (0, size)
+        headers["Content-Length"] = str(end - start)
+        headers["Content-Disposition"] = f'inline; filename="{os.path.basename(status.pdf_path)}"'
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        return HttpResponse(
+            206 if byte_range else 200,
+            "application/pdf",
+            headers=headers,
+            stream=self.fetch_report.read(status, start, end),
+        )
+
+    def _practice(self, request: HttpRequest) -> Tuple[str, int]:
+        uid = request.query.get("uid")
+        practice_id = request.query.get("practice_id", "")
+        if not uid or not practice_id.isdigit():
+            raise ValidationException("uid and a numeric practice_id are required")
+        return uid, int(practice_id)
@@ -1,109 +1,466 @@
 import asyncio
 import json
 import logging
-from aiokafka import AIOKafkaConsumer
+import os
+import socket
+import time
+from typing import Optional
+from aiokafka import AIOKafkaConsumer, TopicPartition
+from aiokafka.errors import KafkaError
 from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.scheduler.degraded_report_upgrader import DegradedReportUpgrader
+from app.application.scheduler.progress_report_scheduler import ProgressReportScheduler
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.application.use_cases.fetch_report_use_case import FetchReportUseCase
 from app.application.use_cases.generate_pdf_use_case import GeneratePDFUseCase
+from app.application.use_cases.generate_progress_report_use_case import (
+    PROGRESS_REPORT_COST,
+    GenerateProgressReportUseCase,
+)
+from app.core import metrics
 from app.core.config import settings
+from app.core import startup
+from app.core.exceptions import PracticeLeasedException
+from app.core.logging import bind_log_context
+from app.domain.services.cost_estimator_service import CostEstimatorService
+from app.domain.services.job_journal_service import JobJournalService
 from app.domain.services.metadata_service import MetadataPracticeService
 from app.domain.services.musical_error_service import MusicalErrorService
-from app.domain.services.pdf_service import PDFService
+from app.domain.services.pdf_service import PDF_ONLY, PDFService
 from app.domain.services.postural_error_service import PosturalErrorService
+from app.domain.services.practice_lease_service import PracticeLeaseService
 from app.domain.services.practice_service import PracticeService
+from app.domain.services.progress_report_service import ProgressReportService
+from app.domain.services.student_service import StudentService
+from app.infrastructure.http.http_server import HttpServer
+from app.infrastructure.http.report_api import ReportApi
 from app.infrastructure.kafka.kafka_message import KafkaMessage
-from app.infrastructure.repositories.local_pdf_repo import LocalPDFRepository
-from app.infrastructure.repositories.local_video_repo import LocalVideoRepository
+from app.infrastructure.kafka.lag_policy import LagDegradationPolicy
+from app.infrastructure.kafka.progress_report_consumer import start_progress_report_consumer
+from app.infrastructure.kafka.rebalance import (
+    DrainingRebalanceListener,
+    InFlightTracker,
+    assignment_strategy,
+    drain_timeout_within,
+)
+from app.infrastructure.kafka.student_invalidation_consumer import start_student_invalidation_consumer
+from app.infrastructure.repositories.cached_student_repo import CachedStudentRepository
+from app.infrastructure.repositories import local_pdf_repo, local_video_repo
+from app.infrastructure.repositories.local_report_document_repo import LocalReportDocumentRepository
 from app.infrastructure.repositories.mongo_metadata_repo import MongoMetadataRepo
+from app.infrastructure.repositories.mongo_practice_lease_repo import MongoPracticeLeaseRepo
 from app.infrastructure.repositories.mysql_musical_error_repo import MySQLMusicalErrorRepository
 from app.infrastructure.repositories.mysql_postural_error_repo import MySQLPosturalErrorRepository
 from app.infrastructure.repositories.mysql_practice_repo import MySQLPracticeRepository
+from app.infrastructure.repositories.mysql_progress_repo import MySQLProgressRepository
+from app.infrastructure.repositories.mysql_student_repo import MySQLStudentRepository
+from app.infrastructure.repositories.sqlite_job_journal import SQLiteJobJournal
+from app.infrastructure.repositories.write_behind import (
+    WriteBehindBuffer,
+    WriteBehindMetadataRepo,
+    WriteBehindPracticeRepository,
+)
+from app.infrastructure.storage.backends import create_storage_repos
+from app.shared.cache import LRUTTLCache
+from app.shared.constants import COST_FALLBACK_POSTURAL_ERRORS
+from app.shared.enums import ReportFormat, ReportMode
+from app.shared.utils import StageDeadlines, with_deadline
 
 logger = logging.getLogger(__name__)
 
-MAX_CONCURRENT_PDFS = 3
-semaphore = asyncio.Semaphore(MAX_CONCURRENT_PDFS)
+# Bound on reading a partition's fetch position when checking whether the consumer caught up
+POSITION_TIMEOUT_SECONDS = 5
+
+MESSAGES_TOTAL = metrics.counter("kafka_messages_total", "Consumed report requests by result", ["result"])
+CONSUMER_LAG = metrics.gauge(
+    "kafka_consumer_lag_messages", "Messages behind the high watermark, per partition", ["topic", "partition"]
+)
+MESSAGES_IN_FLIGHT = metrics.gauge("kafka_messages_in_flight", "Messages dispatched but not yet committed")
+SCHEDULER_RUNNING = metrics.gauge("report_scheduler_running", "Report jobs running in the scheduler")
+SCHEDULER_PENDING = metrics.gauge("report_scheduler_pending", "Report jobs waiting for admission")
+SCHEDULER_MEMORY = metrics.gauge(
+    "report_scheduler_memory_in_flight_bytes", "Estimated memory of the report jobs currently running"
+)
+
+
+def _report_mode_for(consumer: AIOKafkaConsumer, msg, lag_policy: LagDegradationPolicy) -> ReportMode:
+    """Pick the report detail level from the record age and the partition offset lag."""
+    record_age = time.time() - msg.timestamp / 1000 if msg.timestamp and msg.timestamp > 0 else None
+
+    highwater = consumer.highwater(TopicPartition(msg.topic, msg.partition))
+    offset_lag = highwater - msg.offset - 1 if highwater is not None else None
+    if offset_lag is not None:
+        CONSUMER_LAG.set(offset_lag, topic=msg.topic, partition=msg.partition)
+
+    return lag_policy.mode_for(record_age, offset_lag)
+
+
+async def _caught_up(consumer: AIOKafkaConsumer) -> bool:
+    """Whether the fetch position of every assigned partition reached its high watermark."""
+    assignment = consumer.assignment()
+    if not assignment:
+        return False
+    for tp in assignment:
+        highwater = consumer.highwater(tp)
+        if highwater is None:
+            return False
+        try:
+            position = await asyncio.wait_for(consumer.position(tp), POSITION_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, KafkaError):
+            return False
+        if position < highwater:
+            return False
+    return True
+
+
+def _dto_from_record(value: bytes, report_mode: ReportMode, job_key: Optional[str] = None) -> PracticeDataDTO:
+    """Decode a report request record into the use case DTO."""
+    decoded = value.decode()
+    logger.debug("Received raw message: %s", decoded)
+
+    data = json.loads(decoded)
+    kafka_msg = KafkaMessage(**data)
+
+    return PracticeDataDTO(
+        uid=kafka_msg.uid,
+        practice_id=kafka_msg.practice_id,
+        date=kafka_msg.date,
+        time=kafka_msg.time,
+        scale=kafka_msg.scale,
+        scale_type=kafka_msg.scale_type,
+        num_postural_errors=0,  # Placeholder, replace with actual data if available
+        num_musical_errors=0,   # Placeholder, replace with actual data if available
+        duration=kafka_msg.duration,
+        bpm=kafka_msg.bpm,
+        figure=kafka_msg.figure,
+        octaves=kafka_msg.octaves,
+        report_mode=report_mode,
+        job_key=job_key,
+    )
+
+
+def _job_key(topic: str, partition: int, offset: int) -> str:
+    """Identifies a delivery in the job journal."""
+    return f"{topic}-{partition}-{offset}"
+
+
+def _preload_heavy_modules():
+    """Load the rendering libraries off the loop, so the first report does not pay for the imports."""
+    start = time.perf_counter()
+    try:
+        local_pdf_repo.preload()
+        local_video_repo.preload()
+        logger.info("Rendering libraries preloaded in %.2fs", time.perf_counter() - start)
+    except Exception as e:
+        logger.warning("Could not preload rendering libraries: %s", e)
+
 
 async def start_kafka_consumer():
     metadata_repo = MongoMetadataRepo()
     postural_error_repo = MySQLPosturalErrorRepository()
     musical_error_repo = MySQLMusicalErrorRepository()
     practice_repo = MySQLPracticeRepository()
-    pdf_repo = LocalPDFRepository()
-    video_repo = LocalVideoRepository()
+    journal_repo = None
+    screenshots_dir = None
+    if settings.JOB_JOURNAL_ENABLED:
+        journal_repo = SQLiteJobJournal(os.path.join(settings.JOB_JOURNAL_DIR, "jobs.sqlite3"))
+        screenshots_dir = os.path.join(settings.JOB_JOURNAL_DIR, "screenshots")
+    pdf_repo, video_repo, s3_client = create_storage_repos(screenshots_dir)
+    student_repo = CachedStudentRepository(
+        MySQLStudentRepository(),
+        LRUTTLCache(settings.STUDENT_CACHE_MAX_SIZE, settings.STUDENT_CACHE_TTL_SECONDS, name="student"),
+    )
+
+    write_behind = None
+    if settings.WRITE_BEHIND_ENABLED:
+        write_behind = WriteBehindBuffer(
+            practice_repo,
+            metadata_repo,
+            flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000,
+            max_batch=settings.WRITE_BEHIND_MAX_BATCH,
+        )
+        metadata_repo = WriteBehindMetadataRepo(metadata_repo, write_behind)
+        practice_repo = WriteBehindPracticeRepository(practice_repo, write_behind)
     
     metadata_service = MetadataPracticeService(metadata_repo)
     postural_error_service = PosturalErrorService(postural_error_repo)
     musical_error_service = MusicalErrorService(musical_error_repo)
     practice_service = PracticeService(practice_repo)
-    pdf_service = PDFService(pdf_repo, video_repo)
+    student_service = StudentService(student_repo)
+    journal_service = JobJournalService(journal_repo) if journal_repo else None
+    lease_service = None
+    if settings.REPORT_LEASE_ENABLED:
+        lease_service = PracticeLeaseService(
+            MongoPracticeLeaseRepo(), f"{socket.gethostname()}-{os.getpid()}", settings.REPORT_LEASE_TTL_SECONDS
+        )
+
+    deadlines = StageDeadlines(
+        readiness=settings.STAGE_TIMEOUT_READINESS_SECONDS,
+        db=settings.STAGE_TIMEOUT_DB_SECONDS,
+        extraction=settings.STAGE_TIMEOUT_EXTRACTION_SECONDS,
+        render=settings.STAGE_TIMEOUT_RENDER_SECONDS,
+        save=settings.STAGE_TIMEOUT_SAVE_SECONDS,
+    )
+    output_formats = ReportFormat.parse_list(settings.REPORT_OUTPUT_FORMATS)
+    keep_documents = output_formats != PDF_ONLY or settings.REPORT_INCREMENTAL_ENABLED
+    document_repo = LocalReportDocumentRepository() if keep_documents else None
+    pdf_service = PDFService(pdf_repo, video_repo, deadlines, document_repo)
 
     use_case = GeneratePDFUseCase(
         metadata_service,
         postural_error_service,
         musical_error_service,
         practice_service,
+        student_service,
         pdf_service,
+        deadlines,
+        journal_service=journal_service,
+        lease_service=lease_service,
+        output_formats=output_formats,
+    )
+
+    cost_estimator = CostEstimatorService(postural_error_repo, musical_error_repo, video_repo)
+    scheduler = ReportScheduler(
+        max_concurrency=settings.SCHEDULER_MAX_CONCURRENCY,
+        memory_budget_bytes=settings.SCHEDULER_MEMORY_BUDGET_MB * 1024 * 1024,
+        max_wait_seconds=settings.SCHEDULER_MAX_WAIT_SECONDS,
+    )
+    # Bounds the messages read ahead of the scheduler (estimating or waiting for admission)
+    queued = asyncio.Semaphore(settings.SCHEDULER_MAX_QUEUED)
+    SCHEDULER_RUNNING.set_function(lambda: scheduler.running)
+    SCHEDULER_PENDING.set_function(lambda: scheduler.pending)
+    SCHEDULER_MEMORY.set_function(lambda: scheduler.memory_in_flight)
+
+    lag_policy = LagDegradationPolicy(
+        text_only_seconds=settings.DEGRADE_TEXT_ONLY_LAG_SECONDS,
+        summary_seconds=settings.DEGRADE_SUMMARY_LAG_SECONDS,
+        text_only_messages=settings.DEGRADE_TEXT_ONLY_LAG_MESSAGES,
+        summary_messages=settings.DEGRADE_SUMMARY_LAG_MESSAGES,
+        idle_reset_seconds=settings.DEGRADE_IDLE_RESET_SECONDS,
+    )
+
+    async def is_lagging() -> bool:
+        # Only called by the upgrader, once the consumer below exists
+        if lag_policy.lagging and await _caught_up(consumer):
+            lag_policy.caught_up()
+        return lag_policy.lagging
+
+    upgrader = DegradedReportUpgrader(
+        scheduler,
+        cost_estimator,
+        use_case.execute,
+        is_lagging,
+        interval_seconds=settings.DEGRADE_UPGRADE_INTERVAL_SECONDS,
+        max_queued=settings.DEGRADE_UPGRADE_MAX_QUEUED,
+        metadata_service=metadata_service,
+        practice_service=practice_service,
+    )
+
+    # Progress reports share the scheduler as well; cheap, they start ahead of heavy practices
+    progress_service = ProgressReportService(MySQLProgressRepository(), settings.PROGRESS_REPORT_TOP_N)
+    progress_use_case = GenerateProgressReportUseCase(progress_service, student_service, pdf_service, deadlines)
+
+    def run_progress_report(request):
+        return scheduler.submit(
+            PROGRESS_REPORT_COST, lambda: progress_use_case.execute(request), key=("progress", request.uid)
+        )
+
+    progress_scheduler = None
+    if settings.PROGRESS_REPORT_SCHEDULE_ENABLED:
+        progress_scheduler = ProgressReportScheduler(
+            scheduler,
+            progress_service,
+            pdf_service,
+            progress_use_case.execute,
+            period_days=settings.PROGRESS_REPORT_PERIOD_DAYS,
+            interval_seconds=settings.PROGRESS_REPORT_SCHEDULE_INTERVAL_HOURS * 3600,
+        )
+
+    # On-demand requests share the scheduler, so they queue with the Kafka jobs
+    fetch_report = FetchReportUseCase(
+        metadata_service,
+        practice_service,
+        pdf_service,
+        scheduler,
+        cost_estimator,
+        use_case.execute,
+        deadlines,
+        output_formats,
     )
 
     consumer = AIOKafkaConsumer(
-        settings.KAFKA_INPUT_TOPIC,
         bootstrap_servers=settings.KAFKA_BROKER,
         enable_auto_commit=False,
         auto_offset_reset=settings.KAFKA_AUTO_OFFSET_RESET,
         group_id=settings.KAFKA_GROUP_ID,
+        partition_assignment_strategy=assignment_strategy(settings.KAFKA_PARTITION_ASSIGNMENT_STRATEGY),
+        # Without it the rebalance timeout is the 10s session timeout, shorter than a drain
+        rebalance_timeout_ms=int(settings.KAFKA_REBALANCE_TIMEOUT_SECONDS * 1000),
     )
+    tracker = InFlightTracker()
+
+    async def commit_offsets(partitions=None):
+        """Commit each partition up to its lowest unfinished offset, then drop the journal entries covered."""
+        # Buffered writes must be stored before the offsets covering them are committed
+        if write_behind:
+            await write_behind.flushed()
+        pending = tracker.pending_commits(partitions)
+        if not pending:
+            return
+        await consumer.commit({tp: covered.stop for tp, covered in pending.items()})
+        tracker.committed(pending)
+        if journal_service:
+            for tp, covered in pending.items():
+                for offset in covered:
+                    await journal_service.forget(_job_key(tp.topic, tp.partition, offset))
+
+    rebalance_listener = DrainingRebalanceListener(
+        tracker,
+        commit_offsets,
+        drain_timeout_within(settings.KAFKA_REBALANCE_DRAIN_TIMEOUT_SECONDS, settings.KAFKA_REBALANCE_TIMEOUT_SECONDS),
+    )
+    consumer.subscribe([settings.KAFKA_INPUT_TOPIC], listener=rebalance_listener)
 
     try:
         await consumer.start()
         logger.info("Kafka consumer started")
     except Exception as e:
-        logger.error(f"Error starting Kafka consumer: {e}", exc_info=True)
+        logger.error("Error starting Kafka consumer: %s", e, exc_info=True)
         return
+    startup.mark("consumer_started")
+
+    if journal_repo:
+        try:
+            await journal_repo.prune(settings.JOB_JOURNAL_RETENTION_HOURS * 3600)
+        except Exception as e:
+            logger.warning("Could not prune the job journal: %s", e)
     
-    tasks = []
+    api_server = None
+    if settings.REPORT_API_ENABLED and not settings.REPORT_API_TOKEN:
+        logger.warning("Report API enabled without REPORT_API_TOKEN, not starting it")
+    elif settings.REPORT_API_ENABLED:
+        api_server = HttpServer(settings.REPORT_API_HOST, settings.REPORT_API_PORT, name="Report API")
+        ReportApi(
+            fetch_report,
+            settings.REPORT_API_TOKEN,
+            settings.REPORT_API_WAIT_SECONDS,
+            settings.REPORT_API_MAX_WAIT_SECONDS,
+        ).register(api_server)
+        try:
+            await api_server.start()
+        except OSError as e:
+            logger.warning("Could not start report API on port %s: %s", settings.REPORT_API_PORT, e)
+            api_server = None
+
+    tasks = set()
+    preload_task = None
+    if settings.PRELOAD_HEAVY_MODULES:
+        # After joining the group, so it does not delay readiness
+        preload_task = asyncio.create_task(asyncio.to_thread(_preload_heavy_modules))
+    MESSAGES_IN_FLIGHT.set_function(lambda: len(tasks))
+    upgrader_task = asyncio.create_task(upgrader.run())
+    write_behind_task = asyncio.create_task(write_behind.run()) if write_behind else None
+    invalidation_task = None
+    if settings.KAFKA_STUDENT_INVALIDATION_TOPIC:
+        invalidation_task = asyncio.create_task(start_student_invalidation_consumer(student_repo))
+    progress_tasks = []
+    if settings.KAFKA_PROGRESS_REPORT_TOPIC:
+        progress_tasks.append(asyncio.create_task(start_progress_report_consumer(run_progress_report)))
+    if progress_scheduler:
+        progress_tasks.append(asyncio.create_task(progress_scheduler.run()))
     try:
         logger.info("Kafka consumer started")
 
-        async def process_message(dto: PracticeDataDTO):
-            async with semaphore:
+        async def process_message(dto: PracticeDataDTO, tp: TopicPartition, offset: int):
+            start = time.perf_counter()
+            result = "failed"
+            try:
                 try:
-                    pdf = await use_case.execute(dto)
-                    logger.info(f"Processed KafkaMessage with PDF in {pdf}")
-                    await consumer.commit()
+                    cost = await with_deadline(
+                        cost_estimator.estimate(dto.uid, dto.practice_id), deadlines.db, "estimate"
+                    )
                 except Exception as e:
-                    logger.error(f"Error processing message in background: {e}", exc_info=True)
+                    logger.warning("Could not estimate cost for practice %s, using fallback: %s", dto.practice_id, e)
+                    cost = CostEstimatorService.compute(COST_FALLBACK_POSTURAL_ERRORS, 0, None)
+
+                while True:
+                    try:
+                        pdf = await scheduler.submit(cost, lambda: use_case.execute(dto), key=dto.practice_id)
+                        break
+                    except PracticeLeasedException as e:
+                        # Another replica is generating it, maybe from older analyses: this
+                        # request waits for the lease instead of being committed away
+                        logger.info("%s, retrying in %ss", e.message, settings.REPORT_LEASE_RETRY_SECONDS)
+                        await asyncio.sleep(settings.REPORT_LEASE_RETRY_SECONDS)
+                logger.info("Processed KafkaMessage with PDF in %s", pdf)
+
+                tracker.finish(tp, offset)
+                await commit_offsets([tp])
+                result = "processed"
 
+                if dto.report_mode.degraded and cost.renders:
+                    upgrader.enqueue(dto)
+            except asyncio.CancelledError:
+                # Its partition was revoked and assigned to another consumer
+                result = "revoked"
+                raise
+            except Exception as e:
+                logger.error("Error processing message in background: %s", e, exc_info=True)
+            finally:
+                tracker.finish(tp, offset)
+                queued.release()
+                MESSAGES_TOTAL.inc(result=result)
+                metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="kafka_message")
+
+        first_message = True
         async for msg in consumer:
+            if first_message:
+                first_message = False
+                startup.mark("first_message")
+                startup.check_budget("first_message", settings.STARTUP_BUDGET_SECONDS)
+            tp = TopicPartition(msg.topic, msg.partition)
+            if tracker.dispatched(tp, msg.offset):
+                logger.debug("Skipping redelivered offset %s of %s, already dispatched", msg.offset, tp)
+                continue
             try:
-                decoded = msg.value.decode()
-                logger.info(f"Received raw message: {decoded}")
-
-                data = json.loads(decoded)
-                kafka_msg = KafkaMessage(**data)
-
-                dto = PracticeDataDTO(
-                    uid=kafka_msg.uid,
-                    practice_id=kafka_msg.practice_id,
-                    date=kafka_msg.date,
-                    time=kafka_msg.time,
-                    scale=kafka_msg.scale,
-                    scale_type=kafka_msg.scale_type,
-                    num_postural_errors=0,  # Placeholder, replace with actual data if available
-                    num_musical_errors=0,   # Placeholder, replace with actual data if available
-                    duration=kafka_msg.duration,
-                    bpm=kafka_msg.bpm,
-                    figure=kafka_msg.figure,
-                    octaves=kafka_msg.octaves,
-                )
-
-                # Crear la tarea y guardarla en la lista
-                task = asyncio.create_task(process_message(dto))
-                tasks.append(task)
+                # The task copies this context, so its records carry the same fields
+                with bind_log_context(partition=msg.partition, offset=msg.offset):
+                    dto = _dto_from_record(
+                        msg.value,
+                        _report_mode_for(consumer, msg, lag_policy),
+                        job_key=_job_key(msg.topic, msg.partition, msg.offset),
+                    )
+
+                    # Esperar hueco en la cola antes de leer más mensajes
+                    await queued.acquire()
+
+                    # The partition may have been revoked while waiting; its next owner reads the record again
+                    if not tracker.accepts(tp) or tp not in consumer.assignment():
+                        queued.release()
+                        continue
+
+                    # Crear la tarea y guardarla en el conjunto
+                    with bind_log_context(practice_id=dto.practice_id, uid=dto.uid):
+                        task = asyncio.create_task(process_message(dto, tp, msg.offset))
+                    tracker.start(tp, msg.offset, task)
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
 
             except Exception as e:
-                logger.error(f"Error processing message: {e}", exc_info=True)
+                MESSAGES_TOTAL.inc(result="invalid")
+                logger.error("Error processing message: %s", e, exc_info=True)
 
     finally:
+        if api_server:
+            await api_server.close()
+        upgrader_task.cancel()
+        if invalidation_task:
+            invalidation_task.cancel()
+        for progress_task in progress_tasks:
+            progress_task.cancel()
+        await asyncio.gather(*progress_tasks, return_exceptions=True)
+        # The rebalance listener is not called on stop, so the partitions are released here
+        await rebalance_listener.release(list(consumer.assignment()))
         await consumer.stop()
         logger.info("Kafka consumer stopped")
 
@@ -111,3 +468,17 @@ async def start_kafka_consumer():
             logger.info("Waiting for all background tasks to finish...")
             await asyncio.gather(*tasks)  # Espera que todas las tareas terminen
             logger.info("All background tasks finished.")
+
+        if preload_task:
+            await asyncio.gather(preload_task, return_exceptions=True)
+
+        if write_behind_task:
+            # Cancelling the flusher stores whatever is still buffered
+            write_behind_task.cancel()
+            await asyncio.gather(write_behind_task, return_exceptions=True)
+
+        if journal_repo:
+            journal_repo.close()
+
+        if s3_client:
+            await s3_client.close()
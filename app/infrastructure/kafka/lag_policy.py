@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Callable, Optional
+from app.shared.enums import ReportMode
+
+logger = logging.getLogger(__name__)
+
+
+class LagDegradationPolicy:
+    """
+    Chooses the report detail level from how far behind the consumer is.
+
+    Lag is measured both as record age (now - record timestamp) and as offset
+    lag (partition end offset - record offset); the more severe mode wins.
+    A threshold of 0 disables that check.
+
+    Lag is cleared once the consumer has caught up with the end of its
+    partitions (``caught_up``) or after ``idle_reset_seconds`` without records,
+    so a drained backlog on an idle topic does not leave it lagging.
+    """
+
+    def __init__(
+        self,
+        text_only_seconds: float,
+        summary_seconds: float,
+        text_only_messages: int,
+        summary_messages: int,
+        idle_reset_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.text_only_seconds = text_only_seconds
+        self.summary_seconds = summary_seconds
+        self.text_only_messages = text_only_messages
+        self.summary_messages = summary_messages
+        self.idle_reset_seconds = idle_reset_seconds
+        self.clock = clock
+        self._last_mode = ReportMode.FULL
+        self._last_evaluated_at = clock()
+
+    @property
+    def lagging(self) -> bool:
+        """Whether the last evaluated record was above any degradation threshold, and records are still coming."""
+        if not self._last_mode.degraded:
+            return False
+        if self.idle_reset_seconds > 0 and self.clock() - self._last_evaluated_at >= self.idle_reset_seconds:
+            self.caught_up()
+            return False
+        return True
+
+    def caught_up(self):
+        """The consumer reached the end of its partitions: no lag until a lagging record is seen again."""
+        if self._last_mode.degraded:
+            logger.info("Consumer caught up, report mode back to %s", ReportMode.FULL.value)
+        self._last_mode = ReportMode.FULL
+
+    def mode_for(self, record_age_seconds: Optional[float], offset_lag: Optional[int]) -> ReportMode:
+        mode = ReportMode.FULL
+
+        if record_age_seconds is not None:
+            mode = self._worst(mode, self._mode_for_value(
+                record_age_seconds, self.text_only_seconds, self.summary_seconds
+            ))
+        if offset_lag is not None:
+            mode = self._worst(mode, self._mode_for_value(
+                offset_lag, self.text_only_messages, self.summary_messages
+            ))
+
+        if mode is not self._last_mode:
+            logger.warning(
+                "Report mode changed from %s to %s (record age: %ss, offset lag: %s)",
+                self._last_mode.value, mode.value, record_age_seconds, offset_lag,
+            )
+        self._last_mode = mode
+        self._last_evaluated_at = self.clock()
+        return mode
+
+    @staticmethod
+    def _mode_for_value(value: float, text_only_threshold: float, summary_threshold: float) -> ReportMode:
+        if summary_threshold > 0 and value >= summary_threshold:
+            return ReportMode.SUMMARY
+        if text_only_threshold > 0 and value >= text_only_threshold:
+            return ReportMode.TEXT_ONLY
+        return ReportMode.FULL
+
+    @staticmethod
+    def _worst(a: ReportMode, b: ReportMode) -> ReportMode:
+        return a if a.severity >= b.severity else b
@@ -0,0 +1,64 @@
+import json
+import logging
+from datetime import date
+from typing import Any, Awaitable, Callable
+from aiokafka import AIOKafkaConsumer
+from app.application.dto.progress_report_dto import ProgressReportDTO
+from app.core.config import settings
+from app.domain.services.progress_report_service import ProgressReportService
+
+logger = logging.getLogger(__name__)
+
+
+def _request_from_record(value: bytes, today: date, period_days: int) -> ProgressReportDTO:
+    """Decode a progress report request; without dates it covers the last complete period."""
+    data = json.loads(value.decode())
+    date_from, date_to = ProgressReportService.last_period(today, period_days)
+    if data.get("date_from") or data.get("date_to"):
+        date_from = date.fromisoformat(data["date_from"])
+        date_to = date.fromisoformat(data["date_to"])
+    if date_from > date_to:
+        raise ValueError(f"date_from {date_from} is after date_to {date_to}")
+    return ProgressReportDTO(uid=data["uid"], date_from=date_from, date_to=date_to)
+
+
+async def start_progress_report_consumer(run_report: Callable[[ProgressReportDTO], Awaitable[Any]]):
+    """
+    Generate progress reports on request.
+
+    Messages are JSON objects with a ``uid`` and optionally ``date_from`` and
+    ``date_to`` (ISO dates, inclusive). The consumer has its own group, so each
+    request is handled by one replica; requests are processed one at a time and
+    committed once handled, failed ones included.
+    """
+    consumer = AIOKafkaConsumer(
+        settings.KAFKA_PROGRESS_REPORT_TOPIC,
+        bootstrap_servers=settings.KAFKA_BROKER,
+        enable_auto_commit=False,
+        auto_offset_reset=settings.KAFKA_AUTO_OFFSET_RESET,
+        group_id=f"{settings.KAFKA_GROUP_ID}-progress",
+    )
+
+    try:
+        await consumer.start()
+        logger.info("Progress report consumer started")
+    except Exception as e:
+        logger.error("Error starting progress report consumer: %s", e, exc_info=True)
+        return
+
+    try:
+        async for msg in consumer:
+            try:
+                request = _request_from_record(msg.value, date.today(), settings.PROGRESS_REPORT_PERIOD_DAYS)
+            except Exception as e:
+                logger.warning("Ignoring invalid progress report request: %s", e)
+            else:
+                try:
+                    pdf_path = await run_report(request)
+                    logger.info("Progress report for uid=%s saved at %s", request.uid, pdf_path)
+                except Exception as e:
+                    logger.error("Error generating progress report for uid=%s: %s", request.uid, e, exc_info=True)
+            await consumer.commit()
+    finally:
+        await consumer.stop()
+        logger.info("Progress report consumer stopped")
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Set
+from aiokafka import ConsumerRebalanceListener, TopicPartition
+from aiokafka.coordinator.assignors.range import RangePartitionAssignor
+from aiokafka.coordinator.assignors.roundrobin import RoundRobinPartitionAssignor
+from aiokafka.coordinator.assignors.sticky.sticky_assignor import StickyPartitionAssignor
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+REBALANCES_TOTAL = metrics.counter("kafka_rebalances_total", "Partition rebalance callbacks by event", ["event"])
+ABANDONED_JOBS_TOTAL = metrics.counter(
+    "kafka_rebalance_abandoned_jobs_total", "In-flight jobs cancelled because their partition moved to another consumer"
+)
+
+# aiokafka only implements the eager rebalance protocol. The sticky assignor keeps
+# most partitions where they were, which lets jobs of partitions that come back
+# keep running across the rebalance (see DrainingRebalanceListener).
+ASSIGNORS = {
+    "sticky": StickyPartitionAssignor,
+    "roundrobin": RoundRobinPartitionAssignor,
+    "range": RangePartitionAssignor,
+}
+
+
+# Part of the rebalance timeout kept for the commit after a drain: flushing the
+# write-behind buffer and committing the offsets of the revoked partitions
+DRAIN_COMMIT_MARGIN_SECONDS = 10.0
+
+
+def drain_timeout_within(drain_timeout: float, rebalance_timeout: float) -> float:
+    """
+    Drain timeout that leaves DRAIN_COMMIT_MARGIN_SECONDS of the rebalance timeout
+    for the commit. A member still in on_partitions_revoked past the rebalance
+    timeout is evicted, and the partitions it drained are rebalanced again and
+    rendered twice, so a longer (or unbounded, 0) drain timeout is clamped.
+    """
+    limit = rebalance_timeout - DRAIN_COMMIT_MARGIN_SECONDS
+    if limit <= 0:
+        raise ValueError(
+            f"Rebalance timeout of {rebalance_timeout}s leaves no time to drain "
+            f"after the {DRAIN_COMMIT_MARGIN_SECONDS}s kept for the commit"
+        )
+    if drain_timeout <= 0 or drain_timeout > limit:
+        logger.warning(
+            "Rebalance drain timeout of %ss does not fit in the %ss rebalance timeout, clamped to %ss",
+            drain_timeout, rebalance_timeout, limit,
+        )
+        return limit
+    return drain_timeout
+
+
+def assignment_strategy(name: str) -> tuple:
+    """Assignors for the consumer partition_assignment_strategy setting."""
+    if name == "cooperative-sticky":
+        logger.warning("Cooperative rebalancing is not supported by the Kafka client, using sticky assignment")
+        name = "sticky"
+    if name not in ASSIGNORS:
+        raise ValueError(f"Unknown partition assignment strategy: {name}")
+    return (ASSIGNORS[name],)
+
+
+class InFlightTracker:
+    """
+    Offsets dispatched per partition and the jobs processing them.
+
+    Jobs finish out of order, so the committable offset of a partition is its
+    lowest unfinished offset (or the next one when all finished): committing
+    further would skip jobs that are still running if the process dies.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[TopicPartition, Dict[int, asyncio.Task]] = {}
+        self._next_offset: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        self._paused: Set[TopicPartition] = set()
+
+    def accepts(self, tp: TopicPartition) -> bool:
+        """Whether new work may start for the partition (not being revoked)."""
+        return tp not in self._paused
+
+    def dispatched(self, tp: TopicPartition, offset: int) -> bool:
+        """
+        Whether the offset was already dispatched. After a rebalance the consumer
+        fetches a kept partition again from its committed offset, which would
+        start a second run of jobs still in flight or finished but not committed.
+        """
+        return offset < self._next_offset.get(tp, 0)
+
+    def start(self, tp: TopicPartition, offset: int, task: asyncio.Task):
+        # The first dispatched offset is where the group had committed up to
+        self._committed.setdefault(tp, offset)
+        self._in_flight.setdefault(tp, {})[offset] = task
+        self._next_offset[tp] = max(self._next_offset.get(tp, 0), offset + 1)
+
+    def finish(self, tp: TopicPartition, offset: int):
+        self._in_flight.get(tp, {}).pop(offset, None)
+
+    def tasks(self, partitions: Iterable[TopicPartition]) -> List[asyncio.Task]:
+        return [task for tp in partitions for task in self._in_flight.get(tp, {}).values()]
+
+    def partitions(self) -> Set[TopicPartition]:
+        return set(self._next_offset)
+
+    def pending_commits(self, partitions: Iterable[TopicPartition] = None) -> Dict[TopicPartition, range]:
+        """Offsets that became committable since the last commit, per partition."""
+        pending = {}
+        for tp in (self.partitions() if partitions is None else partitions):
+            if tp not in self._next_offset:
+                continue
+            in_flight = self._in_flight.get(tp)
+            watermark = min(in_flight) if in_flight else self._next_offset[tp]
+            if watermark > self._committed[tp]:
+                pending[tp] = range(self._committed[tp], watermark)
+        return pending
+
+    def committed(self, offsets: Dict[TopicPartition, range]):
+        for tp, covered in offsets.items():
+            if tp in self._committed:
+                self._committed[tp] = max(self._committed[tp], covered.stop)
+
+    def pause(self, partitions: Iterable[TopicPartition]):
+        self._paused.update(partitions)
+
+    def resume(self, partitions: Iterable[TopicPartition]):
+        self._paused.difference_update(partitions)
+
+    def drop(self, tp: TopicPartition) -> List[asyncio.Task]:
+        """Forget a partition no longer owned, returning its unfinished jobs."""
+        self._next_offset.pop(tp, None)
+        self._committed.pop(tp, None)
+        self._paused.discard(tp)
+        return list(self._in_flight.pop(tp, {}).values())
+
+
+class DrainingRebalanceListener(ConsumerRebalanceListener):
+    """
+    Hands partitions over cleanly on a rebalance.
+
+    On revocation no new work is admitted for the partitions, their in-flight jobs
+    get up to drain_timeout seconds to finish and the finished offsets are
+    committed, so the next owner starts after them instead of rendering again.
+    Jobs still running past the timeout keep going; once the new assignment is
+    known they are cancelled only if their partition went to another consumer.
+    """
+
+    def __init__(
+        self,
+        tracker: InFlightTracker,
+        commit: Callable[[Iterable[TopicPartition]], Awaitable[None]],
+        drain_timeout: float,
+    ):
+        self.tracker = tracker
+        self.commit = commit
+        self.drain_timeout = drain_timeout
+
+    async def on_partitions_revoked(self, revoked: List[TopicPartition]):
+        REBALANCES_TOTAL.inc(event="revoked")
+        if revoked:
+            await self.release(revoked)
+
+    async def on_partitions_assigned(self, assigned: List[TopicPartition]):
+        REBALANCES_TOTAL.inc(event="assigned")
+        for tp in self.tracker.partitions() - set(assigned):
+            abandoned = [task for task in self.tracker.drop(tp) if not task.done()]
+            if abandoned:
+                logger.warning("Partition %s moved to another consumer, cancelling %s jobs", tp, len(abandoned))
+                ABANDONED_JOBS_TOTAL.inc(len(abandoned))
+            for task in abandoned:
+                task.cancel()
+        self.tracker.resume(assigned)
+        logger.info("Partitions assigned: %s", sorted(f"{tp.topic}-{tp.partition}" for tp in assigned))
+
+    async def release(self, partitions: List[TopicPartition]):
+        """Stop admitting work for the partitions, drain their jobs within the timeout and commit."""
+        self.tracker.pause(partitions)
+        start = time.perf_counter()
+        tasks = self.tracker.tasks(partitions)
+        pending = set()
+        if tasks:
+            logger.info("Draining %s in-flight jobs of partitions %s", len(tasks), partitions)
+            _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout or None)
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="rebalance_drain")
+
+        try:
+            await self.commit(partitions)
+        except Exception as e:
+            logger.warning("Could not commit offsets of revoked partitions: %s", e)
+        if pending:
+            logger.warning("%s jobs still running after the %ss drain timeout", len(pending), self.drain_timeout)
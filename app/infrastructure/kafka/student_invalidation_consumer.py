@@ -0,0 +1,42 @@
+import json
+import logging
+from aiokafka import AIOKafkaConsumer
+from app.core.config import settings
+from app.infrastructure.repositories.cached_student_repo import CachedStudentRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def start_student_invalidation_consumer(student_repo: CachedStudentRepository):
+    """
+    Drop cached students when their profile changes.
+
+    Messages are JSON objects with a ``uid``. The consumer has no group, so every
+    replica receives every invalidation, and starts from the latest offset since
+    older changes are already covered by the cache TTL.
+    """
+    consumer = AIOKafkaConsumer(
+        settings.KAFKA_STUDENT_INVALIDATION_TOPIC,
+        bootstrap_servers=settings.KAFKA_BROKER,
+        enable_auto_commit=False,
+        auto_offset_reset="latest",
+        group_id=None,
+    )
+
+    try:
+        await consumer.start()
+        logger.info("Student invalidation consumer started")
+    except Exception as e:
+        logger.error("Error starting student invalidation consumer: %s", e, exc_info=True)
+        return
+
+    try:
+        async for msg in consumer:
+            try:
+                uid = json.loads(msg.value.decode())["uid"]
+                student_repo.invalidate(uid)
+            except Exception as e:
+                logger.warning("Ignoring invalid student invalidation message: %s", e)
+    finally:
+        await consumer.stop()
+        logger.info("Student invalidation consumer stopped")
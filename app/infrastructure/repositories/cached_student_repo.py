@@ -0,0 +1,24 @@
+import logging
+from typing import Optional
+from app.domain.entities.student import Student
+from app.domain.repositories.i_student_repo import IStudentRepo
+from app.shared.cache import LRUTTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStudentRepository(IStudentRepo):
+    """Read-through LRU/TTL cache in front of another IStudentRepo."""
+
+    def __init__(self, student_repo: IStudentRepo, cache: LRUTTLCache[str, Student]):
+        self.student_repo = student_repo
+        self.cache = cache
+
+    async def get_by_uid(self, uid: str) -> Optional[Student]:
+        # Unknown students are not cached, so they show up as soon as they are created.
+        # Reports of one student arriving together share a single query.
+        return await self.cache.get_or_load(uid, lambda: self.student_repo.get_by_uid(uid))
+
+    def invalidate(self, uid: str):
+        if self.cache.invalidate(uid):
+            logger.debug("Invalidated cached student uid=%s", uid)
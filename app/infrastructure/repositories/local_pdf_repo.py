@@ -1,22 +1,39 @@
 import os
 import aiofiles
+import aiofiles.os
 import logging
 import tempfile
-from typing import List, Dict
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import Image as RLImage
+import time
+import uuid
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+from app.core import metrics
 from app.domain.repositories.i_pdf_repo import IPDFRepo
-from app.domain.entities.practice import Practice
-from app.domain.entities.postural_error import PosturalError
-from app.domain.entities.musical_error import MusicalError
-from app.shared.enums import Figure
+from app.domain.entities.practice import Practice, report_title
+from app.domain.entities.progress_report import ProgressReport, ProgressTrend
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.shared.enums import Figure, ReportMode
+
+# ReportLab is imported inside the rendering methods: it is only needed once a
+# report is rendered, not to start the consumer
+if TYPE_CHECKING:
+    from reportlab.platypus import Table
 
 logger = logging.getLogger(__name__)
 
+# Rows listed per section in summary reports
+SUMMARY_TOP_N = 5
+
+# Read size when streaming a saved report
+READ_CHUNK_BYTES = 64 * 1024
+
+def preload():
+    """Import the ReportLab modules used to render reports ahead of the first report (blocking)."""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate  # noqa: F401
+
+    getSampleStyleSheet()
+
+
 class LocalPDFRepository(IPDFRepo):
     """Concrete implementation of IPDFRepo using local file system."""
 
@@ -24,27 +41,21 @@ class LocalPDFRepository(IPDFRepo):
         self.base_dir = base_dir or os.getenv("CONTAINER_PATH", "/app/storage")
         os.makedirs(self.base_dir, exist_ok=True)
 
-    def _convert_mmss_to_seconds(self, mmss: str) -> float:
-        """Convert mm:ss format to seconds."""
-        try:
-            if ':' in str(mmss):
-                parts = str(mmss).split(':')
-                minutes = int(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            else:
-                return float(mmss)
-        except (ValueError, IndexError):
-            return 0.0
-
     async def generate_pdf_content(
         self, 
         practice: Practice, 
-        postural_errors: List[PosturalError], 
-        musical_errors: List[MusicalError],
-        screenshots: Dict[int, str]
+        postural_errors: PosturalErrorBatch, 
+        musical_errors: MusicalErrorBatch,
+        screenshots: Dict[int, str],
+        mode: ReportMode = ReportMode.FULL,
+        keep_screenshots: bool = False
     ) -> bytes:
-        """Generate PDF content as bytes."""
+        """Generate PDF content as bytes, with the level of detail given by mode. Screenshots are removed unless kept."""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+        start = time.perf_counter()
         
         # Create temporary file with unique name for thread safety
         with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
@@ -57,7 +68,7 @@ class LocalPDFRepository(IPDFRepo):
             styles = getSampleStyleSheet()
             
             # Title
-            title = f"Reporte de practica: Escala {practice.scale}, {practice.scale_type}"
+            title = report_title(practice.scale, practice.scale_type)
             elements.append(Paragraph(title, styles['Title']))
             elements.append(Spacer(1, 12))
             
@@ -76,78 +87,13 @@ class LocalPDFRepository(IPDFRepo):
             """
             elements.append(Paragraph(info_text, styles['Normal']))
             elements.append(Spacer(1, 20))
-            
-            # Postural errors section
-            elements.append(Paragraph("Errores posturales:", styles['Heading2']))
-            elements.append(Spacer(1, 12))
-            
-            if postural_errors:
-                postural_table_data = [["Inicio (mm:ss)", "Fin (mm:ss)", "Duración (s)", "Tipo de Error", "Pantallazo"]]
-                
-                for i, error in enumerate(postural_errors):
-                    start_seconds = self._convert_mmss_to_seconds(error.min_sec_init)
-                    end_seconds = self._convert_mmss_to_seconds(error.min_sec_end)
-                    duration = end_seconds - start_seconds
-                    
-                    screenshot_path = screenshots.get(i)
-                    
-                    try:
-                        if screenshot_path and os.path.exists(screenshot_path):
-                            img = RLImage(screenshot_path)
-                            img.drawHeight = 1.5 * inch
-                            img.drawWidth = 2.2 * inch
-                        else:
-                            img = Paragraph("No disponible", styles['Normal'])
-                    except Exception:
-                        img = Paragraph("Error cargando imagen", styles['Normal'])
-                    
-                    postural_table_data.append([
-                        error.min_sec_init,
-                        str(error.min_sec_end),
-                        f"{duration:.1f}",
-                        Paragraph(error.explication, styles['Normal']),
-                        img
-                    ])
-                
-                postural_table = Table(postural_table_data, colWidths=[60, 60, 50, 170, 170], repeatRows=1)
-                postural_table.setStyle(TableStyle([
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 8)
-                ]))
-                
-                elements.append(postural_table)
-            else:
-                elements.append(Paragraph("No se detectaron errores posturales.", styles['Normal']))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Musical errors section
-            elements.append(Paragraph("Errores musicales:", styles['Heading2']))
-            elements.append(Spacer(1, 12))
-            
-            if musical_errors:
-                musical_table_data = [["Momento del error (mm:ss)", "Nota interpretada (incorrecta)", "Nota correcta"]]
-                
-                for error in musical_errors:
-                    musical_table_data.append([
-                        error.min_sec,
-                        error.note_played,
-                        error.note_correct
-                    ])
-                
-                musical_table = Table(musical_table_data, colWidths=[160, 160, 160], repeatRows=1)
-                musical_table.setStyle(TableStyle([
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10)
-                ]))
-                
-                elements.append(musical_table)
+
+            if mode is ReportMode.SUMMARY:
+                elements.extend(self._build_summary_sections(postural_errors, musical_errors, styles))
             else:
-                elements.append(Paragraph("No se detectaron errores musicales.", styles['Normal']))
+                elements.extend(self._build_error_sections(
+                    postural_errors, musical_errors, screenshots, styles, with_screenshots=mode is ReportMode.FULL
+                ))
             
             # Build PDF
             doc.build(elements)
@@ -159,8 +105,8 @@ class LocalPDFRepository(IPDFRepo):
             # Clean up temporary PDF file
             os.remove(temp_filename)
             
-            # Clean up screenshot files
-            for screenshot_path in screenshots.values():
+            # Clean up screenshot files (stored thumbnails are kept)
+            for screenshot_path in ({} if keep_screenshots else screenshots).values():
                 if screenshot_path and os.path.exists(screenshot_path):
                     try:
                         # Remove the screenshot file
@@ -170,7 +116,7 @@ class LocalPDFRepository(IPDFRepo):
                         if os.path.exists(parent_dir) and not os.listdir(parent_dir):
                             os.rmdir(parent_dir)
                     except Exception as e:
-                        logger.warning(f"Could not clean up screenshot {screenshot_path}: {e}")
+                        logger.warning("Could not clean up screenshot %s: %s", screenshot_path, e)
             
             return content
             
@@ -179,18 +125,306 @@ class LocalPDFRepository(IPDFRepo):
             if os.path.exists(temp_filename):
                 os.remove(temp_filename)
             raise e
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="render_content")
+
+    def _build_error_sections(
+        self,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        screenshots: Dict[int, str],
+        styles,
+        with_screenshots: bool
+    ) -> list:
+        """Full postural and musical error tables, optionally with screenshots."""
+        from reportlab.lib import colors
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Image as RLImage, Paragraph, Spacer, Table, TableStyle
+
+        elements = []
+
+        # Postural errors section
+        elements.append(Paragraph("Errores posturales:", styles['Heading2']))
+        elements.append(Spacer(1, 12))
+        
+        if len(postural_errors):
+            postural_header = ["Inicio (mm:ss)", "Fin (mm:ss)", "Duración (s)", "Tipo de Error"]
+            if with_screenshots:
+                postural_header.append("Pantallazo")
+            postural_table_data = [postural_header]
+            
+            # Durations of all rows at once, from the columns of the batch
+            rows = zip(
+                postural_errors.min_sec_init,
+                postural_errors.min_sec_end,
+                postural_errors.durations.tolist(),
+                postural_errors.explications,
+            )
+            for i, (min_sec_init, min_sec_end, duration, explication) in enumerate(rows):
+                row = [
+                    min_sec_init,
+                    str(min_sec_end),
+                    f"{duration:.1f}",
+                    Paragraph(explication, styles['Normal']),
+                ]
+
+                if with_screenshots:
+                    screenshot_path = screenshots.get(i)
+
+                    try:
+                        if screenshot_path and os.path.exists(screenshot_path):
+                            img = RLImage(screenshot_path)
+                            img.drawHeight = 1.5 * inch
+                            img.drawWidth = 2.2 * inch
+                        else:
+                            img = Paragraph("No disponible", styles['Normal'])
+                    except Exception:
+                        img = Paragraph("Error cargando imagen", styles['Normal'])
+                    row.append(img)
+
+                postural_table_data.append(row)
+
+            col_widths = [60, 60, 50, 170, 170] if with_screenshots else [70, 70, 60, 310]
+            postural_table = Table(postural_table_data, colWidths=col_widths, repeatRows=1)
+            postural_table.setStyle(TableStyle([
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8)
+            ]))
+            
+            elements.append(postural_table)
+        else:
+            elements.append(Paragraph("No se detectaron errores posturales.", styles['Normal']))
+        
+        elements.append(Spacer(1, 20))
+        
+        # Musical errors section
+        elements.append(Paragraph("Errores musicales:", styles['Heading2']))
+        elements.append(Spacer(1, 12))
+        
+        if len(musical_errors):
+            musical_table_data = [["Momento del error (mm:ss)", "Nota interpretada (incorrecta)", "Nota correcta"]]
+            
+            for min_sec, note_played, note_correct in zip(
+                musical_errors.min_sec, musical_errors.notes_played, musical_errors.notes_correct
+            ):
+                musical_table_data.append([min_sec, note_played, note_correct])
+            
+            musical_table = Table(musical_table_data, colWidths=[160, 160, 160], repeatRows=1)
+            musical_table.setStyle(TableStyle([
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10)
+            ]))
+            
+            elements.append(musical_table)
+        else:
+            elements.append(Paragraph("No se detectaron errores musicales.", styles['Normal']))
+
+        return elements
+
+    def _build_summary_sections(
+        self,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        styles
+    ) -> list:
+        """Most frequent postural and musical errors, instead of the full tables."""
+        from reportlab.platypus import Paragraph, Spacer
+
+        elements = [
+            Paragraph("Reporte resumido: se generará el reporte completo más adelante.", styles['Italic']),
+            Spacer(1, 12),
+            Paragraph("Errores posturales más frecuentes:", styles['Heading2']),
+            Spacer(1, 12),
+        ]
+
+        # Counted over the interned codes, not row by row
+        explications = postural_errors.most_common_explications(SUMMARY_TOP_N)
+        if explications:
+            table_data = [["Tipo de Error", "Veces"]]
+            for explication, count in explications:
+                table_data.append([Paragraph(explication or "", styles['Normal']), str(count)])
+            elements.append(self._summary_table(table_data, [380, 80]))
+        else:
+            elements.append(Paragraph("No se detectaron errores posturales.", styles['Normal']))
+
+        elements.append(Spacer(1, 20))
+        elements.append(Paragraph("Errores musicales más frecuentes:", styles['Heading2']))
+        elements.append(Spacer(1, 12))
+
+        wrong_notes = musical_errors.most_common_wrong_notes(SUMMARY_TOP_N)
+        if wrong_notes:
+            table_data = [["Nota interpretada (incorrecta)", "Nota correcta", "Veces"]]
+            for (note_played, note_correct), count in wrong_notes:
+                table_data.append([note_played, note_correct, str(count)])
+            elements.append(self._summary_table(table_data, [190, 190, 80]))
+        else:
+            elements.append(Paragraph("No se detectaron errores musicales.", styles['Normal']))
+
+        return elements
+
+    async def generate_progress_pdf_content(self, report: ProgressReport) -> bytes:
+        """Generate the PDF content of a student's progress report as bytes."""
+        import io
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+        start = time.perf_counter()
+        try:
+            buffer = io.BytesIO()
+            doc = SimpleDocTemplate(buffer, pagesize=letter)
+            styles = getSampleStyleSheet()
+            counts = report.counts
+
+            elements = [
+                Paragraph(f"Reporte de progreso: {(report.student_name or report.uid).upper()}", styles['Title']),
+                Spacer(1, 12),
+                Paragraph(
+                    f"Periodo: {report.date_from.isoformat()} a {report.date_to.isoformat()}<br/>"
+                    f"Número de prácticas: {len(counts)}<br/>"
+                    f"Número de errores posturales: {int(counts.postural.sum())}<br/>"
+                    f"Número de errores Musicales: {int(counts.musical.sum())}",
+                    styles['Normal'],
+                ),
+                Spacer(1, 20),
+                Paragraph("Errores por práctica:", styles['Heading2']),
+                Spacer(1, 12),
+            ]
+
+            if len(counts):
+                table_data = [["Fecha", "Escala", "BPM", "Figura", "Errores posturales", "Errores musicales"]]
+                for day, scale_id, bpm, figure, postural, musical in zip(
+                    counts.dates.astype("datetime64[D]").astype(str).tolist(),
+                    counts.scale_ids.tolist(),
+                    counts.bpms.tolist(),
+                    counts.figures.tolist(),
+                    counts.postural.tolist(),
+                    counts.musical.tolist(),
+                ):
+                    table_data.append([day, str(scale_id), str(bpm), Figure.to_str(figure), str(postural), str(musical)])
+                elements.append(self._summary_table(table_data, [80, 60, 50, 80, 100, 100]))
+            else:
+                elements.append(Paragraph("No hay prácticas en el periodo.", styles['Normal']))
+
+            for title, label, trends in (
+                ("Tendencia por escala:", "Escala", [(str(t.key), t) for t in report.by_scale]),
+                ("Tendencia por BPM:", "BPM", [(str(t.key), t) for t in report.by_bpm]),
+                ("Tendencia por figura:", "Figura", [(Figure.to_str(t.key), t) for t in report.by_figure]),
+            ):
+                if trends:
+                    elements += [Spacer(1, 20), Paragraph(title, styles['Heading2']), Spacer(1, 12)]
+                    elements.append(self._trend_table(label, trends))
+            if len(counts) > 1:
+                elements += [Spacer(1, 6), Paragraph(
+                    "Cambio: errores por práctica de la segunda mitad de las prácticas menos los de la primera "
+                    "(negativo indica mejora).",
+                    styles['Italic'],
+                )]
+
+            elements += [Spacer(1, 20), Paragraph("Errores posturales más frecuentes:", styles['Heading2']), Spacer(1, 12)]
+            if report.top_explications:
+                table_data = [["Tipo de Error", "Veces"]]
+                for explication, count in report.top_explications:
+                    table_data.append([Paragraph(explication or "", styles['Normal']), str(count)])
+                elements.append(self._summary_table(table_data, [380, 80]))
+            else:
+                elements.append(Paragraph("No se detectaron errores posturales.", styles['Normal']))
+
+            elements += [Spacer(1, 20), Paragraph("Errores musicales más frecuentes:", styles['Heading2']), Spacer(1, 12)]
+            if report.top_wrong_notes:
+                table_data = [["Nota interpretada (incorrecta)", "Nota correcta", "Veces"]]
+                for (note_played, note_correct), count in report.top_wrong_notes:
+                    table_data.append([note_played, note_correct, str(count)])
+                elements.append(self._summary_table(table_data, [190, 190, 80]))
+            else:
+                elements.append(Paragraph("No se detectaron errores musicales.", styles['Normal']))
+
+            doc.build(elements)
+            return buffer.getvalue()
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="render_progress")
+
+    def _trend_table(self, label: str, trends: List[Tuple[str, ProgressTrend]]) -> "Table":
+        table_data = [[label, "Prácticas", "Errores posturales (media)", "Errores musicales (media)", "Cambio"]]
+        for key, trend in trends:
+            table_data.append([
+                key,
+                str(trend.practices),
+                f"{trend.postural_mean:.1f}",
+                f"{trend.musical_mean:.1f}",
+                "-" if trend.change is None else f"{trend.change:+.1f}",
+            ])
+        return self._summary_table(table_data, [70, 60, 120, 120, 60])
+
+    def _summary_table(self, table_data: list, col_widths: list) -> "Table":
+        from reportlab.lib import colors
+        from reportlab.platypus import Table, TableStyle
+
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10)
+        ]))
+        return table
+
+    def get_pdf_path(self, uid: str, filename: str) -> str:
+        """Path a PDF with this filename is saved at."""
+        return os.path.join(self.base_dir, uid, "reports", filename)
 
     async def save_pdf(self, uid: str, filename: str, content: bytes) -> str:
         """Save PDF content and return the file path."""
-        user_dir = os.path.join(self.base_dir, uid, "reports")
-        os.makedirs(user_dir, exist_ok=True)
-        file_path = os.path.join(user_dir, filename)
+        start = time.perf_counter()
+        file_path = self.get_pdf_path(uid, filename)
+        await aiofiles.os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Written aside and renamed over the report, so readers and concurrent
+        # writers never see a partially written file
+        temp_path = f"{file_path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
 
         try:
-            async with aiofiles.open(file_path, "wb") as out_file:
+            async with aiofiles.open(temp_path, "wb") as out_file:
                 await out_file.write(content)
-            logger.info(f"PDF saved at {file_path}")
+            await aiofiles.os.replace(temp_path, file_path)
+            logger.info("PDF saved at %s", file_path)
             return file_path
         except Exception as e:
-            logger.error(f"Error saving PDF {filename}: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            logger.error("Error saving PDF %s: %s", filename, e, exc_info=True)
+            if await aiofiles.os.path.exists(temp_path):
+                await aiofiles.os.remove(temp_path)
+            raise
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="save_pdf")
+
+    async def delete_pdf(self, pdf_path: str) -> None:
+        """Remove a saved PDF; nothing happens if it does not exist."""
+        try:
+            await aiofiles.os.remove(pdf_path)
+            logger.info("PDF removed at %s", pdf_path)
+        except FileNotFoundError:
+            pass
+
+    async def stat_pdf(self, pdf_path: str) -> Optional[Tuple[int, float]]:
+        """Return (size in bytes, modification time) of a saved PDF, or None if it does not exist."""
+        try:
+            stat = await aiofiles.os.stat(pdf_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    async def read_pdf(self, pdf_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the bytes of a saved PDF from start up to end (exclusive), in chunks."""
+        # Reports are replaced by rename, so an open handle keeps reading the version it opened
+        async with aiofiles.open(pdf_path, "rb") as in_file:
+            await in_file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = await in_file.read(min(READ_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
\ No newline at end of file
@@ -0,0 +1,273 @@
+import asyncio
+import html
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+import aiofiles
+import aiofiles.os
+from app.core import metrics
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.domain.entities.practice import Practice, report_title
+from app.domain.entities.report_manifest import ReportManifest
+from app.domain.repositories.i_report_document_repo import IReportDocumentRepo
+from app.shared.enums import Figure, ReportFormat, ReportMode
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails are shown at about 2 inches in the PDF and HTML reports
+THUMBNAIL_MAX_WIDTH = 480
+THUMBNAIL_JPEG_QUALITY = 80
+
+
+def _e(value) -> str:
+    return html.escape(str(value))
+
+
+def _atomic_write(path: str, content: bytes):
+    temp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(temp_path, "wb") as out_file:
+            out_file.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class LocalReportDocumentRepository(IReportDocumentRepo):
+    """
+    JSON and HTML reports on the local file system, next to the PDFs.
+
+    Thumbnails are stored per practice and keyed by video frame, so they stay
+    valid across re-renders: the HTML view links them and a PDF rendered later
+    uses them instead of decoding the video again.
+    """
+
+    def __init__(self, base_dir: str | None = None):
+        self.base_dir = base_dir or os.getenv("CONTAINER_PATH", "/app/storage")
+
+    def _reports_dir(self, uid: str) -> str:
+        return os.path.join(self.base_dir, uid, "reports")
+
+    def _thumbnail_path(self, uid: str, practice_id: int, frame: int) -> str:
+        return os.path.join(self._reports_dir(uid), "thumbnails", str(practice_id), f"frame_{frame}.jpg")
+
+    def _manifest_path(self, uid: str, practice_id: int) -> str:
+        return os.path.join(self._reports_dir(uid), "manifests", f"{practice_id}.json")
+
+    async def find_thumbnails(self, uid: str, practice_id: int, frames: List[int]) -> Dict[int, str]:
+        """Return frame -> path of the stored thumbnails among the given frames."""
+        def find() -> Dict[int, str]:
+            paths = {frame: self._thumbnail_path(uid, practice_id, frame) for frame in frames}
+            return {frame: path for frame, path in paths.items() if os.path.exists(path)}
+
+        return await asyncio.to_thread(find)
+
+    async def save_thumbnails(self, uid: str, practice_id: int, screenshots: List[Tuple[int, str]]) -> Dict[int, str]:
+        """Store (frame, screenshot path) pairs as thumbnails, removing the screenshots; return frame -> thumbnail path."""
+        start = time.perf_counter()
+        try:
+            return await asyncio.to_thread(self._save_thumbnails_sync, uid, practice_id, screenshots)
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="save_thumbnails")
+
+    async def remove_thumbnails(self, uid: str, practice_id: int, frames: List[int]) -> None:
+        """Remove the stored thumbnails of these frames, if any."""
+        def remove():
+            for frame in frames:
+                try:
+                    os.remove(self._thumbnail_path(uid, practice_id, frame))
+                except FileNotFoundError:
+                    pass
+
+        await asyncio.to_thread(remove)
+
+    def _save_thumbnails_sync(self, uid: str, practice_id: int, screenshots: List[Tuple[int, str]]) -> Dict[int, str]:
+        import cv2
+
+        thumbnails = {}
+        for frame, screenshot_path in screenshots:
+            if not screenshot_path or not os.path.exists(screenshot_path):
+                continue
+            try:
+                image = cv2.imread(screenshot_path)
+                if image is None:
+                    logger.warning("Could not read screenshot %s", screenshot_path)
+                    continue
+                height, width = image.shape[:2]
+                if width > THUMBNAIL_MAX_WIDTH:
+                    size = (THUMBNAIL_MAX_WIDTH, round(height * THUMBNAIL_MAX_WIDTH / width))
+                    image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+                ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_JPEG_QUALITY])
+                if not ok:
+                    logger.warning("Could not encode thumbnail of frame %s", frame)
+                    continue
+
+                thumbnail_path = self._thumbnail_path(uid, practice_id, frame)
+                os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+                _atomic_write(thumbnail_path, encoded.tobytes())
+                thumbnails[frame] = thumbnail_path
+            finally:
+                os.remove(screenshot_path)
+                try:
+                    # The per-job screenshot directory, once empty
+                    os.rmdir(os.path.dirname(screenshot_path))
+                except OSError:
+                    pass
+        return thumbnails
+
+    async def generate_document(
+        self,
+        report_format: ReportFormat,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        thumbnails: Dict[int, str],
+        mode: ReportMode = ReportMode.FULL
+    ) -> bytes:
+        """Generate a JSON or HTML report; thumbnails maps postural error index to thumbnail path."""
+        start = time.perf_counter()
+        # Links relative to the report, which is saved in the same directory tree
+        reports_dir = self._reports_dir(practice.id_student)
+        links = {
+            index: os.path.relpath(path, reports_dir).replace(os.sep, "/")
+            for index, path in thumbnails.items() if path
+        }
+        try:
+            document = self._document(practice, postural_errors, musical_errors, links, mode)
+            if report_format is ReportFormat.JSON:
+                return json.dumps(document, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+            if report_format is ReportFormat.HTML:
+                return self._html(document).encode()
+            raise ValueError(f"Unsupported document format: {report_format.value}")
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage=f"render_{report_format.value}")
+
+    def _document(
+        self,
+        practice: Practice,
+        postural_errors: PosturalErrorBatch,
+        musical_errors: MusicalErrorBatch,
+        links: Dict[int, str],
+        mode: ReportMode
+    ) -> dict:
+        return {
+            "practice_id": practice.id,
+            "uid": practice.id_student,
+            "student_name": practice.student_name,
+            "date": str(practice.date),
+            "time": str(practice.time),
+            "duration": practice.duration,
+            "scale": practice.scale,
+            "scale_type": practice.scale_type,
+            "bpm": practice.bpm,
+            "octaves": practice.octaves,
+            "figure": Figure.to_str(practice.figure),
+            "mode": mode.value,
+            "num_postural_errors": len(postural_errors),
+            "num_musical_errors": len(musical_errors),
+            "postural_errors": [
+                {
+                    "start": start,
+                    "end": str(end),
+                    "duration_seconds": duration,
+                    "explication": explication,
+                    "frame": frame,
+                    "thumbnail": links.get(index),
+                }
+                for index, (start, end, duration, explication, frame) in enumerate(zip(
+                    postural_errors.min_sec_init,
+                    postural_errors.min_sec_end,
+                    postural_errors.durations.round(1).tolist(),
+                    postural_errors.explications,
+                    postural_errors.frames.tolist(),
+                ))
+            ],
+            "musical_errors": [
+                {"time": min_sec, "note_played": note_played, "note_correct": note_correct}
+                for min_sec, note_played, note_correct in zip(
+                    musical_errors.min_sec, musical_errors.notes_played, musical_errors.notes_correct
+                )
+            ],
+        }
+
+    def _html(self, document: dict) -> str:
+        postural_rows = "".join(
+            "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format(
+                _e(error["start"]), _e(error["end"]), _e(error["duration_seconds"]), _e(error["explication"]),
+                f'<img src="{_e(error["thumbnail"])}" alt="" loading="lazy">' if error["thumbnail"] else "No disponible",
+            )
+            for error in document["postural_errors"]
+        )
+        musical_rows = "".join(
+            f"<tr><td>{_e(error['time'])}</td><td>{_e(error['note_played'])}</td><td>{_e(error['note_correct'])}</td></tr>"
+            for error in document["musical_errors"]
+        )
+        postural_section = (
+            "<table><tr><th>Inicio (mm:ss)</th><th>Fin (mm:ss)</th><th>Duración (s)</th>"
+            f"<th>Tipo de Error</th><th>Pantallazo</th></tr>{postural_rows}</table>"
+            if postural_rows else "<p>No se detectaron errores posturales.</p>"
+        )
+        musical_section = (
+            "<table><tr><th>Momento del error (mm:ss)</th><th>Nota interpretada (incorrecta)</th>"
+            f"<th>Nota correcta</th></tr>{musical_rows}</table>"
+            if musical_rows else "<p>No se detectaron errores musicales.</p>"
+        )
+        return (
+            '<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+            f"<title>Reporte de practica {_e(document['practice_id'])}</title>"
+            "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+            "td,th{border:1px solid #999;padding:4px;font-size:0.9em}th{background:#ddd}"
+            "img{width:160px}</style></head><body>"
+            f"<h1>{_e(report_title(document['scale'], document['scale_type']))}</h1>"
+            f"<p>Estudiante: {_e(document['student_name'].upper())}<br>"
+            f"Fecha de la práctica: {_e(document['date'])}<br>"
+            f"Hora de la práctica: {_e(document['time'])}<br>"
+            f"Duración del video: {_e(document['duration'])}<br>"
+            f"BPM: {_e(document['bpm'])}<br>"
+            f"Octavas: {_e(document['octaves'])}<br>"
+            f"Figura: {_e(document['figure'])}<br>"
+            f"Número de errores posturales: {document['num_postural_errors']}<br>"
+            f"Número de errores Musicales: {document['num_musical_errors']}</p>"
+            f"<h2>Errores posturales:</h2>{postural_section}"
+            f"<h2>Errores musicales:</h2>{musical_section}"
+            "</body></html>"
+        )
+
+    async def save_document(self, uid: str, filename: str, content: bytes) -> str:
+        """Save a report document and return the file path."""
+        user_dir = self._reports_dir(uid)
+        await aiofiles.os.makedirs(user_dir, exist_ok=True)
+        file_path = os.path.join(user_dir, filename)
+        # Same atomic replace as the PDFs: readers never see a partial document
+        await asyncio.to_thread(_atomic_write, file_path, content)
+        logger.info("Report document saved at %s", file_path)
+        return file_path
+
+    async def document_exists(self, uid: str, filename: str) -> bool:
+        """Whether a report document with this filename is saved."""
+        return await aiofiles.os.path.exists(os.path.join(self._reports_dir(uid), filename))
+
+    async def load_manifest(self, uid: str, practice_id: int) -> Optional[ReportManifest]:
+        """Manifest of the last render of the practice report, or None if there is none."""
+        try:
+            async with aiofiles.open(self._manifest_path(uid, practice_id), "rb") as in_file:
+                return ReportManifest(**json.loads(await in_file.read()))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            # Unreadable manifests only cost a full render
+            logger.warning("Ignoring the report manifest of practice %s: %s", practice_id, e)
+            return None
+
+    async def save_manifest(self, uid: str, manifest: ReportManifest) -> None:
+        """Store the manifest of a render, replacing the previous one."""
+        path = self._manifest_path(uid, manifest.practice_id)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = json.dumps(asdict(manifest), separators=(",", ":")).encode()
+        await asyncio.to_thread(_atomic_write, path, content)
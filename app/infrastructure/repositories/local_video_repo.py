@@ -1,82 +1,230 @@
+import asyncio
 import logging
+import multiprocessing
 import os
-import cv2
+import shutil
+import sys
 import tempfile
-from typing import List, Dict
+import time
+from typing import Any, Callable, List, Dict, Optional
+from app.core import metrics
 from app.domain.repositories.i_video_repo import IVideoRepo
-from app.domain.entities.postural_error import PosturalError
+from app.domain.entities.error_batch import PosturalErrorBatch
+from app.domain.entities.video_info import VideoInfo
 
 logger = logging.getLogger(__name__)
 
+
+def _main_module_preload() -> List[str]:
+    """
+    The main module run with -m (python -m app.main), for the fork server to import.
+    multiprocessing re-runs it in every child, which would otherwise import all of
+    the service again: about 0.5s per child for app.main.
+    """
+    spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    if spec is None or spec.name.endswith("__main__"):
+        return []
+    return [spec.name]
+
+
+# forkserver: children start from a clean single-threaded server instead of
+# forking the event loop process with its threads and open connections.
+# OpenCV and the main module are imported once in the server, not in the
+# service process (OpenCV) nor per child.
+_mp_context = multiprocessing.get_context("forkserver")
+_mp_context.set_forkserver_preload(["cv2", *_main_module_preload()])
+
+PROCESS_JOIN_TIMEOUT_SECONDS = 5
+# Longest wait for the fork server to import OpenCV and the main module
+FORKSERVER_START_TIMEOUT_SECONDS = 30
+# Reading the container metadata is abandoned after this
+VIDEO_INFO_TIMEOUT_SECONDS = 30
+
+EXTRACTIONS_IN_PROGRESS = metrics.gauge(
+    "screenshot_extractions_in_progress", "Screenshot extraction child processes currently running"
+)
+
+def preload():
+    """
+    Start the extraction fork server ahead of the first report (blocking). The server
+    imports its modules before serving, so a child that does nothing waits for them.
+    """
+    process = _mp_context.Process(name="forkserver_warmup", daemon=True)
+    process.start()
+    process.join(FORKSERVER_START_TIMEOUT_SECONDS)
+
+
 class LocalVideoRepository(IVideoRepo):
     """Concrete implementation of IVideoRepo using local filesystem."""
     
-    def __init__(self, base_dir: str | None = None):
+    def __init__(self, base_dir: str | None = None, screenshots_dir: str | None = None):
         self.base_dir = base_dir or os.getenv("CONTAINER_PATH", "/app/storage")
+        # Parent of the per-job screenshot directories; the system temp dir when None.
+        # On the storage volume, screenshots of an interrupted job survive a restart.
+        self.screenshots_dir = screenshots_dir
+
+    def _video_path(self, uid: str, practice_id: int) -> str:
+        return self.base_dir + f"/{uid}/videos/practice_{practice_id}.mp4"
 
     async def get_video(self, uid: str, practice_id: int) -> str:
         """Retrieve the video file path for the given practice ID."""
-        return self.base_dir + f"/{uid}/videos/practice_{practice_id}.mp4"
+        return self._video_path(uid, practice_id)
 
-    def _parse_timestamp(self, timestamp: str) -> float:
-        """Helper method to parse mm:ss format to seconds."""
-        try:
-            if ':' in str(timestamp):
-                parts = str(timestamp).split(':')
-                minutes = int(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            else:
-                return float(timestamp)
-        except (ValueError, IndexError):
-            return 0.0
+    def video_label(self, uid: str, practice_id: int) -> str:
+        """How the video is named in logs; unlike get_video it never carries credentials."""
+        return self._video_path(uid, practice_id)
+
+    async def get_video_info(self, uid: str, practice_id: int) -> Optional[VideoInfo]:
+        """
+        Read resolution, frame rate and frame count from the container metadata,
+        without decoding frames.
+
+        Runs in a child process like the extraction: past VIDEO_INFO_TIMEOUT_SECONDS,
+        or on cancellation, the process is killed instead of a read stalled in
+        OpenCV holding a thread of the service.
+        """
+        video_path = await self.get_video(uid, practice_id)
+        return await asyncio.wait_for(
+            _run_in_child(_read_video_info, (video_path, self.video_label(uid, practice_id)), f"video_info_{practice_id}"),
+            VIDEO_INFO_TIMEOUT_SECONDS,
+        )
+
+    def _make_screenshots_dir(self, practice_id: int) -> str:
+        if self.screenshots_dir:
+            os.makedirs(self.screenshots_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix=f"screenshots_{practice_id}_", dir=self.screenshots_dir)
 
-    async def extract_screenshots_for_errors(self, uid: str, practice_id: int, postural_errors: List[PosturalError]) -> Dict[int, str]:
-        """Extract screenshots for postural errors using specific frame numbers."""
+    async def extract_screenshots_for_errors(self, uid: str, practice_id: int, postural_errors: PosturalErrorBatch) -> Dict[int, str]:
+        """
+        Extract screenshots for postural errors using specific frame numbers.
+
+        Decoding runs in a child process so a corrupt video that stalls OpenCV
+        can be abandoned: cancelling this coroutine kills the process.
+        """
         screenshots = {}
         
-        if not postural_errors:
+        if not len(postural_errors):
             return screenshots
         
         # Get video path using the repository's own method
         video_path = await self.get_video(uid, practice_id)
         
         # Create temporary directory with unique name for thread safety
-        temp_dir = tempfile.mkdtemp(prefix=f"screenshots_{practice_id}_")
-        
+        temp_dir = await asyncio.to_thread(self._make_screenshots_dir, practice_id)
+        frames = postural_errors.frames.tolist()
+
+        label = self.video_label(uid, practice_id)
+
+        start = time.perf_counter()
+        EXTRACTIONS_IN_PROGRESS.inc()
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                logger.error(f"Could not open video: {video_path}")
-                return screenshots
-            
-            for i, error in enumerate(postural_errors):
-                # Use the specific frame number from the entity
-                target_frame = error.frame
-                
-                # Set video position to the specific frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-                ret, frame = cap.read()
-                
-                if ret:
-                    screenshot_path = os.path.join(temp_dir, f"error_{practice_id}_{i}.png")
-                    cv2.imwrite(screenshot_path, frame)
-                    screenshots[i] = screenshot_path
-                    logger.debug(f"Screenshot extracted for error {i} at frame {target_frame}")
-                else:
-                    logger.warning(f"Could not extract frame {target_frame} for error {i}")
-                    screenshots[i] = None
+            screenshots = await _run_in_child(
+                _extract_frames, (video_path, label, frames, temp_dir, practice_id), f"screenshots_{practice_id}"
+            )
+            logger.info("Extracted %s screenshots from video", len(screenshots))
             
-            cap.release()
-            logger.info(f"Extracted {len(screenshots)} screenshots from video")
-            
-        except Exception as e:
-            logger.error(f"Error extracting screenshots: {e}")
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                logger.warning("Screenshot extraction abandoned for practice_id=%s", practice_id)
+            else:
+                logger.error("Error extracting screenshots: %s", e)
             # Clean up temp directory on error
-            try:
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
-            except:
-                pass
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+        finally:
+            EXTRACTIONS_IN_PROGRESS.dec()
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="extract_screenshots")
             
-        return screenshots
\ No newline at end of file
+        return screenshots
+
+
+async def _run_in_child(target: Callable[..., Any], args: tuple, name: str) -> Any:
+    """
+    Run target(*args) in a child process and return its result. Cancelling the
+    coroutine kills the process, so a call stalled in OpenCV can be abandoned.
+    """
+    parent_conn, child_conn = _mp_context.Pipe(duplex=False)
+    process = _mp_context.Process(target=_child_worker, args=(child_conn, target, args), name=name, daemon=True)
+    try:
+        process.start()
+        child_conn.close()
+
+        # Wait for the result without blocking the event loop or a thread
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(parent_conn.fileno(), lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_reader(parent_conn.fileno())
+
+        ok, payload = parent_conn.recv()
+        if not ok:
+            raise RuntimeError(payload)
+        return payload
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.kill()
+        if process.pid is not None:
+            await asyncio.to_thread(process.join, PROCESS_JOIN_TIMEOUT_SECONDS)
+
+
+def _child_worker(conn, target: Callable[..., Any], args: tuple):
+    """Child process entry point: run the target and send back (ok, result or error)."""
+    try:
+        conn.send((True, target(*args)))
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _read_video_info(video_path: str, label: str) -> Optional[VideoInfo]:
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            logger.warning("Could not open video for metadata: %s", label)
+            return None
+        return VideoInfo(
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            fps=float(cap.get(cv2.CAP_PROP_FPS)),
+            frame_count=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        )
+    finally:
+        cap.release()
+
+
+def _extract_frames(video_path: str, label: str, frames: List[int], temp_dir: str, practice_id: int) -> Dict[int, str]:
+    import cv2
+
+    screenshots = {}
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.error("Could not open video: %s", label)
+        return screenshots
+
+    try:
+        for i, target_frame in enumerate(frames):
+            # Set video position to the specific frame
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+            ret, frame = cap.read()
+
+            if ret:
+                screenshot_path = os.path.join(temp_dir, f"error_{practice_id}_{i}.png")
+                cv2.imwrite(screenshot_path, frame)
+                screenshots[i] = screenshot_path
+                logger.debug("Screenshot extracted for error %s at frame %s", i, target_frame)
+            else:
+                logger.warning("Could not extract frame %s for error %s", target_frame, i)
+                screenshots[i] = None
+    finally:
+        cap.release()
+
+    return screenshots
@@ -1,9 +1,49 @@
 import logging
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
 from app.domain.repositories.i_metadata_repo import IMetadataRepo
 from app.infrastructure.database.mongo_connection import mongo_connection
 
 logger = logging.getLogger(__name__)
 
+
+def _practice_filter(
+    uid: str, practice_id: int, if_ready: bool = False, fencing_token: Optional[int] = None
+) -> dict:
+    """
+    Filter on the user document, positioned on the practice (and its done flags if
+    asked). With a fencing token it only matches while no report with a newer
+    token has been stored, so a writer whose lease was taken over cannot
+    overwrite its successor's report.
+    """
+    if not if_ready and fencing_token is None:
+        return {"uid": uid, "practices.id_practice": practice_id}
+    practice = {"id_practice": practice_id}
+    if if_ready:
+        practice.update(audio_done=True, video_done=True)
+    if fencing_token is not None:
+        practice["$or"] = [
+            {"report_token": {"$exists": False}},
+            {"report_token": {"$lte": fencing_token}},
+        ]
+    return {"uid": uid, "practices": {"$elemMatch": practice}}
+
+
+def _report_update(
+    pdf_path: str, degraded: bool, fencing_token: Optional[int] = None, scale: Optional[Tuple[str, str]] = None
+) -> dict:
+    fields = {
+        "practices.$.report": pdf_path,
+        "practices.$.report_degraded": degraded,
+    }
+    if fencing_token is not None:
+        fields["practices.$.report_token"] = fencing_token
+    # Kept when unknown: a report regenerated without the request keeps the stored scale
+    if scale is not None:
+        fields["practices.$.report_scale"], fields["practices.$.report_scale_type"] = scale
+    return {"$set": fields}
+
+
 class MongoMetadataRepo(IMetadataRepo):
     """Concrete implementation of IMetadataRepo using MongoDB."""
 
@@ -16,11 +56,11 @@ class MongoMetadataRepo(IMetadataRepo):
             logger.exception("Error initializing MongoRepo")
             raise
 
-    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str) -> bool:
+    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str, degraded: bool = False) -> bool:
         try:
             result = await self.users_collection.update_one(
-                {"uid": uid, "practices.id_practice": practice_id},
-                {"$set": {"practices.$.report": pdf_path}}
+                _practice_filter(uid, practice_id),
+                _report_update(pdf_path, degraded)
             )
             if result.modified_count == 1:
                 logger.info(
@@ -41,44 +81,191 @@ class MongoMetadataRepo(IMetadataRepo):
             )
             raise
     
-    async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
-        """Checks if both video and audio processing are done for a specific practice ID."""
+    async def save_pdf_path_if_ready(
+        self,
+        uid: str,
+        practice_id: int,
+        pdf_path: str,
+        degraded: bool = False,
+        fencing_token: Optional[int] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        """Saves the PDF path only if audio and video processing are still done, in one conditional update."""
         try:
-            # Query to find the specific practice and check if both audio_done and video_done are true
-            result = await self.users_collection.find_one(
-                {
-                    "uid": uid,
-                    "practices": {
-                        "$elemMatch": {
-                            "id_practice": practice_id,
-                            "audio_done": True,
-                            "video_done": True
-                        }
-                    }
-                },
-                {"practices.$": 1}  # Project only the matching practice
+            result = await self.users_collection.update_one(
+                _practice_filter(uid, practice_id, if_ready=True, fencing_token=fencing_token),
+                _report_update(pdf_path, degraded, fencing_token, scale)
             )
-            
-            if result and "practices" in result and len(result["practices"]) > 0:
-                practice = result["practices"][0]
+            if result.matched_count == 1:
                 logger.info(
-                    "Video and audio processing completed for uid=%s, practice=%s",
-                    uid,
-                    practice_id
+                    "Updated report for uid=%s, practice=%s", uid, practice_id
                 )
                 return True
-            else:
-                logger.debug(
-                    "Video and/or audio processing not completed for uid=%s, practice=%s",
-                    uid,
-                    practice_id
+
+            logger.warning(
+                "Report not stored for uid=%s, practice=%s: practice missing, no longer ready or lease superseded",
+                uid,
+                practice_id,
+            )
+            return False
+
+        except Exception as e:
+            logger.exception(
+                "Error updating report for uid=%s, practice=%s",
+                uid,
+                practice_id,
+            )
+            raise
+
+    async def bulk_save_pdf_paths(
+        self, reports: Dict[Tuple[str, int], Tuple[str, bool, bool, Optional[int], Optional[Tuple[str, str]]]]
+    ) -> int:
+        """
+        Save many report paths in one unordered bulk write.
+
+        ``reports`` maps (uid, practice_id) -> (pdf_path, degraded, if_ready,
+        fencing_token, scale); entries with if_ready only apply while audio and
+        video are still done, and entries with a token while it is not superseded.
+        Returns the number of practices matched.
+        """
+        if not reports:
+            return 0
+
+        operations = [
+            UpdateOne(
+                _practice_filter(uid, practice_id, if_ready, fencing_token),
+                _report_update(pdf_path, degraded, fencing_token, scale),
+            )
+            for (uid, practice_id), (pdf_path, degraded, if_ready, fencing_token, scale) in reports.items()
+        ]
+        try:
+            result = await self.users_collection.bulk_write(operations, ordered=False)
+            if result.matched_count < len(operations):
+                logger.warning(
+                    "Bulk report update matched %s of %s practices (missing, no longer ready or lease superseded)",
+                    result.matched_count,
+                    len(operations),
                 )
-                return False
+            else:
+                logger.info("Bulk updated %s reports", len(operations))
+            return result.matched_count
+
+        except Exception as e:
+            logger.exception("Error bulk updating %s reports", len(operations))
+            raise
+
+    async def _project_practice(self, uid: str, practice_id: int, fields: Tuple[str, ...]) -> Optional[dict]:
+        """Project just the given fields of the matching practice instead of the whole element."""
+        cursor = self.users_collection.aggregate([
+            {"$match": _practice_filter(uid, practice_id)},
+            {"$limit": 1},
+            {"$project": {
+                "_id": 0,
+                "practice": {"$arrayElemAt": [{"$filter": {
+                    "input": "$practices",
+                    "as": "p",
+                    "cond": {"$eq": ["$$p.id_practice", practice_id]},
+                }}, 0]},
+            }},
+            {"$project": {name: f"$practice.{name}" for name in fields}},
+        ])
+        results = await cursor.to_list(length=1)
+        return results[0] if results else None
+
+    async def get_processing_flags(self, uid: str, practice_id: int) -> Optional[Tuple[bool, bool]]:
+        """Returns (audio_done, video_done) for a specific practice ID, or None if the practice is not found."""
+        try:
+            practice = await self._project_practice(uid, practice_id, ("audio_done", "video_done"))
+            if practice is None:
+                return None
+            return bool(practice.get("audio_done")), bool(practice.get("video_done"))
+
+        except Exception as e:
+            logger.exception(
+                "Error reading processing flags for uid=%s, practice=%s",
+                uid,
+                practice_id,
+            )
+            raise
+
+    async def get_report(self, uid: str, practice_id: int) -> Optional[Tuple[Optional[str], bool]]:
+        """Returns (report path, degraded) for a specific practice ID, or None if the practice is not found."""
+        try:
+            practice = await self._project_practice(uid, practice_id, ("report", "report_degraded"))
+            if practice is None:
+                return None
+            return practice.get("report"), bool(practice.get("report_degraded"))
 
         except Exception as e:
             logger.exception(
-                "Error checking video and audio status for uid=%s, practice=%s",
+                "Error reading report for uid=%s, practice=%s",
                 uid,
                 practice_id,
             )
-            raise
\ No newline at end of file
+            raise
+
+    async def find_degraded_reports(self, limit: int) -> List[Tuple[str, int]]:
+        """Returns (uid, practice_id) of up to limit practices whose stored report is degraded."""
+        try:
+            cursor = self.users_collection.aggregate([
+                {"$match": {"practices.report_degraded": True}},
+                {"$unwind": "$practices"},
+                {"$match": {"practices.report_degraded": True}},
+                {"$limit": limit},
+                {"$project": {"_id": 0, "uid": 1, "practice_id": "$practices.id_practice"}},
+            ])
+            return [(document["uid"], document["practice_id"]) for document in await cursor.to_list(length=limit)]
+
+        except Exception as e:
+            logger.exception("Error listing degraded reports")
+            raise
+
+    async def get_scales(self, practices: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[str, str]]:
+        """
+        (scale, scale type) of each practice whose scale is known, stored with its
+        report or else in the practice metadata, in one aggregation.
+        """
+        if not practices:
+            return {}
+        wanted = set(practices)
+        try:
+            cursor = self.users_collection.aggregate([
+                {"$match": {"uid": {"$in": list({uid for uid, _ in wanted})}}},
+                {"$unwind": "$practices"},
+                {"$match": {"practices.id_practice": {"$in": list({practice_id for _, practice_id in wanted})}}},
+                {"$project": {
+                    "_id": 0,
+                    "uid": 1,
+                    "practice_id": "$practices.id_practice",
+                    "scale": {"$ifNull": ["$practices.report_scale", "$practices.scale"]},
+                    "scale_type": {"$ifNull": ["$practices.report_scale_type", "$practices.scale_type"]},
+                }},
+            ])
+            scales = {}
+            for document in await cursor.to_list(length=None):
+                key = (document["uid"], document["practice_id"])
+                if key in wanted and document.get("scale"):
+                    scales[key] = (document["scale"], document.get("scale_type") or "")
+            return scales
+
+        except Exception as e:
+            logger.exception("Error reading the scales of %s practices", len(practices))
+            raise
+
+    async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
+        """Checks if both video and audio processing are done for a specific practice ID."""
+        flags = await self.get_processing_flags(uid, practice_id)
+        if flags == (True, True):
+            logger.info(
+                "Video and audio processing completed for uid=%s, practice=%s",
+                uid,
+                practice_id
+            )
+            return True
+
+        logger.debug(
+            "Video and/or audio processing not completed for uid=%s, practice=%s",
+            uid,
+            practice_id
+        )
+        return False
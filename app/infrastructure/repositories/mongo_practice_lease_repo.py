@@ -0,0 +1,83 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.domain.entities.practice_lease import PracticeLease
+from app.domain.repositories.i_practice_lease_repo import IPracticeLeaseRepo
+from app.infrastructure.database.mongo_connection import mongo_connection
+
+logger = logging.getLogger(__name__)
+
+LEASES_COLLECTION = "report_leases"
+TOKENS_COLLECTION = "report_lease_tokens"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MongoPracticeLeaseRepo(IPracticeLeaseRepo):
+    """
+    Leases as one document per practice, keyed by practice id.
+
+    Taking a lease is a single upsert that only matches an expired document: while
+    another owner holds it, the upsert collides on _id and fails. Fencing tokens
+    come from a counter kept apart from the leases, so they keep increasing after
+    the TTL index removes expired lease documents.
+    """
+
+    def __init__(self):
+        try:
+            db = mongo_connection.connect()
+            self.leases = db[LEASES_COLLECTION]
+            self.tokens = db[TOKENS_COLLECTION]
+            logger.info("MongoPracticeLeaseRepo initialized successfully")
+        except Exception:
+            logger.exception("Error initializing MongoPracticeLeaseRepo")
+            raise
+
+    async def acquire(self, practice_id: int, owner: str, ttl_seconds: float) -> Optional[PracticeLease]:
+        now = _now()
+        held = await self.leases.find_one({"_id": practice_id, "expires_at": {"$gt": now}}, {"owner": 1})
+        if held is not None:
+            return None
+
+        counter = await self.tokens.find_one_and_update(
+            {"_id": practice_id},
+            {"$inc": {"token": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        token = counter["token"]
+        try:
+            await self.leases.update_one(
+                {"_id": practice_id, "expires_at": {"$lte": now}},
+                {"$set": {
+                    "owner": owner,
+                    "token": token,
+                    "expires_at": now + timedelta(seconds=ttl_seconds),
+                }},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Taken by another owner since the check above
+            return None
+        return PracticeLease(practice_id, owner, token, ttl_seconds)
+
+    async def renew(self, lease: PracticeLease) -> bool:
+        now = _now()
+        result = await self.leases.update_one(
+            {"_id": lease.practice_id, "token": lease.token, "expires_at": {"$gt": now}},
+            {"$set": {"expires_at": now + timedelta(seconds=lease.ttl_seconds)}},
+        )
+        return result.matched_count == 1
+
+    async def is_current(self, lease: PracticeLease) -> bool:
+        document = await self.leases.find_one(
+            {"_id": lease.practice_id, "token": lease.token, "expires_at": {"$gt": _now()}}, {"_id": 1}
+        )
+        return document is not None
+
+    async def release(self, lease: PracticeLease) -> None:
+        await self.leases.delete_one({"_id": lease.practice_id, "token": lease.token})
\ No newline at end of file
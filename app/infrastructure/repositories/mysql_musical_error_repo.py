@@ -1,43 +1,79 @@
 import logging
-from typing import List
-from sqlalchemy import select
+from typing import Dict, List
+from sqlalchemy import select, func
 from sqlalchemy.exc import SQLAlchemyError
 from app.domain.repositories.i_musical_error_repo import IMusicalErrorRepo
-from app.domain.entities.musical_error import MusicalError
+from app.domain.entities.error_batch import MusicalErrorBatch
 from app.infrastructure.database.models.musical_error_model import MusicalErrorModel
 from app.infrastructure.database.mysql_connection import mysql_connection
 from app.core.exceptions import DatabaseConnectionException
 
 logger = logging.getLogger(__name__)
 
+# Selected in MusicalError field order, so rows map positionally onto the batch columns
+_ENTITY_COLUMNS = (
+    MusicalErrorModel.id,
+    MusicalErrorModel.min_sec,
+    MusicalErrorModel.note_played,
+    MusicalErrorModel.note_correct,
+    MusicalErrorModel.id_practice,
+)
+
 
 class MySQLMusicalErrorRepository(IMusicalErrorRepo):
     """Concrete implementation of IMusicalErrorRepo using MySQL."""
 
-    async def get_by_practice(self, id_practice: int) -> List[MusicalError]:
+    async def get_by_practice(self, id_practice: int) -> MusicalErrorBatch:
+        # Core rows straight into columns: no ORM identity map nor an object per row
         try:
-            async with mysql_connection.get_async_session() as session:
-                result = await session.execute(
-                    select(MusicalErrorModel).where(MusicalErrorModel.id_practice == id_practice)
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(*_ENTITY_COLUMNS).where(MusicalErrorModel.id_practice == id_practice)
                 )
-                rows = result.scalars().all()
-                logger.debug(
-                    f"Fetched {len(rows)} musical errors for practice_id={id_practice}"
+                errors = MusicalErrorBatch.from_rows(result).sorted_by_time()
+                logger.debug("Fetched %s musical errors for practice_id=%s", len(errors), id_practice)
+                return errors
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "MySQL error listing musical errors for practice_id=%s: %s", id_practice, e,
+                exc_info=True,
+            )
+            raise DatabaseConnectionException(f"Error fetching musical errors: {str(e)}")
+
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, MusicalErrorBatch]:
+        errors = {practice_id: MusicalErrorBatch.empty() for practice_id in practice_ids}
+        if not practice_ids:
+            return errors
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(*_ENTITY_COLUMNS).where(MusicalErrorModel.id_practice.in_(practice_ids))
                 )
-                return [self._model_to_entity(row) for row in rows]
+                # One batch for every practice, split with array operations
+                for practice_id, batch in MusicalErrorBatch.from_rows(result).group_by_practice().items():
+                    errors[practice_id] = batch.sorted_by_time()
+                logger.debug("Fetched musical errors for %s practices", len(practice_ids))
+                return errors
 
         except SQLAlchemyError as e:
             logger.error(
-                f"MySQL error listing musical errors for practice_id={id_practice}: {e}",
-                exc_info=True
+                "MySQL error listing musical errors for %s practices: %s", len(practice_ids), e,
+                exc_info=True,
             )
             raise DatabaseConnectionException(f"Error fetching musical errors: {str(e)}")
 
-    def _model_to_entity(self, model: MusicalErrorModel) -> MusicalError:
-        return MusicalError(
-            id=model.id,
-            min_sec=model.min_sec,
-            note_played=model.note_played,
-            note_correct=model.note_correct,
-            id_practice=model.id_practice
-        )
+    async def count_by_practice(self, id_practice: int) -> int:
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(func.count(MusicalErrorModel.id)).where(MusicalErrorModel.id_practice == id_practice)
+                )
+                return result.scalar_one()
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "MySQL error counting musical errors for practice_id=%s: %s", id_practice, e,
+                exc_info=True,
+            )
+            raise DatabaseConnectionException(f"Error counting musical errors: {str(e)}")
@@ -1,7 +1,8 @@
 import logging
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, func
+from typing import Dict, List
+from app.domain.entities.error_batch import PosturalErrorBatch
 from app.domain.entities.postural_error import PosturalError
 from app.domain.repositories.i_postural_error_repo import IPosturalErrorRepo
 from app.infrastructure.database.models.postural_error_model import PosturalErrorModel
@@ -10,6 +11,16 @@ from app.core.exceptions import DatabaseConnectionException
 
 logger = logging.getLogger(__name__)
 
+# Selected in PosturalError field order, so rows map positionally onto the entity and batch columns
+_ENTITY_COLUMNS = (
+    PosturalErrorModel.id,
+    PosturalErrorModel.min_sec_init,
+    PosturalErrorModel.min_sec_end,
+    PosturalErrorModel.frame,
+    PosturalErrorModel.explication,
+    PosturalErrorModel.id_practice,
+)
+
 class MySQLPosturalErrorRepository(IPosturalErrorRepo):
     """Concrete implementation of IPosturalErrorRepo using MySQL."""
 
@@ -28,48 +39,86 @@ class MySQLPosturalErrorRepository(IPosturalErrorRepo):
                 await session.refresh(model)
 
                 logger.info(
-                    f"Postural error created with id={model.id} for practice_id={postural_error.id_practice}"
+                    "Postural error created with id=%s for practice_id=%s", model.id, postural_error.id_practice
                 )
                 return self._model_to_entity(model)
 
         except IntegrityError as e:
             logger.error(
-                f"Integrity error creating postural error for practice_id={postural_error.id_practice}: {e}",
+                "Integrity error creating postural error for practice_id=%s: %s", postural_error.id_practice, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Integrity error: {str(e)}")
 
         except SQLAlchemyError as e:
             logger.error(
-                f"MySQL error creating postural error for practice_id={postural_error.id_practice}: {e}",
+                "MySQL error creating postural error for practice_id=%s: %s", postural_error.id_practice, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Error creating postural error: {str(e)}")
 
         except Exception as e:
             logger.error(
-                f"Unexpected error creating postural error for practice_id={postural_error.id_practice}: {e}",
+                "Unexpected error creating postural error for practice_id=%s: %s", postural_error.id_practice, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Unexpected error: {str(e)}")
 
-    async def get_by_practice(self, id_practice: int) -> List[PosturalError]:
+    async def get_by_practice(self, id_practice: int) -> PosturalErrorBatch:
+        # Core rows straight into columns: no ORM identity map nor an object per row
         try:
-            async with mysql_connection.get_async_session() as session:
-                result = await session.execute(
-                    select(PosturalErrorModel).where(PosturalErrorModel.id_practice == id_practice)
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(*_ENTITY_COLUMNS).where(PosturalErrorModel.id_practice == id_practice)
                 )
-                rows = result.scalars().all()
-                logger.debug(f"Fetched {len(rows)} postural errors for practice_id={id_practice}")
-                return [self._model_to_entity(row) for row in rows]
+                errors = PosturalErrorBatch.from_rows(result).sorted_by_start()
+                logger.debug("Fetched %s postural errors for practice_id=%s", len(errors), id_practice)
+                return errors
 
         except SQLAlchemyError as e:
             logger.error(
-                f"MySQL error listing postural errors for practice_id={id_practice}: {e}",
+                "MySQL error listing postural errors for practice_id=%s: %s", id_practice, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Error fetching postural errors: {str(e)}")
 
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, PosturalErrorBatch]:
+        errors = {practice_id: PosturalErrorBatch.empty() for practice_id in practice_ids}
+        if not practice_ids:
+            return errors
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(*_ENTITY_COLUMNS).where(PosturalErrorModel.id_practice.in_(practice_ids))
+                )
+                # One batch for every practice, split with array operations
+                for practice_id, batch in PosturalErrorBatch.from_rows(result).group_by_practice().items():
+                    errors[practice_id] = batch.sorted_by_start()
+                logger.debug("Fetched postural errors for %s practices", len(practice_ids))
+                return errors
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "MySQL error listing postural errors for %s practices: %s", len(practice_ids), e,
+                exc_info=True,
+            )
+            raise DatabaseConnectionException(f"Error fetching postural errors: {str(e)}")
+
+    async def count_by_practice(self, id_practice: int) -> int:
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(func.count(PosturalErrorModel.id)).where(PosturalErrorModel.id_practice == id_practice)
+                )
+                return result.scalar_one()
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "MySQL error counting postural errors for practice_id=%s: %s", id_practice, e,
+                exc_info=True,
+            )
+            raise DatabaseConnectionException(f"Error counting postural errors: {str(e)}")
+
     def _model_to_entity(self, model: PosturalErrorModel) -> PosturalError:
         return PosturalError(
             id=model.id,
@@ -1,12 +1,12 @@
 import logging
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import select, update
-from sqlalchemy.orm import joinedload
-from datetime import datetime
+from sqlalchemy import case, func, select, update
+from datetime import datetime, time, timedelta
 
 from app.core.exceptions import DatabaseConnectionException
 from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
 from app.domain.repositories.i_practice_repo import IPracticeRepo
 from app.infrastructure.database.mysql_connection import mysql_connection
 from app.infrastructure.database.models.practice_model import PracticeModel
@@ -14,9 +14,111 @@ from app.infrastructure.database.models.practice_model import PracticeModel
 logger = logging.getLogger(__name__)
 
 
+def _filter_conditions(practice_filter: PracticeFilter) -> list:
+    conditions = []
+    if practice_filter.date_from:
+        conditions.append(PracticeModel.practice_datetime >= datetime.combine(practice_filter.date_from, time.min))
+    if practice_filter.date_to:
+        # Inclusive end date: before the start of the next day
+        conditions.append(
+            PracticeModel.practice_datetime < datetime.combine(practice_filter.date_to + timedelta(days=1), time.min)
+        )
+    if practice_filter.uid:
+        conditions.append(PracticeModel.id_student == practice_filter.uid)
+    if practice_filter.practice_ids:
+        conditions.append(PracticeModel.id.in_(practice_filter.practice_ids))
+    return conditions
+
+
 class MySQLPracticeRepository(IPracticeRepo):
     """Concrete implementation of IPracticeRepo using MySQL."""
 
+    async def get_by_id(self, practice_id: int) -> Optional[Practice]:
+        try:
+            async with mysql_connection.get_async_session() as session:
+                result = await session.execute(
+                    select(PracticeModel).where(PracticeModel.id == practice_id)
+                )
+                model = result.scalar_one_or_none()
+                if not model:
+                    logger.warning("No practice found with id=%s", practice_id)
+                    return None
+                return self._model_to_entity(model)
+
+        except SQLAlchemyError as e:
+            logger.error(
+                "MySQL error fetching practice_id=%s: %s", practice_id, e,
+                exc_info=True,
+            )
+            raise DatabaseConnectionException(f"Error fetching practice: {str(e)}")
+
+    async def find_by_filter(self, practice_filter: PracticeFilter, after_id: int, limit: int) -> List[Practice]:
+        # Keyset pagination on the primary key: every page is an index range scan
+        try:
+            async with mysql_connection.get_async_session() as session:
+                result = await session.execute(
+                    select(PracticeModel)
+                    .where(PracticeModel.id > after_id, *_filter_conditions(practice_filter))
+                    .order_by(PracticeModel.id)
+                    .limit(limit)
+                )
+                return [self._model_to_entity(model) for model in result.scalars()]
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error listing practices after id=%s: %s", after_id, e, exc_info=True)
+            raise DatabaseConnectionException(f"Error listing practices: {str(e)}")
+
+    async def count_by_filter(self, practice_filter: PracticeFilter) -> int:
+        try:
+            async with mysql_connection.get_async_session() as session:
+                result = await session.execute(
+                    select(func.count(PracticeModel.id)).where(*_filter_conditions(practice_filter))
+                )
+                return result.scalar_one()
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error counting practices: %s", e, exc_info=True)
+            raise DatabaseConnectionException(f"Error counting practices: {str(e)}")
+
+    async def bulk_update_error_counts(self, counts: Dict[int, Tuple[Optional[int], Optional[int]]]) -> None:
+        """
+        Update the error counters of many practices in one statement.
+
+        ``counts`` maps practice_id -> (num_postural_errors, num_musical_errors);
+        None leaves that counter unchanged. Issued as a single
+        ``UPDATE ... SET col = CASE id WHEN ... END WHERE id IN (...)``.
+        """
+        if not counts:
+            return
+
+        postural = {pid: values[0] for pid, values in counts.items() if values[0] is not None}
+        musical = {pid: values[1] for pid, values in counts.items() if values[1] is not None}
+
+        values = {}
+        if postural:
+            values["num_postural_errors"] = case(
+                postural, value=PracticeModel.id, else_=PracticeModel.num_postural_errors
+            )
+        if musical:
+            values["num_musical_errors"] = case(
+                musical, value=PracticeModel.id, else_=PracticeModel.num_musical_errors
+            )
+
+        try:
+            async with mysql_connection.get_async_session() as session:
+                await session.execute(
+                    update(PracticeModel)
+                    .where(PracticeModel.id.in_(list(counts)))
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+                logger.debug("Bulk updated error counters for %s practices", len(counts))
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error bulk updating error counters: %s", e, exc_info=True)
+            raise DatabaseConnectionException(f"Error updating practices: {str(e)}")
+
     async def update_num_postural_errors(
         self, practice_id: int, num_errors: int
     ) -> Optional[Practice]:
@@ -30,25 +132,23 @@ class MySQLPracticeRepository(IPracticeRepo):
                 await session.execute(stmt)
                 await session.commit()
 
-                # fetch updated row + join con Student
+                # fetch updated row (student data comes from the student cache)
                 result = await session.execute(
-                    select(PracticeModel)
-                    .options(joinedload(PracticeModel.student))
-                    .where(PracticeModel.id == practice_id)
+                    select(PracticeModel).where(PracticeModel.id == practice_id)
                 )
                 model = result.scalar_one_or_none()
                 if not model:
-                    logger.warning(f"No practice found with id={practice_id}")
+                    logger.warning("No practice found with id=%s", practice_id)
                     return None
 
                 logger.debug(
-                    f"Updated num_postural_errors={num_errors} for practice_id={practice_id}"
+                    "Updated num_postural_errors=%s for practice_id=%s", num_errors, practice_id
                 )
                 return self._model_to_entity(model)
 
         except SQLAlchemyError as e:
             logger.error(
-                f"MySQL error updating num_postural_errors for practice_id={practice_id}: {e}",
+                "MySQL error updating num_postural_errors for practice_id=%s: %s", practice_id, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Error updating practice: {str(e)}")
@@ -66,25 +166,23 @@ class MySQLPracticeRepository(IPracticeRepo):
                 await session.execute(stmt)
                 await session.commit()
 
-                # fetch updated row + join con Student
+                # fetch updated row (student data comes from the student cache)
                 result = await session.execute(
-                    select(PracticeModel)
-                    .options(joinedload(PracticeModel.student))
-                    .where(PracticeModel.id == practice_id)
+                    select(PracticeModel).where(PracticeModel.id == practice_id)
                 )
                 model = result.scalar_one_or_none()
                 if not model:
-                    logger.warning(f"No practice found with id={practice_id}")
+                    logger.warning("No practice found with id=%s", practice_id)
                     return None
 
                 logger.debug(
-                    f"Updated num_musical_errors={num_errors} for practice_id={practice_id}"
+                    "Updated num_musical_errors=%s for practice_id=%s", num_errors, practice_id
                 )
                 return self._model_to_entity(model)
 
         except SQLAlchemyError as e:
             logger.error(
-                f"MySQL error updating num_musical_errors for practice_id={practice_id}: {e}",
+                "MySQL error updating num_musical_errors for practice_id=%s: %s", practice_id, e,
                 exc_info=True,
             )
             raise DatabaseConnectionException(f"Error updating practice: {str(e)}")
@@ -102,7 +200,7 @@ class MySQLPracticeRepository(IPracticeRepo):
             num_musical_errors=int(model.num_musical_errors) if model.num_musical_errors else 0,
             duration=int(model.duration) if model.duration else 0,
             id_student=model.id_student,
-            student_name=model.student.name if model.student else None,
+            student_name=None,  # StudentService
             scale="",        # DTO
             scale_type="",   # DTO
             bpm=model.bpm,
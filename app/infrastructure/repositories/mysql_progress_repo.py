@@ -0,0 +1,119 @@
+import logging
+from datetime import date
+from typing import List, Tuple
+from sqlalchemy import desc, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.exceptions import DatabaseConnectionException
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.entities.progress_report import PracticeErrorCounts
+from app.domain.repositories.i_progress_repo import IProgressRepo
+from app.infrastructure.database.models.musical_error_model import MusicalErrorModel
+from app.infrastructure.database.models.postural_error_model import PosturalErrorModel
+from app.infrastructure.database.models.practice_model import PracticeModel
+from app.infrastructure.database.mysql_connection import mysql_connection
+from app.infrastructure.repositories.mysql_practice_repo import _filter_conditions
+
+logger = logging.getLogger(__name__)
+
+
+def _practice_ids(uid: str, date_from: date, date_to: date):
+    return select(PracticeModel.id).where(*_filter_conditions(PracticeFilter(date_from, date_to, uid)))
+
+
+def _counts_by_practice(model, practice_ids):
+    """Error count of each practice with errors, grouped in the database."""
+    return (
+        select(model.id_practice, func.count().label("errors"))
+        .where(model.id_practice.in_(practice_ids))
+        .group_by(model.id_practice)
+        .subquery()
+    )
+
+
+class MySQLProgressRepository(IProgressRepo):
+    """
+    Concrete implementation of IProgressRepo using MySQL.
+
+    Every statistic is a GROUP BY computed by the database: only one row per
+    practice or per distinct value comes back, never the error rows.
+    """
+
+    async def get_error_counts(self, uid: str, date_from: date, date_to: date) -> PracticeErrorCounts:
+        practice_ids = _practice_ids(uid, date_from, date_to)
+        postural = _counts_by_practice(PosturalErrorModel, practice_ids)
+        musical = _counts_by_practice(MusicalErrorModel, practice_ids)
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(
+                        PracticeModel.id,
+                        PracticeModel.practice_datetime,
+                        PracticeModel.id_scale,
+                        PracticeModel.bpm,
+                        PracticeModel.figure,
+                        func.coalesce(postural.c.errors, 0),
+                        func.coalesce(musical.c.errors, 0),
+                    )
+                    .outerjoin(postural, postural.c.id_practice == PracticeModel.id)
+                    .outerjoin(musical, musical.c.id_practice == PracticeModel.id)
+                    .where(*_filter_conditions(PracticeFilter(date_from, date_to, uid)))
+                    .order_by(PracticeModel.practice_datetime, PracticeModel.id)
+                )
+                counts = PracticeErrorCounts.from_rows(result)
+                logger.debug("Fetched error counts of %s practices for uid=%s", len(counts), uid)
+                return counts
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error counting errors by practice for uid=%s: %s", uid, e, exc_info=True)
+            raise DatabaseConnectionException(f"Error counting errors by practice: {str(e)}")
+
+    async def get_top_explications(self, uid: str, date_from: date, date_to: date, limit: int) -> List[Tuple[str, int]]:
+        count = func.count().label("errors")
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(PosturalErrorModel.explication, count)
+                    .where(PosturalErrorModel.id_practice.in_(_practice_ids(uid, date_from, date_to)))
+                    .group_by(PosturalErrorModel.explication)
+                    .order_by(desc(count), PosturalErrorModel.explication)
+                    .limit(limit)
+                )
+                return [(explication, errors) for explication, errors in result]
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error grouping postural errors for uid=%s: %s", uid, e, exc_info=True)
+            raise DatabaseConnectionException(f"Error grouping postural errors: {str(e)}")
+
+    async def get_top_wrong_notes(
+        self, uid: str, date_from: date, date_to: date, limit: int
+    ) -> List[Tuple[Tuple[str, str], int]]:
+        count = func.count().label("errors")
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(MusicalErrorModel.note_played, MusicalErrorModel.note_correct, count)
+                    .where(MusicalErrorModel.id_practice.in_(_practice_ids(uid, date_from, date_to)))
+                    .group_by(MusicalErrorModel.note_played, MusicalErrorModel.note_correct)
+                    .order_by(desc(count), MusicalErrorModel.note_played, MusicalErrorModel.note_correct)
+                    .limit(limit)
+                )
+                return [((note_played, note_correct), errors) for note_played, note_correct, errors in result]
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error grouping musical errors for uid=%s: %s", uid, e, exc_info=True)
+            raise DatabaseConnectionException(f"Error grouping musical errors: {str(e)}")
+
+    async def get_students_with_practices(self, date_from: date, date_to: date) -> List[str]:
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(PracticeModel.id_student)
+                    .where(*_filter_conditions(PracticeFilter(date_from, date_to)))
+                    .group_by(PracticeModel.id_student)
+                    .order_by(PracticeModel.id_student)
+                )
+                return list(result.scalars())
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error listing students with practices: %s", e, exc_info=True)
+            raise DatabaseConnectionException(f"Error listing students: {str(e)}")
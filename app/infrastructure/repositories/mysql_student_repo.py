@@ -0,0 +1,31 @@
+import logging
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.exceptions import DatabaseConnectionException
+from app.domain.entities.student import Student
+from app.domain.repositories.i_student_repo import IStudentRepo
+from app.infrastructure.database.models.student_model import StudentModel
+from app.infrastructure.database.mysql_connection import mysql_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MySQLStudentRepository(IStudentRepo):
+    """Concrete implementation of IStudentRepo using MySQL."""
+
+    async def get_by_uid(self, uid: str) -> Optional[Student]:
+        try:
+            async with mysql_connection.get_async_connection() as conn:
+                result = await conn.execute(
+                    select(StudentModel.uid, StudentModel.name).where(StudentModel.uid == uid)
+                )
+                row = result.first()
+                if row is None:
+                    logger.warning("No student found with uid=%s", uid)
+                    return None
+                return Student(*row)
+
+        except SQLAlchemyError as e:
+            logger.error("MySQL error fetching student uid=%s: %s", uid, e, exc_info=True)
+            raise DatabaseConnectionException(f"Error fetching student: {str(e)}")
@@ -0,0 +1,63 @@
+from typing import Dict, List
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.domain.repositories.i_musical_error_repo import IMusicalErrorRepo
+from app.domain.repositories.i_postural_error_repo import IPosturalErrorRepo
+
+
+class PrefetchedPosturalErrorRepository(IPosturalErrorRepo):
+    """
+    Serves the errors of a batch of practices fetched together in one query.
+
+    Each prefetched batch is handed out once, so a later read (a new report of the
+    same practice) sees current data from the wrapped repository. Prefetching a
+    new chunk drops whatever the previous one did not hand out.
+    """
+
+    def __init__(self, error_repo: IPosturalErrorRepo):
+        self.error_repo = error_repo
+        self._prefetched: Dict[int, PosturalErrorBatch] = {}
+
+    async def prefetch(self, practice_ids: List[int]):
+        # Replaces the previous chunk: errors it did not hand out are not kept
+        self._prefetched = await self.error_repo.get_by_practices(practice_ids)
+
+    async def get_by_practice(self, practice_id: int) -> PosturalErrorBatch:
+        errors = self._prefetched.pop(practice_id, None)
+        if errors is not None:
+            return errors
+        return await self.error_repo.get_by_practice(practice_id)
+
+    async def count_by_practice(self, practice_id: int) -> int:
+        errors = self._prefetched.get(practice_id)
+        if errors is not None:
+            return len(errors)
+        return await self.error_repo.count_by_practice(practice_id)
+
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, PosturalErrorBatch]:
+        return await self.error_repo.get_by_practices(practice_ids)
+
+
+class PrefetchedMusicalErrorRepository(IMusicalErrorRepo):
+    """Musical error counterpart of PrefetchedPosturalErrorRepository."""
+
+    def __init__(self, error_repo: IMusicalErrorRepo):
+        self.error_repo = error_repo
+        self._prefetched: Dict[int, MusicalErrorBatch] = {}
+
+    async def prefetch(self, practice_ids: List[int]):
+        self._prefetched = await self.error_repo.get_by_practices(practice_ids)
+
+    async def get_by_practice(self, practice_id: int) -> MusicalErrorBatch:
+        errors = self._prefetched.pop(practice_id, None)
+        if errors is not None:
+            return errors
+        return await self.error_repo.get_by_practice(practice_id)
+
+    async def count_by_practice(self, practice_id: int) -> int:
+        errors = self._prefetched.get(practice_id)
+        if errors is not None:
+            return len(errors)
+        return await self.error_repo.count_by_practice(practice_id)
+
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, MusicalErrorBatch]:
+        return await self.error_repo.get_by_practices(practice_ids)
\ No newline at end of file
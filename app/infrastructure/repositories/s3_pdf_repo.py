@@ -0,0 +1,86 @@
+import logging
+import time
+from typing import AsyncIterator, Optional, Tuple
+from app.core import metrics
+from app.infrastructure.repositories.local_pdf_repo import LocalPDFRepository
+from app.infrastructure.storage.s3_client import S3Client
+
+logger = logging.getLogger(__name__)
+
+S3_SCHEME = "s3://"
+
+
+class S3PDFRepository(LocalPDFRepository):
+    """
+    IPDFRepo on S3-compatible object storage. Reports are rendered as in
+    LocalPDFRepository and stored under the same key layout as the local volume
+    ({prefix}{uid}/reports/{filename}); the path saved in the metadata is the
+    s3://bucket/key URI of the report.
+    """
+
+    def __init__(self, client: S3Client, prefix: str = "", part_size: int = 8 * 1024 * 1024, upload_concurrency: int = 4):
+        # No local base directory: reports never touch the disk
+        self.client = client
+        self.prefix = prefix
+        self.part_size = part_size
+        self.upload_concurrency = upload_concurrency
+
+    def _key(self, pdf_path: str) -> str:
+        bucket, _, key = pdf_path.removeprefix(S3_SCHEME).partition("/")
+        if not pdf_path.startswith(S3_SCHEME) or bucket != self.client.bucket:
+            raise ValueError(f"Not a report of bucket {self.client.bucket}: {pdf_path}")
+        return key
+
+    def get_pdf_path(self, uid: str, filename: str) -> str:
+        """Path a PDF with this filename is saved at."""
+        return f"{S3_SCHEME}{self.client.bucket}/{self.prefix}{uid}/reports/{filename}"
+
+    async def save_pdf(self, uid: str, filename: str, content: bytes) -> str:
+        """Save PDF content and return the file path."""
+        start = time.perf_counter()
+        pdf_path = self.get_pdf_path(uid, filename)
+        try:
+            # An object only becomes visible once fully uploaded, readers never see part of it
+            await self.client.upload(
+                self._key(pdf_path), content, "application/pdf", self.part_size, self.upload_concurrency
+            )
+            logger.info("PDF saved at %s", pdf_path)
+            return pdf_path
+        except Exception as e:
+            logger.error("Error saving PDF %s: %s", filename, e)
+            raise
+        finally:
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - start, stage="save_pdf")
+
+    async def delete_pdf(self, pdf_path: str) -> None:
+        """Remove a saved PDF; nothing happens if it does not exist."""
+        try:
+            key = self._key(pdf_path)
+        except ValueError:
+            await super().delete_pdf(pdf_path)
+            return
+        await self.client.delete(key)
+        logger.info("PDF removed at %s", pdf_path)
+
+    async def stat_pdf(self, pdf_path: str) -> Optional[Tuple[int, float]]:
+        """Return (size in bytes, modification time) of a saved PDF, or None if it does not exist."""
+        try:
+            key = self._key(pdf_path)
+        except ValueError:
+            # A report stored on the local volume before moving to object storage
+            return await super().stat_pdf(pdf_path)
+        return await self.client.head(key)
+
+    async def read_pdf(self, pdf_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the bytes of a saved PDF from start up to end (exclusive), in chunks."""
+        try:
+            key = self._key(pdf_path)
+        except ValueError:
+            chunks = super().read_pdf(pdf_path, start, end)
+        else:
+            chunks = self.client.get_range(key, start, end)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
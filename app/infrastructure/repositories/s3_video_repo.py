@@ -0,0 +1,38 @@
+from app.infrastructure.repositories.local_video_repo import LocalVideoRepository
+from app.infrastructure.storage.s3_client import S3Client
+
+
+class S3VideoRepository(LocalVideoRepository):
+    """
+    IVideoRepo on S3-compatible object storage, under the same key layout as the
+    local volume ({prefix}{uid}/videos/practice_{id}.mp4).
+
+    The video is never downloaded: OpenCV opens a presigned URL and its FFmpeg
+    backend reads the container index and then only the byte ranges of the
+    frames it seeks to, over HTTP range requests.
+    """
+
+    def __init__(
+        self,
+        client: S3Client,
+        prefix: str = "",
+        url_expires_seconds: int = 900,
+        screenshots_dir: str | None = None
+    ):
+        super().__init__(base_dir=None, screenshots_dir=screenshots_dir)
+        self.client = client
+        self.prefix = prefix
+        # Must outlast the extraction: FFmpeg requests every range with the same URL
+        self.url_expires_seconds = url_expires_seconds
+
+    def _key(self, uid: str, practice_id: int) -> str:
+        return f"{self.prefix}{uid}/videos/practice_{practice_id}.mp4"
+
+    async def get_video(self, uid: str, practice_id: int) -> str:
+        """Retrieve a presigned URL of the video of the given practice ID."""
+        return self.client.presign_get(self._key(uid, practice_id), self.url_expires_seconds)
+
+    def video_label(self, uid: str, practice_id: int) -> str:
+        """The object URI: the presigned URL carries live credentials and must stay out of logs."""
+        return f"s3://{self.client.bucket}/{self._key(uid, practice_id)}"
+
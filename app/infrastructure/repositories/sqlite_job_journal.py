@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.domain.entities.job_record import JobRecord
+from app.domain.repositories.i_job_journal_repo import IJobJournalRepo
+from app.shared.enums import JobStage
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key TEXT PRIMARY KEY,
+    uid TEXT NOT NULL,
+    practice_id INTEGER NOT NULL,
+    stage INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_updated_at ON jobs (updated_at);
+"""
+
+
+class SQLiteJobJournal(IJobJournalRepo):
+    """
+    Job journal in a local SQLite database in WAL mode, on the storage volume next
+    to the artefacts it points to. synchronous=NORMAL keeps every committed stage
+    across a process crash; only an OS crash can lose the latest ones, which then
+    simply run again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info("Job journal opened at %s", self.path)
+        return self._conn
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(self._connection(), *args)
+        return await asyncio.to_thread(locked)
+
+    async def get(self, job_key: str) -> Optional[JobRecord]:
+        row = await self._run(
+            lambda conn: conn.execute(
+                "SELECT uid, practice_id, stage, data FROM jobs WHERE job_key = ?", (job_key,)
+            ).fetchone()
+        )
+        if row is None:
+            return None
+
+        uid, practice_id, stage, data = row
+        record = JobRecord(job_key, uid, practice_id, JobStage(stage), json.loads(data))
+        if "screenshots" in record.data:
+            # JSON object keys are strings; screenshots are keyed by error index
+            record.data["screenshots"] = {int(k): v for k, v in record.data["screenshots"].items()}
+        return self._verify_artefacts(record)
+
+    def _verify_artefacts(self, record: JobRecord) -> Optional[JobRecord]:
+        """Step back to the last stage whose artefacts still exist (e.g. /tmp cleared by a new container)."""
+        pdf_path = record.data.get("pdf_path", "")
+        # Reports in object storage (s3://...) outlive the container, unlike its /tmp
+        stored_remotely = "://" in pdf_path
+        pdf_missing = not record.data.get("pdf_deferred") and not stored_remotely and not os.path.exists(pdf_path)
+        if record.stage is JobStage.PDF_SAVED and pdf_missing:
+            record.stage = JobStage.SCREENSHOTS
+        if record.stage is JobStage.SCREENSHOTS:
+            screenshots = record.data.get("screenshots", {})
+            if not all(path is None or os.path.exists(path) for path in screenshots.values()):
+                record.stage = JobStage.COUNTED
+        return record
+
+    async def record(self, job_key: str, uid: str, practice_id: int, stage: JobStage, data: dict) -> None:
+        def write(conn: sqlite3.Connection):
+            row = conn.execute("SELECT data FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+            merged = {**(json.loads(row[0]) if row else {}), **data}
+            conn.execute(
+                "INSERT INTO jobs (job_key, uid, practice_id, stage, data, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_key) DO UPDATE SET stage = excluded.stage, data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                (job_key, uid, practice_id, int(stage), json.dumps(merged), time.time()),
+            )
+        await self._run(write)
+
+    async def forget(self, job_key: str) -> None:
+        def delete(conn: sqlite3.Connection):
+            row = conn.execute("SELECT data FROM jobs WHERE job_key = ?", (job_key,)).fetchone()
+            conn.execute("DELETE FROM jobs WHERE job_key = ?", (job_key,))
+            if row:
+                _remove_screenshots(json.loads(row[0]))
+        await self._run(delete)
+
+    async def prune(self, max_age_seconds: float) -> int:
+        def delete(conn: sqlite3.Connection) -> int:
+            cutoff = time.time() - max_age_seconds
+            rows = conn.execute("SELECT data FROM jobs WHERE updated_at < ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,))
+            for (data,) in rows:
+                _remove_screenshots(json.loads(data))
+            return len(rows)
+        removed = await self._run(delete)
+        if removed:
+            logger.info("Pruned %s stale jobs from the journal", removed)
+        return removed
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _remove_screenshots(data: dict):
+    """Screenshots live in one directory per job; the report build normally removes them already."""
+    for directory in {os.path.dirname(path) for path in data.get("screenshots", {}).values() if path}:
+        shutil.rmtree(directory, ignore_errors=True)
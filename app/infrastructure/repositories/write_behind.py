@@ -0,0 +1,242 @@
+import asyncio
+import dataclasses
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.repositories.i_metadata_repo import IMetadataRepo
+from app.domain.repositories.i_practice_repo import IPracticeRepo
+from app.infrastructure.repositories.mongo_metadata_repo import MongoMetadataRepo
+from app.infrastructure.repositories.mysql_practice_repo import MySQLPracticeRepository
+
+logger = logging.getLogger(__name__)
+
+# (pdf_path, degraded, if_ready, fencing_token, scale) of a buffered report write
+_ReportWrite = Tuple[str, bool, bool, Optional[int], Optional[Tuple[str, str]]]
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces practice counter updates and report path writes for a short window.
+
+    Writes accumulate in the current batch and are flushed together, at most
+    ``flush_interval`` seconds later (or as soon as ``max_batch`` writes are
+    pending): one multi-row ``UPDATE ... CASE`` in MySQL and one unordered
+    ``bulk_write`` in Mongo. Callers that need durability (before committing
+    the Kafka offsets that cover their writes) await ``flushed()``, which
+    resolves once the batches holding their writes are stored, or raises if a
+    flush failed. Writes of a failed flush go back to the buffer and are
+    retried with the next batch, so a later ``flushed()`` only resolves once
+    they are stored too.
+    """
+
+    def __init__(
+        self,
+        practice_repo: MySQLPracticeRepository,
+        metadata_repo: MongoMetadataRepo,
+        flush_interval: float,
+        max_batch: int,
+    ):
+        self.practice_repo = practice_repo
+        self.metadata_repo = metadata_repo
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._counts: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+        self._reports: Dict[Tuple[str, int], _ReportWrite] = {}
+        self._batch_done: Optional[asyncio.Future] = None
+        # Batch being stored by flush(), until its writes finish
+        self._in_flight: Optional[asyncio.Future] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._counts) + len(self._reports)
+
+    def _current_batch(self) -> asyncio.Future:
+        if self._batch_done is None:
+            self._batch_done = asyncio.get_running_loop().create_future()
+        return self._batch_done
+
+    def _written(self):
+        self._current_batch()
+        if self.pending >= self.max_batch:
+            self._wakeup.set()
+
+    def set_counts(self, practice_id: int, num_postural_errors: Optional[int] = None, num_musical_errors: Optional[int] = None):
+        postural, musical = self._counts.get(practice_id, (None, None))
+        self._counts[practice_id] = (
+            num_postural_errors if num_postural_errors is not None else postural,
+            num_musical_errors if num_musical_errors is not None else musical,
+        )
+        self._written()
+
+    def pending_counts(self, practice_id: int) -> Tuple[Optional[int], Optional[int]]:
+        return self._counts.get(practice_id, (None, None))
+
+    def set_report(
+        self, uid: str, practice_id: int, pdf_path: str, degraded: bool, if_ready: bool = False,
+        fencing_token: Optional[int] = None, scale: Optional[Tuple[str, str]] = None
+    ):
+        self._reports[(uid, practice_id)] = (pdf_path, degraded, if_ready, fencing_token, scale)
+        self._written()
+
+    def pending_report(self, uid: str, practice_id: int) -> Optional[Tuple[str, bool]]:
+        report = self._reports.get((uid, practice_id))
+        return report[:2] if report else None
+
+    def pending_scale(self, uid: str, practice_id: int) -> Optional[Tuple[str, str]]:
+        report = self._reports.get((uid, practice_id))
+        return report[4] if report else None
+
+    async def flushed(self):
+        """Wait until every write buffered so far is stored."""
+        for batch in (self._in_flight, self._batch_done):
+            if batch is not None:
+                await asyncio.shield(batch)
+
+    def _requeue(self, counts: Dict[int, Tuple[Optional[int], Optional[int]]], reports: Dict[Tuple[str, int], _ReportWrite]):
+        # Writes buffered while the flush ran are newer and win
+        for practice_id, (postural, musical) in counts.items():
+            newer_postural, newer_musical = self._counts.get(practice_id, (None, None))
+            self._counts[practice_id] = (
+                newer_postural if newer_postural is not None else postural,
+                newer_musical if newer_musical is not None else musical,
+            )
+        for key, report in reports.items():
+            self._reports.setdefault(key, report)
+        self._current_batch()
+
+    async def flush(self):
+        """Store the current batch now."""
+        async with self._flush_lock:
+            counts, self._counts = self._counts, {}
+            reports, self._reports = self._reports, {}
+            batch_done, self._batch_done = self._batch_done, None
+            if batch_done is None:
+                return
+
+            self._in_flight = batch_done
+            try:
+                await self.practice_repo.bulk_update_error_counts(counts)
+                await self.metadata_repo.bulk_save_pdf_paths(reports)
+            except Exception as e:
+                logger.error(
+                    "Write-behind flush failed (%s counters, %s reports), retrying with the next batch: %s",
+                    len(counts), len(reports), e,
+                )
+                self._requeue(counts, reports)
+                batch_done.set_exception(e)
+                # Waiters see the error; mark it retrieved for batches nobody waits on
+                batch_done.exception()
+            else:
+                batch_done.set_result(None)
+            finally:
+                self._in_flight = None
+
+    async def run(self):
+        """Flush periodically until cancelled, then flush what is left."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        finally:
+            await self.flush()
+
+
+class WriteBehindPracticeRepository(IPracticeRepo):
+    """IPracticeRepo that buffers counter updates in a WriteBehindBuffer."""
+
+    def __init__(self, practice_repo: MySQLPracticeRepository, buffer: WriteBehindBuffer):
+        self.practice_repo = practice_repo
+        self.buffer = buffer
+
+    async def get_by_id(self, practice_id: int) -> Optional[Practice]:
+        practice = await self.practice_repo.get_by_id(practice_id)
+        if practice is None:
+            return None
+
+        # Reads see buffered counters that are not stored yet
+        postural, musical = self.buffer.pending_counts(practice_id)
+        return dataclasses.replace(
+            practice,
+            num_postural_errors=postural if postural is not None else practice.num_postural_errors,
+            num_musical_errors=musical if musical is not None else practice.num_musical_errors,
+        )
+
+    async def update_num_postural_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
+        self.buffer.set_counts(practice_id, num_postural_errors=num_errors)
+        return await self.get_by_id(practice_id)
+
+    async def update_num_musical_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
+        self.buffer.set_counts(practice_id, num_musical_errors=num_errors)
+        return await self.get_by_id(practice_id)
+
+    async def find_by_filter(self, practice_filter: PracticeFilter, after_id: int, limit: int) -> List[Practice]:
+        return await self.practice_repo.find_by_filter(practice_filter, after_id, limit)
+
+    async def count_by_filter(self, practice_filter: PracticeFilter) -> int:
+        return await self.practice_repo.count_by_filter(practice_filter)
+
+
+class WriteBehindMetadataRepo(IMetadataRepo):
+    """
+    IMetadataRepo that buffers report path writes in a WriteBehindBuffer.
+
+    Saves return True once the write is buffered, not stored. A conditional save
+    rejected at flush time (no longer ready, or superseded) is only counted in the
+    warning of the bulk write: Mongo does not report which updates matched.
+    """
+
+    def __init__(self, metadata_repo: MongoMetadataRepo, buffer: WriteBehindBuffer):
+        self.metadata_repo = metadata_repo
+        self.buffer = buffer
+
+    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str, degraded: bool = False) -> bool:
+        self.buffer.set_report(uid, practice_id, pdf_path, degraded)
+        return True
+
+    async def save_pdf_path_if_ready(
+        self,
+        uid: str,
+        practice_id: int,
+        pdf_path: str,
+        degraded: bool = False,
+        fencing_token: Optional[int] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        # True means buffered: the readiness and fencing conditions apply in the bulk write at flush time
+        self.buffer.set_report(
+            uid, practice_id, pdf_path, degraded, if_ready=True, fencing_token=fencing_token, scale=scale
+        )
+        return True
+
+    async def get_processing_flags(self, uid: str, practice_id: int) -> Optional[Tuple[bool, bool]]:
+        return await self.metadata_repo.get_processing_flags(uid, practice_id)
+
+    async def get_report(self, uid: str, practice_id: int) -> Optional[Tuple[Optional[str], bool]]:
+        # A buffered path is newer than the stored one (if_ready writes may still be rejected at flush)
+        pending = self.buffer.pending_report(uid, practice_id)
+        if pending is not None:
+            return pending
+        return await self.metadata_repo.get_report(uid, practice_id)
+
+    async def find_degraded_reports(self, limit: int) -> List[Tuple[str, int]]:
+        return await self.metadata_repo.find_degraded_reports(limit)
+
+    async def get_scales(self, practices: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[str, str]]:
+        scales = await self.metadata_repo.get_scales(practices)
+        for uid, practice_id in practices:
+            pending = self.buffer.pending_scale(uid, practice_id)
+            if pending is not None:
+                scales[(uid, practice_id)] = pending
+        return scales
+
+    async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
+        return await self.metadata_repo.is_video_and_audio_done(uid, practice_id)
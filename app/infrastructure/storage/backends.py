@@ -0,0 +1,56 @@
+import logging
+from typing import Optional, Tuple
+from app.core.config import settings
+from app.domain.repositories.i_pdf_repo import IPDFRepo
+from app.domain.repositories.i_video_repo import IVideoRepo
+from app.infrastructure.repositories.local_pdf_repo import LocalPDFRepository
+from app.infrastructure.repositories.local_video_repo import LocalVideoRepository
+from app.infrastructure.repositories.s3_pdf_repo import S3PDFRepository
+from app.infrastructure.repositories.s3_video_repo import S3VideoRepository
+from app.infrastructure.storage.s3_client import S3Client
+
+logger = logging.getLogger(__name__)
+
+
+def create_s3_client() -> S3Client:
+    if not settings.S3_BUCKET:
+        raise ValueError("S3_BUCKET is required with STORAGE_BACKEND=s3")
+    return S3Client(
+        settings.S3_ENDPOINT_URL or f"https://s3.{settings.S3_REGION}.amazonaws.com",
+        settings.S3_BUCKET,
+        settings.S3_ACCESS_KEY_ID,
+        settings.S3_SECRET_ACCESS_KEY,
+        settings.S3_REGION,
+        settings.S3_MAX_CONNECTIONS,
+    )
+
+
+def create_storage_repos(
+    screenshots_dir: Optional[str] = None,
+    s3_client: Optional[S3Client] = None
+) -> Tuple[IPDFRepo, IVideoRepo, Optional[S3Client]]:
+    """
+    PDF and video repositories of the configured STORAGE_BACKEND, and the S3
+    client they share (None on local storage) to close at shutdown.
+    """
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalPDFRepository(), LocalVideoRepository(screenshots_dir=screenshots_dir), None
+    if backend != "s3":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+    client = s3_client or create_s3_client()
+    logger.info("Storing reports and reading videos from bucket %s at %s", client.bucket, client.endpoint_url)
+    pdf_repo = S3PDFRepository(
+        client,
+        settings.S3_PREFIX,
+        part_size=settings.S3_MULTIPART_PART_SIZE_MB * 1024 * 1024,
+        upload_concurrency=settings.S3_UPLOAD_CONCURRENCY,
+    )
+    video_repo = S3VideoRepository(
+        client,
+        settings.S3_PREFIX,
+        url_expires_seconds=settings.S3_PRESIGNED_URL_EXPIRES_SECONDS,
+        screenshots_dir=screenshots_dir,
+    )
+    return pdf_repo, video_repo, client
@@ -0,0 +1,442 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import ssl
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+from app.core import metrics
+from app.core.exceptions import ObjectStorageException
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_TOTAL = metrics.counter(
+    "object_storage_requests_total", "Object storage requests by operation and status", ["operation", "status"]
+)
+OPEN_CONNECTIONS = metrics.gauge("object_storage_open_connections", "Object storage connections currently open")
+POOL_WAIT_SECONDS = metrics.histogram(
+    "object_storage_pool_wait_seconds",
+    "Time spent waiting for a free object storage connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+
+CONNECT_TIMEOUT_SECONDS = 10
+READ_TIMEOUT_SECONDS = 30
+READ_CHUNK_BYTES = 64 * 1024
+# S3 rejects multipart parts under 5 MiB, except the last one
+MIN_PART_SIZE_BYTES = 5 * 1024 * 1024
+
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+_UNRESERVED = "-_.~"
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the server before the request got an answer."""
+
+
+def _amz_dates() -> Tuple[str, str]:
+    now = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%dT%H%M%SZ"), now.strftime("%Y%m%d")
+
+
+def _canonical_query(query: Dict[str, str]) -> str:
+    return "&".join(
+        f"{quote(name, safe=_UNRESERVED)}={quote(value, safe=_UNRESERVED)}" for name, value in sorted(query.items())
+    )
+
+
+def _xml_text(body: bytes, tag: str) -> Optional[str]:
+    """Text of the first element with this local name, whatever the namespace."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return None
+    for element in root.iter():
+        if element.tag.rpartition("}")[2] == tag:
+            return element.text
+    return None
+
+
+class S3Client:
+    """
+    Client of an S3-compatible object store (AWS S3, MinIO, Ceph RGW...) over
+    HTTP/1.1, path-style addressing and Signature V4.
+
+    Connections are kept alive and reused across requests, at most
+    max_connections at once; requests beyond that wait for a free one. Objects
+    are read in ranges and streamed, and large uploads go in multipart parts.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str = "",
+        secret_access_key: str = "",
+        region: str = "us-east-1",
+        max_connections: int = 10
+    ):
+        endpoint = urlsplit(endpoint_url)
+        self.scheme = endpoint.scheme or "http"
+        self.host = endpoint.hostname or "localhost"
+        self.port = endpoint.port or (443 if self.scheme == "https" else 80)
+        self.netloc = endpoint.netloc
+        self.endpoint_url = f"{self.scheme}://{self.netloc}"
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.max_connections = max_connections
+        self._ssl = ssl.create_default_context() if self.scheme == "https" else None
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    # --- Objects ---
+
+    def object_path(self, key: str) -> str:
+        return f"/{quote(self.bucket, safe=_UNRESERVED)}/{quote(key, safe='/' + _UNRESERVED)}"
+
+    async def head(self, key: str) -> Optional[Tuple[int, float]]:
+        """(size in bytes, modification time) of an object, or None if it does not exist."""
+        status, headers, _ = await self._request("head", "HEAD", key, expected=(200, 404))
+        if status == 404:
+            return None
+        modified = headers.get("last-modified")
+        return int(headers.get("content-length", 0)), parsedate_to_datetime(modified).timestamp() if modified else 0.0
+
+    async def get_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the bytes [start, end) of an object, in chunks, as they arrive."""
+        if end <= start:
+            return
+        headers = {"range": f"bytes={start}-{end - 1}"}
+        async with self._connection() as connection:
+            status, response_headers = await self._send(connection, "GET", key, {}, headers, b"")
+            REQUESTS_TOTAL.inc(operation="get", status=status)
+            if status not in (200, 206):
+                body = b"".join([chunk async for chunk in self._body(connection, response_headers)])
+                self._fail("get", key, status, body)
+            async for chunk in self._body(connection, response_headers):
+                yield chunk
+
+    async def put(self, key: str, content: bytes, content_type: str = "application/octet-stream") -> str:
+        """Store an object in a single request and return its ETag."""
+        _, headers, _ = await self._request("put", "PUT", key, headers={"content-type": content_type}, body=content)
+        return headers.get("etag", "")
+
+    async def upload(
+        self,
+        key: str,
+        content: bytes,
+        content_type: str = "application/octet-stream",
+        part_size: int = 8 * 1024 * 1024,
+        concurrency: int = 4
+    ):
+        """
+        Store an object, in a multipart upload of part_size parts sent
+        concurrently when it is larger than one part. Parts are views of the
+        content, never copies; a failed upload is aborted so no parts are left behind.
+        """
+        part_size = max(part_size, MIN_PART_SIZE_BYTES)
+        if len(content) <= part_size:
+            await self.put(key, content, content_type)
+            return
+
+        _, _, body = await self._request(
+            "create_multipart", "POST", key, {"uploads": ""}, {"content-type": content_type}
+        )
+        upload_id = _xml_text(body, "UploadId")
+        if not upload_id:
+            raise ObjectStorageException(f"No upload id creating the multipart upload of {key}")
+
+        view = memoryview(content)
+        sending = asyncio.Semaphore(concurrency)
+
+        async def send_part(number: int, offset: int) -> Tuple[int, str]:
+            async with sending:
+                _, headers, _ = await self._request(
+                    "upload_part", "PUT", key, {"partNumber": str(number), "uploadId": upload_id},
+                    body=view[offset:offset + part_size],
+                )
+                return number, headers.get("etag", "")
+
+        try:
+            parts = await asyncio.gather(*(
+                send_part(number, offset)
+                for number, offset in enumerate(range(0, len(content), part_size), start=1)
+            ))
+            manifest = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>" for number, etag in parts
+            )
+            _, _, body = await self._request(
+                "complete_multipart", "POST", key, {"uploadId": upload_id},
+                body=f"<CompleteMultipartUpload>{manifest}</CompleteMultipartUpload>".encode(),
+            )
+            # Completion errors may come in a 200 response, the body says it
+            if _xml_text(body, "Code"):
+                self._fail("complete_multipart", key, 200, body)
+            logger.debug("Uploaded %s in %s parts", key, len(parts))
+        except BaseException:
+            try:
+                await self._request("abort_multipart", "DELETE", key, {"uploadId": upload_id}, expected=(204, 404))
+            except Exception as e:
+                logger.warning("Could not abort the multipart upload of %s: %s", key, e)
+            raise
+
+    async def delete(self, key: str):
+        await self._request("delete", "DELETE", key, expected=(204, 404))
+
+    def presign_get(self, key: str, expires_seconds: int) -> str:
+        """URL any HTTP client (FFmpeg inside OpenCV included) can GET the object with, ranges included."""
+        path = self.object_path(key)
+        if not self.access_key_id:
+            return f"{self.endpoint_url}{path}"
+        amz_date, date = _amz_dates()
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key_id}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_seconds),
+            "X-Amz-SignedHeaders": "host",
+        }
+        query["X-Amz-Signature"] = self._signature(
+            "GET", path, query, {"host": self.netloc}, "UNSIGNED-PAYLOAD", amz_date, scope
+        )
+        return f"{self.endpoint_url}{path}?{_canonical_query(query)}"
+
+    async def close(self):
+        """Close the idle connections; connections in use close when their request ends."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+            OPEN_CONNECTIONS.dec()
+
+    # --- Signature V4 ---
+
+    def _signature(
+        self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], payload_hash: str,
+        amz_date: str, scope: str
+    ) -> str:
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            path,
+            _canonical_query(query),
+            "".join(f"{name}:{headers[name].strip()}\n" for name in sorted(headers)),
+            signed_headers,
+            payload_hash,
+        ])
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in scope.split("/"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    def _sign(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes):
+        payload_hash = hashlib.sha256(body).hexdigest() if body else _EMPTY_SHA256
+        amz_date, date = _amz_dates()
+        headers.update({"host": self.netloc, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+        if not self.access_key_id:
+            return
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        signed = {name: value for name, value in headers.items() if name != "range"}
+        signature = self._signature(method, path, query, signed, payload_hash, amz_date, scope)
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={';'.join(sorted(signed))}, Signature={signature}"
+        )
+
+    # --- HTTP ---
+
+    def _connection(self) -> "_PooledConnection":
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return _PooledConnection(self)
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            connection = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self._ssl, limit=READ_CHUNK_BYTES * 4),
+                CONNECT_TIMEOUT_SECONDS,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ObjectStorageException(f"Could not connect to object storage at {self.endpoint_url}: {e}")
+        OPEN_CONNECTIONS.inc()
+        return connection
+
+    async def _request(
+        self,
+        operation: str,
+        method: str,
+        key: str,
+        query: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+        expected: Tuple[int, ...] = (200,)
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and read the whole response: (status, headers, body)."""
+        async with self._connection() as connection:
+            status, response_headers = await self._send(connection, method, key, query or {}, headers or {}, body)
+            response_body = b""
+            if method != "HEAD":
+                response_body = b"".join([chunk async for chunk in self._body(connection, response_headers)])
+        REQUESTS_TOTAL.inc(operation=operation, status=status)
+        if status not in expected:
+            self._fail(operation, key, status, response_body)
+        return status, response_headers, response_body
+
+    async def _send(
+        self,
+        connection: "_PooledConnection",
+        method: str,
+        key: str,
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        body: bytes
+    ) -> Tuple[int, Dict[str, str]]:
+        path = self.object_path(key)
+        headers = {name.lower(): value for name, value in headers.items()}
+        self._sign(method, path, query, headers, body)
+        if body or method in ("PUT", "POST"):
+            headers["content-length"] = str(len(body))
+        target = f"{path}?{_canonical_query(query)}" if query else path
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        request = head.encode("latin-1") + b"\r\n"
+
+        while True:
+            reader, writer = await connection.acquire()
+            try:
+                writer.write(request)
+                if body:
+                    writer.write(body)
+                await writer.drain()
+                status, response_headers = await self._read_head(reader)
+            except (_StaleConnection, ConnectionError):
+                # Idle connection closed by the server meanwhile: the request never got there
+                connection.discard()
+                if connection.fresh:
+                    raise ObjectStorageException(f"Object storage closed the connection on {method} {key}")
+                continue
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                connection.discard()
+                raise ObjectStorageException(f"Object storage request {method} {key} failed: {e}")
+            connection.reusable = (
+                response_headers.get("connection", "").lower() != "close"
+                and (method == "HEAD" or "content-length" in response_headers
+                     or response_headers.get("transfer-encoding", "").lower() == "chunked")
+            )
+            connection.head_only = method == "HEAD" or status in (204, 304)
+            return status, response_headers
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        status_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT_SECONDS)
+        if not status_line:
+            raise _StaleConnection()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT_SECONDS)
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if status == 100:
+            return await self._read_head(reader)
+        return status, headers
+
+    async def _body(self, connection: "_PooledConnection", headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """Yield the response body; the connection goes back to the pool only once it is read to the end."""
+        reader = connection.reader
+        try:
+            if connection.head_only:
+                pass
+            elif headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT_SECONDS)
+                    size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                    if size == 0:
+                        # Trailers up to the empty line
+                        while await asyncio.wait_for(reader.readline(), READ_TIMEOUT_SECONDS) not in (b"\r\n", b"\n", b""):
+                            pass
+                        break
+                    async for chunk in self._read_exactly(reader, size):
+                        yield chunk
+                    await asyncio.wait_for(reader.readexactly(2), READ_TIMEOUT_SECONDS)
+            elif "content-length" in headers:
+                async for chunk in self._read_exactly(reader, int(headers["content-length"])):
+                    yield chunk
+            else:
+                while chunk := await asyncio.wait_for(reader.read(READ_CHUNK_BYTES), READ_TIMEOUT_SECONDS):
+                    yield chunk
+            connection.complete = True
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            raise ObjectStorageException(f"Object storage response interrupted: {e}")
+
+    async def _read_exactly(self, reader: asyncio.StreamReader, size: int) -> AsyncIterator[bytes]:
+        remaining = size
+        while remaining > 0:
+            chunk = await asyncio.wait_for(reader.read(min(READ_CHUNK_BYTES, remaining)), READ_TIMEOUT_SECONDS)
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(chunk)
+            yield chunk
+
+    def _fail(self, operation: str, key: str, status: int, body: bytes):
+        code = _xml_text(body, "Code") or "unknown"
+        message = _xml_text(body, "Message") or ""
+        raise ObjectStorageException(
+            f"Object storage {operation} of {key} failed with {status} {code}: {message}".rstrip(": "), status
+        )
+
+
+class _PooledConnection:
+    """One request's use of a connection slot: an idle connection if there is one, a new one otherwise."""
+
+    def __init__(self, client: S3Client):
+        self.client = client
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.fresh = False
+        self.reusable = False
+        self.head_only = False
+        self.complete = False
+
+    async def __aenter__(self) -> "_PooledConnection":
+        start = time.perf_counter()
+        await self.client._slots.acquire()
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        return self
+
+    async def acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self.client._idle:
+            self.reader, self.writer = self.client._idle.pop()
+            self.fresh = False
+        else:
+            self.reader, self.writer = await self.client._open()
+            self.fresh = True
+        return self.reader, self.writer
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+            OPEN_CONNECTIONS.dec()
+            self.reader = self.writer = None
+
+    async def __aexit__(self, *exc_info):
+        try:
+            if self.writer is not None:
+                if self.reusable and (self.complete or self.head_only) and exc_info[0] is None:
+                    self.client._idle.append((self.reader, self.writer))
+                else:
+                    # Unread body (abandoned stream) or error: the connection cannot carry another request
+                    self.discard()
+        finally:
+            self.client._slots.release()
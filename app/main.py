@@ -1,21 +1,38 @@
+# Imported first: startup milestones are timed from here
+from app.core import startup
+
 from contextlib import asynccontextmanager
 import logging
 import asyncio
+import signal
 
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.core.loop_monitor import LoopMonitor
+from app.core.profiling import job_profiler, profile_handler
 from app.infrastructure.database import mongo_connection, mysql_connection
+from app.infrastructure.database.migrations import check_indexes
+from app.infrastructure.http.metrics_server import MetricsServer
 from app.infrastructure.kafka.kafka_consumer import start_kafka_consumer
 
 # Configure logging
 configure_logging()
 logger = logging.getLogger(__name__)
+startup.mark("imports")
 
 
 @asynccontextmanager
 async def lifespan():
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Environment: {settings.APP_ENV}")
+    logger.info("Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("Environment: %s", settings.APP_ENV)
+
+    # ---------- Event loop health ----------
+    loop_monitor = None
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor = LoopMonitor(
+            settings.LOOP_MONITOR_INTERVAL_MS / 1000, settings.LOOP_BLOCKED_THRESHOLD_MS / 1000
+        )
+        loop_monitor.start()
 
     # ---------- DB Connections ----------
     try:
@@ -31,6 +48,40 @@ async def lifespan():
         logger.exception("Error initializing database connections")
         raise
 
+    # Open the minimum pool connections before the first messages arrive
+    try:
+        await asyncio.gather(
+            mysql_connection.mysql_connection.warm_up(),
+            mongo_connection.mongo_connection.warm_up(),
+        )
+    except Exception as e:
+        logger.warning("Could not warm up database connection pools: %s", e)
+
+    # Warn about (or create) missing indexes on the hot lookup paths
+    await check_indexes(create=settings.DB_AUTO_MIGRATE)
+    startup.mark("databases_ready")
+
+    # ---------- Metrics ----------
+    metrics_server = None
+    if settings.METRICS_ENABLED:
+        metrics_server = MetricsServer(settings.METRICS_HOST, settings.METRICS_PORT)
+        # Arming the profiler writes files and slows jobs: same token as the report API
+        metrics_server.admin_route("/profile", profile_handler, settings.REPORT_API_TOKEN)
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            logger.warning("Could not start metrics server on port %s: %s", settings.METRICS_PORT, e)
+            metrics_server = None
+
+    # ---------- Profiling ----------
+    # kill -USR2 <pid> profiles the next report(s) without redeploying
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGUSR2, job_profiler.arm, settings.PROFILING_SIGNAL_JOBS
+        )
+    except (AttributeError, NotImplementedError):
+        logger.info("SIGUSR2 profiling trigger not available on this platform")
+
     # ---------- Kafka ----------
     consumer_task = asyncio.create_task(start_kafka_consumer())
     yield
@@ -42,6 +93,12 @@ async def lifespan():
     except asyncio.CancelledError:
         logger.info("Kafka consumer stopped")
 
+    if metrics_server:
+        await metrics_server.close()
+
+    if loop_monitor:
+        await loop_monitor.stop()
+
     # Close DBs
     await mysql_connection.mysql_connection.close_connections()
     await mongo_connection.mongo_connection.close()
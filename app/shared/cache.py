@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, Optional, Set, TypeVar
+from app.core import metrics
+from app.shared.single_flight import SingleFlight
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+CACHE_LOOKUPS_TOTAL = metrics.counter("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+CACHE_EVICTIONS_TOTAL = metrics.counter("cache_evictions_total", "Entries evicted to stay within max size", ["cache"])
+CACHE_LOADS_COALESCED_TOTAL = metrics.counter(
+    "cache_loads_coalesced_total", "Misses that joined a load already running for the key", ["cache"]
+)
+CACHE_ENTRIES = metrics.gauge("cache_entries", "Entries currently cached", ["cache"])
+
+
+class LRUTTLCache(Generic[K, V]):
+    """
+    Bounded in-process cache with LRU eviction, a per-entry TTL and hit/miss
+    counters, exported as metrics labelled with the cache name.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, name: str = "default"):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._entries: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+        self._loads: SingleFlight[K, Optional[V]] = SingleFlight()
+        # Keys invalidated while their load was running: that result is not cached
+        self._stale_loads: Set[K] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHE_ENTRIES.set(0, cache=name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._miss()
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+            self._miss()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        CACHE_LOOKUPS_TOTAL.inc(cache=self.name, result="hit")
+        return value
+
+    async def get_or_load(self, key: K, load: Callable[[], Awaitable[Optional[V]]]) -> Optional[V]:
+        """
+        Cached value of the key, or else the result of load(), cached unless it
+        is None. Concurrent misses of a key share one load.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        if key in self._loads:
+            CACHE_LOADS_COALESCED_TOTAL.inc(cache=self.name)
+        # Shielded: a caller giving up must not cancel the load others wait for
+        return await asyncio.shield(self._loads.run(key, lambda: self._load(key, load)))
+
+    async def _load(self, key: K, load: Callable[[], Awaitable[Optional[V]]]) -> Optional[V]:
+        try:
+            value = await load()
+            if value is not None and key not in self._stale_loads:
+                self.put(key, value)
+            return value
+        finally:
+            self._stale_loads.discard(key)
+
+    def put(self, key: K, value: V):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            CACHE_EVICTIONS_TOTAL.inc(cache=self.name)
+        CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+
+    def invalidate(self, key: K) -> bool:
+        if key in self._loads:
+            self._stale_loads.add(key)
+        removed = self._entries.pop(key, None) is not None
+        CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+        return removed
+
+    def clear(self):
+        self._stale_loads.update(self._loads)
+        self._entries.clear()
+        CACHE_ENTRIES.set(0, cache=self.name)
+
+    def _miss(self):
+        self.misses += 1
+        CACHE_LOOKUPS_TOTAL.inc(cache=self.name, result="miss")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
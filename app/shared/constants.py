@@ -0,0 +1,36 @@
+# ===============================
+# Report cost model
+# ===============================
+# Rough figures used to rank report jobs and to bound the memory in flight.
+# They only need to be right relative to each other, not in absolute terms.
+
+# Fixed overhead of a job that renders a PDF (ReportLab document, tables, buffers)
+COST_BASE_MEMORY_BYTES = 40 * 1024 * 1024
+COST_BASE_SECONDS = 0.2
+
+# Decoder working set, expressed in decoded frames kept alive by FFmpeg/OpenCV
+COST_DECODER_FRAMES = 4
+
+# Demuxer index kept in memory while the video is open: one entry per frame
+# (FFmpeg index entry plus the container's sample tables). Video length enters
+# the model only here: seeks decode from the previous keyframe, so their time
+# depends on the keyframe interval and the resolution, not on the length.
+COST_INDEX_BYTES_PER_FRAME = 40
+
+# Share of a decoded frame kept alive per screenshot until the PDF is built
+COST_SCREENSHOT_RETENTION = 0.5
+
+# Seek + decode + PNG encode time per screenshot, per megapixel
+COST_SECONDS_PER_SCREENSHOT_MEGAPIXEL = 0.05
+
+# Table row cost for musical errors
+COST_BYTES_PER_MUSICAL_ERROR = 2 * 1024
+COST_SECONDS_PER_MUSICAL_ERROR = 0.001
+
+# Resolution assumed when the container metadata cannot be read (1080p)
+COST_DEFAULT_FRAME_WIDTH = 1920
+COST_DEFAULT_FRAME_HEIGHT = 1080
+
+# Postural errors assumed when the estimate cannot be computed, so the job is
+# treated as moderately expensive rather than free
+COST_FALLBACK_POSTURAL_ERRORS = 20
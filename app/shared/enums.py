@@ -1,4 +1,5 @@
-from enum import Enum
+from enum import Enum, IntEnum
+from typing import FrozenSet
 
 class Figure(Enum):
     BLANCA = 0.5
@@ -12,4 +13,53 @@ class Figure(Enum):
             cls.NEGRA.value: "Negra",
             cls.CORCHEA.value: "Corchea",
         }
-        return mapping.get(value, "Desconocido")
\ No newline at end of file
+        return mapping.get(value, "Desconocido")
+
+
+class ReportMode(Enum):
+    """Level of detail of a generated report, lowered when the consumer lags behind."""
+    FULL = "full"
+    TEXT_ONLY = "text_only"   # tables without screenshots
+    SUMMARY = "summary"       # counts and most frequent errors only
+
+    @property
+    def degraded(self) -> bool:
+        return self is not ReportMode.FULL
+
+    @property
+    def severity(self) -> int:
+        return {ReportMode.FULL: 0, ReportMode.TEXT_ONLY: 1, ReportMode.SUMMARY: 2}[self]
+
+
+class ReportFormat(Enum):
+    """Output format of a generated report."""
+    PDF = "pdf"
+    JSON = "json"   # structured data for list views and dashboards
+    HTML = "html"   # static view with the error thumbnails
+
+    @classmethod
+    def parse_list(cls, value: str) -> FrozenSet["ReportFormat"]:
+        """Formats from a comma separated list, e.g. "json,html"."""
+        formats = frozenset(cls(part.strip().lower()) for part in value.split(",") if part.strip())
+        if not formats:
+            raise ValueError("At least one report output format is required")
+        return formats
+
+
+class JobStage(IntEnum):
+    """Last completed stage of a journaled report job, in execution order."""
+    COUNTED = 1        # readiness checked and error counters stored
+    SCREENSHOTS = 2    # screenshots extracted
+    PDF_SAVED = 3      # report written to storage
+    COMPLETED = 4      # report path stored in the metadata
+
+
+class ReportState(Enum):
+    """Availability of a practice report for on-demand requests."""
+    READY = "ready"             # stored at full detail
+    GENERATING = "generating"   # queued or rendering
+    STALE = "stale"             # stored degraded, PDF not rendered yet or the file is gone
+    PENDING = "pending"         # analysis done, not generated yet
+    NOT_READY = "not_ready"     # audio or video analysis still running
+    NO_ERRORS = "no_errors"     # practice without errors, no report is generated
+    MISSING = "missing"         # no such practice for the student
\ No newline at end of file
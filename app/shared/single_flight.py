@@ -0,0 +1,39 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterator, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesces concurrent calls per key: while a call for a key is running, later
+    callers get the same task instead of starting another one.
+
+    The task is not tied to any caller, so await it through asyncio.shield or
+    asyncio.wait: a caller giving up must not cancel the work others wait for.
+    """
+
+    def __init__(self):
+        self._calls: Dict[K, asyncio.Task] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._calls
+
+    def __iter__(self) -> Iterator[K]:
+        """Keys with a call running."""
+        return iter(list(self._calls))
+
+    def run(self, key: K, call: Callable[[], Awaitable[V]]) -> "asyncio.Task[V]":
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    def _finished(self, key: K, task: asyncio.Task):
+        self._calls.pop(key, None)
+        # Callers that gave up never see the error; mark it retrieved
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,64 @@
+import asyncio
+import importlib
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Awaitable, Optional, TypeVar
+
+from app.core.exceptions import StageTimeoutException
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class StageDeadlines:
+    """Per-stage deadlines of a report job, in seconds (0 disables the deadline)."""
+    readiness: float = 10.0
+    db: float = 30.0
+    extraction: float = 120.0
+    render: float = 120.0
+    save: float = 30.0
+
+
+async def with_deadline(awaitable: Awaitable[T], timeout: float, stage: str) -> T:
+    """Await with a deadline, cancelling the awaitable and raising StageTimeoutException when it expires."""
+    if timeout <= 0:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise StageTimeoutException(stage, timeout)
+
+
+class RatePacer:
+    """Spaces out work to an average rate; acquiring n units waits for the time they take at that rate."""
+
+    def __init__(self, rate_per_second: float):
+        self.rate_per_second = rate_per_second
+        self._next = 0.0
+
+    async def acquire(self, units: int = 1):
+        if self.rate_per_second <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + units / self.rate_per_second
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class LazyModule:
+    """
+    Stands in for a module that is imported on the first attribute read, for heavy
+    libraries on the import path of app.main, which starts without them.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attribute: str):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
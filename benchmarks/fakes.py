@@ -0,0 +1,246 @@
+"""In-memory stand-ins for the external services, so the report pipeline runs without Kafka, MySQL or Mongo."""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.entities.practice_lease import PracticeLease
+from app.domain.entities.student import Student
+from app.domain.repositories.i_metadata_repo import IMetadataRepo
+from app.domain.repositories.i_musical_error_repo import IMusicalErrorRepo
+from app.domain.repositories.i_postural_error_repo import IPosturalErrorRepo
+from app.domain.repositories.i_practice_lease_repo import IPracticeLeaseRepo
+from app.domain.repositories.i_practice_repo import IPracticeRepo
+from app.domain.repositories.i_student_repo import IStudentRepo
+
+
+class InMemoryMetadataRepo(IMetadataRepo):
+    def __init__(self, latency: float = 0.0):
+        # (uid, practice_id) -> {"audio_done", "video_done", "report", "report_degraded", "report_scale"}
+        self.practices: Dict[Tuple[str, int], dict] = {}
+        self.latency = latency
+
+    def add_practice(self, uid: str, practice_id: int, audio_done: bool = True, video_done: bool = True):
+        self.practices[(uid, practice_id)] = {
+            "audio_done": audio_done, "video_done": video_done, "report": None, "report_token": None
+        }
+
+    async def save_pdf_path(self, uid: str, practice_id: int, pdf_path: str, degraded: bool = False) -> bool:
+        await asyncio.sleep(self.latency)
+        practice = self.practices.get((uid, practice_id))
+        if practice is None:
+            return False
+        practice.update(report=pdf_path, report_degraded=degraded)
+        return True
+
+    async def save_pdf_path_if_ready(
+        self,
+        uid: str,
+        practice_id: int,
+        pdf_path: str,
+        degraded: bool = False,
+        fencing_token: Optional[int] = None,
+        scale: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        flags = await self.get_processing_flags(uid, practice_id)
+        if not flags or not all(flags):
+            return False
+        if fencing_token is not None:
+            stored_token = self.practices[(uid, practice_id)]["report_token"]
+            if stored_token is not None and stored_token > fencing_token:
+                return False
+            self.practices[(uid, practice_id)]["report_token"] = fencing_token
+        if scale is not None:
+            self.practices[(uid, practice_id)]["report_scale"] = scale
+        return await self.save_pdf_path(uid, practice_id, pdf_path, degraded)
+
+    async def get_processing_flags(self, uid: str, practice_id: int) -> Optional[Tuple[bool, bool]]:
+        await asyncio.sleep(self.latency)
+        practice = self.practices.get((uid, practice_id))
+        if practice is None:
+            return None
+        return practice["audio_done"], practice["video_done"]
+
+    async def get_report(self, uid: str, practice_id: int) -> Optional[Tuple[Optional[str], bool]]:
+        await asyncio.sleep(self.latency)
+        practice = self.practices.get((uid, practice_id))
+        if practice is None:
+            return None
+        return practice["report"], bool(practice.get("report_degraded"))
+
+    async def find_degraded_reports(self, limit: int) -> List[Tuple[str, int]]:
+        await asyncio.sleep(self.latency)
+        degraded = [key for key, practice in self.practices.items() if practice.get("report_degraded")]
+        return degraded[:limit]
+
+    async def get_scales(self, practices: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Tuple[str, str]]:
+        await asyncio.sleep(self.latency)
+        scales = {key: self.practices[key].get("report_scale") for key in practices if key in self.practices}
+        return {key: scale for key, scale in scales.items() if scale}
+
+    async def is_video_and_audio_done(self, uid: str, practice_id: int) -> bool:
+        flags = await self.get_processing_flags(uid, practice_id)
+        return bool(flags) and all(flags)
+
+
+class InMemoryPosturalErrorRepo(IPosturalErrorRepo):
+    def __init__(self, latency: float = 0.0):
+        self.errors: Dict[int, PosturalErrorBatch] = {}
+        self.latency = latency
+
+    async def get_by_practice(self, practice_id: int) -> PosturalErrorBatch:
+        await asyncio.sleep(self.latency)
+        return self.errors.get(practice_id) or PosturalErrorBatch.empty()
+
+    async def count_by_practice(self, practice_id: int) -> int:
+        await asyncio.sleep(self.latency)
+        return len(self.errors.get(practice_id, []))
+
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, PosturalErrorBatch]:
+        await asyncio.sleep(self.latency)
+        return {practice_id: self.errors.get(practice_id) or PosturalErrorBatch.empty() for practice_id in practice_ids}
+
+
+class InMemoryMusicalErrorRepo(IMusicalErrorRepo):
+    def __init__(self, latency: float = 0.0):
+        self.errors: Dict[int, MusicalErrorBatch] = {}
+        self.latency = latency
+
+    async def get_by_practice(self, practice_id: int) -> MusicalErrorBatch:
+        await asyncio.sleep(self.latency)
+        return self.errors.get(practice_id) or MusicalErrorBatch.empty()
+
+    async def count_by_practice(self, practice_id: int) -> int:
+        await asyncio.sleep(self.latency)
+        return len(self.errors.get(practice_id, []))
+
+    async def get_by_practices(self, practice_ids: List[int]) -> Dict[int, MusicalErrorBatch]:
+        await asyncio.sleep(self.latency)
+        return {practice_id: self.errors.get(practice_id) or MusicalErrorBatch.empty() for practice_id in practice_ids}
+
+
+class InMemoryPracticeRepo(IPracticeRepo):
+    def __init__(self, latency: float = 0.0):
+        self.practices: Dict[int, Practice] = {}
+        self.latency = latency
+
+    async def get_by_id(self, practice_id: int) -> Optional[Practice]:
+        await asyncio.sleep(self.latency)
+        return self.practices.get(practice_id)
+
+    async def update_num_postural_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
+        return self._update(practice_id, num_postural_errors=num_errors)
+
+    async def update_num_musical_errors(self, practice_id: int, num_errors: int) -> Optional[Practice]:
+        return self._update(practice_id, num_musical_errors=num_errors)
+
+    async def find_by_filter(self, practice_filter: PracticeFilter, after_id: int, limit: int) -> List[Practice]:
+        await asyncio.sleep(self.latency)
+        matching = [
+            practice for practice_id, practice in sorted(self.practices.items())
+            if practice_id > after_id and _matches(practice, practice_filter)
+        ]
+        return matching[:limit]
+
+    async def count_by_filter(self, practice_filter: PracticeFilter) -> int:
+        await asyncio.sleep(self.latency)
+        return sum(1 for practice in self.practices.values() if _matches(practice, practice_filter))
+
+    def _update(self, practice_id: int, **changes) -> Optional[Practice]:
+        practice = self.practices.get(practice_id)
+        if practice is None:
+            return None
+        self.practices[practice_id] = replace(practice, **changes)
+        return self.practices[practice_id]
+
+
+def _matches(practice: Practice, practice_filter: PracticeFilter) -> bool:
+    day = practice.date or ""
+    return (
+        (not practice_filter.date_from or day >= practice_filter.date_from.isoformat())
+        and (not practice_filter.date_to or day <= practice_filter.date_to.isoformat())
+        and (not practice_filter.uid or practice.id_student == practice_filter.uid)
+        and (not practice_filter.practice_ids or practice.id in practice_filter.practice_ids)
+    )
+
+
+class InMemoryStudentRepo(IStudentRepo):
+    def __init__(self):
+        self.students: Dict[str, Student] = {}
+
+    async def get_by_uid(self, uid: str) -> Optional[Student]:
+        return self.students.get(uid)
+
+
+class InMemoryPracticeLeaseRepo(IPracticeLeaseRepo):
+    """
+    Same grant rules as MongoPracticeLeaseRepo. Replicas are simulated by sharing
+    one instance; clock can be replaced to expire leases without waiting.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        # practice_id -> (owner, token, expires_at)
+        self.leases: Dict[int, Tuple[str, int, float]] = {}
+        self.tokens: Dict[int, int] = {}
+
+    async def acquire(self, practice_id: int, owner: str, ttl_seconds: float) -> Optional[PracticeLease]:
+        held = self.leases.get(practice_id)
+        if held is not None and held[2] > self.clock():
+            return None
+        token = self.tokens[practice_id] = self.tokens.get(practice_id, 0) + 1
+        self.leases[practice_id] = (owner, token, self.clock() + ttl_seconds)
+        return PracticeLease(practice_id, owner, token, ttl_seconds)
+
+    async def renew(self, lease: PracticeLease) -> bool:
+        if not await self.is_current(lease):
+            return False
+        self.leases[lease.practice_id] = (lease.owner, lease.token, self.clock() + lease.ttl_seconds)
+        return True
+
+    async def is_current(self, lease: PracticeLease) -> bool:
+        held = self.leases.get(lease.practice_id)
+        return held is not None and held[1] == lease.token and held[2] > self.clock()
+
+    async def release(self, lease: PracticeLease) -> None:
+        held = self.leases.get(lease.practice_id)
+        if held is not None and held[1] == lease.token:
+            del self.leases[lease.practice_id]
+
+
+@dataclass
+class FakeRecord:
+    """The subset of aiokafka's ConsumerRecord the consumer loop reads."""
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+    value: bytes
+
+
+class FakeRecordFeed:
+    """
+    Replays report requests like an AIOKafkaConsumer on a single partition:
+    async iteration, highwater() and commit().
+    """
+
+    def __init__(self, messages: List[dict], topic: str = "bench", partition: int = 0):
+        now_ms = int(time.time() * 1000)
+        self.records = [
+            FakeRecord(topic, partition, offset, now_ms, json.dumps(message).encode())
+            for offset, message in enumerate(messages)
+        ]
+        self.commits = 0
+
+    def highwater(self, tp) -> int:
+        return len(self.records)
+
+    async def commit(self, offsets=None):
+        self.commits += 1
+
+    async def __aiter__(self) -> AsyncIterator[FakeRecord]:
+        for record in self.records:
+            yield record
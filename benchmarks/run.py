@@ -0,0 +1,452 @@
+"""
+Offline benchmark of the report pipeline.
+
+Each scenario runs in its own process (so peak RSS is per scenario) and feeds
+synthetic report requests through the same path as the Kafka consumer: cost
+estimate, scheduler admission, GeneratePDFUseCase and commit, with in-memory
+repositories and synthetic videos on local storage. With STORAGE_BACKEND=s3 the
+videos and reports go through the S3 repositories instead, against an
+in-process stand-in of the object store.
+
+    python -m benchmarks.run [--quick | --scenario NAME ...] [--output FILE] [--compare FILE]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# Settings are required at import time; the benchmark never connects to these services
+_BENCH_ENV = {
+    "KAFKA_BROKER": "localhost:9092",
+    "KAFKA_INPUT_TOPIC": "bench",
+    "KAFKA_GROUP_ID": "bench",
+    "MYSQL_HOST": "localhost",
+    "MYSQL_PORT": "3306",
+    "MYSQL_USER": "bench",
+    "MYSQL_PASSWORD": "bench",
+    "MYSQL_DB": "bench",
+    "MONGO_HOST": "localhost",
+    "MONGO_PORT": "27017",
+    "MONGO_USER": "bench",
+    "MONGO_PASSWORD": "bench",
+    "MONGO_DB": "bench",
+    "HOST_PATH": tempfile.gettempdir(),
+    "CONTAINER_PATH": tempfile.gettempdir(),
+}
+for _key, _value in _BENCH_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.application.use_cases.generate_pdf_use_case import GeneratePDFUseCase
+from app.core import metrics
+from app.core.config import settings
+from app.domain.entities.error_batch import MusicalErrorBatch, PosturalErrorBatch
+from app.domain.entities.musical_error import MusicalError
+from app.domain.entities.postural_error import PosturalError
+from app.domain.entities.practice import Practice
+from app.domain.entities.student import Student
+from app.domain.services.cost_estimator_service import CostEstimatorService
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.musical_error_service import MusicalErrorService
+from app.domain.services.pdf_service import PDF_ONLY, PDFService
+from app.domain.services.postural_error_service import PosturalErrorService
+from app.domain.services.practice_lease_service import PracticeLeaseService
+from app.domain.services.practice_service import PracticeService
+from app.domain.services.student_service import StudentService
+from app.infrastructure.kafka.kafka_consumer import _dto_from_record, _preload_heavy_modules, _report_mode_for
+from app.infrastructure.kafka.lag_policy import LagDegradationPolicy
+from app.infrastructure.repositories.local_pdf_repo import LocalPDFRepository
+from app.infrastructure.repositories.local_report_document_repo import LocalReportDocumentRepository
+from app.infrastructure.repositories.local_video_repo import LocalVideoRepository
+from app.infrastructure.storage.backends import create_storage_repos
+from app.infrastructure.storage.s3_client import S3Client
+from app.shared.enums import ReportFormat
+from app.shared.utils import StageDeadlines
+from benchmarks.fakes import (
+    FakeRecordFeed,
+    InMemoryMetadataRepo,
+    InMemoryMusicalErrorRepo,
+    InMemoryPosturalErrorRepo,
+    InMemoryPracticeLeaseRepo,
+    InMemoryPracticeRepo,
+    InMemoryStudentRepo,
+)
+from benchmarks.s3_stand_in import InMemoryS3Server
+from benchmarks.scenarios import QUICK, SCENARIOS, Scenario
+from benchmarks.videos import DEFAULT_FPS, link_practice_video, synthetic_video
+
+logger = logging.getLogger("benchmarks")
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+RSS_SAMPLE_INTERVAL_SECONDS = 0.05
+STUDENTS = 5
+BUCKET = "bench"
+
+
+def _mmss(seconds: float) -> str:
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _summary(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": _percentile(ordered, 50),
+        "p95": _percentile(ordered, 95),
+        "p99": _percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+
+def _tree_rss_bytes(pid: int) -> int:
+    """RSS of a process and all its descendants (Linux /proc), 0 elsewhere."""
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    stack.extend(int(child) for child in children.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class RSSSampler(threading.Thread):
+    """Samples the RSS of this process tree, which includes the screenshot extraction processes."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            self.peak = max(self.peak, _tree_rss_bytes(os.getpid()))
+            if self._stop_event.wait(RSS_SAMPLE_INTERVAL_SECONDS):
+                break
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        return max(self.peak, _tree_rss_bytes(os.getpid()))
+
+
+def _record_stages() -> Dict[str, List[float]]:
+    """Keep every raw stage sample next to the histogram, for exact percentiles."""
+    samples: Dict[str, List[float]] = defaultdict(list)
+    observe = metrics.STAGE_SECONDS.observe
+
+    def recording_observe(value: float, **labels):
+        samples[labels["stage"]].append(value)
+        observe(value, **labels)
+
+    metrics.STAGE_SECONDS.observe = recording_observe
+    return samples
+
+
+def _seed(scenario: Scenario, workdir: str, store_video, metadata_repo, postural_repo, musical_repo, practice_repo,
+          student_repo) -> List[dict]:
+    """Store the practices and errors of the scenario and return the matching report requests."""
+    frame_count = scenario.video_seconds * DEFAULT_FPS
+    video_path = None
+    if scenario.postural_errors:
+        video_path, frame_count = synthetic_video(
+            os.path.join(workdir, "videos"), scenario.resolution, scenario.video_seconds
+        )
+
+    for i in range(STUDENTS):
+        student_repo.students[f"student-{i}"] = Student(f"student-{i}", f"Estudiante {i}")
+
+    messages = []
+    for practice_id in range(1, scenario.reports + 1):
+        uid = f"student-{practice_id % STUDENTS}"
+        metadata_repo.add_practice(uid, practice_id)
+        practice_repo.practices[practice_id] = Practice(
+            id=practice_id, date="2025-01-01", time="10:00", num_postural_errors=0, num_musical_errors=0,
+            duration=scenario.video_seconds, id_student=uid, student_name="", scale="C", scale_type="Mayor",
+            bpm=120, figure=1, octaves=2,
+        )
+
+        postural = []
+        for n in range(scenario.postural_errors):
+            frame = (n * frame_count) // scenario.postural_errors
+            second = frame / DEFAULT_FPS
+            postural.append(PosturalError(
+                n, _mmss(second), _mmss(second + 1), frame, "Muñeca demasiado elevada", practice_id
+            ))
+        postural_repo.errors[practice_id] = PosturalErrorBatch.from_errors(postural)
+
+        musical_repo.errors[practice_id] = MusicalErrorBatch.from_errors(
+            MusicalError(n, _mmss(n * scenario.video_seconds / scenario.musical_errors), "D4", "C4", practice_id)
+            for n in range(scenario.musical_errors)
+        )
+
+        if video_path:
+            store_video(uid, practice_id, video_path)
+
+        messages.append({
+            "uid": uid, "practice_id": practice_id, "date": "2025-01-01", "time": "10:00", "message": "done",
+            "scale": "C", "scale_type": "Mayor", "duration": scenario.video_seconds, "bpm": 120, "figure": 1,
+            "octaves": 2,
+        })
+    return messages
+
+
+async def run_scenario(scenario: Scenario, workdir: str) -> dict:
+    base_dir = os.path.join(workdir, "storage", scenario.name)
+    # Reports and stored thumbnails of a previous run would be reused
+    shutil.rmtree(base_dir, ignore_errors=True)
+    metadata_repo = InMemoryMetadataRepo()
+    postural_repo = InMemoryPosturalErrorRepo()
+    musical_repo = InMemoryMusicalErrorRepo()
+    practice_repo = InMemoryPracticeRepo()
+    student_repo = InMemoryStudentRepo()
+
+    stand_in = None
+    if settings.STORAGE_BACKEND.lower() == "s3":
+        stand_in = InMemoryS3Server()
+        await stand_in.start()
+        pdf_repo, video_repo, _ = create_storage_repos(s3_client=S3Client(stand_in.endpoint_url, BUCKET))
+        video_contents: Dict[str, bytes] = {}
+
+        def store_video(uid: str, practice_id: int, video_path: str):
+            # One copy of each synthetic video in memory, shared by the practice keys
+            if video_path not in video_contents:
+                with open(video_path, "rb") as video_file:
+                    video_contents[video_path] = video_file.read()
+            key = f"{settings.S3_PREFIX}{uid}/videos/practice_{practice_id}.mp4"
+            stand_in.put_object(BUCKET, key, video_contents[video_path])
+    else:
+        video_repo = LocalVideoRepository(base_dir)
+        pdf_repo = LocalPDFRepository(base_dir)
+
+        def store_video(uid: str, practice_id: int, video_path: str):
+            link_practice_video(base_dir, uid, practice_id, video_path)
+
+    output_formats = ReportFormat.parse_list(settings.REPORT_OUTPUT_FORMATS)
+    keep_documents = output_formats != PDF_ONLY or settings.REPORT_INCREMENTAL_ENABLED
+    document_repo = LocalReportDocumentRepository(base_dir) if keep_documents else None
+
+    messages = _seed(scenario, workdir, store_video, metadata_repo, postural_repo, musical_repo, practice_repo,
+                     student_repo)
+
+    # Same wiring as start_kafka_consumer
+    deadlines = StageDeadlines(
+        readiness=settings.STAGE_TIMEOUT_READINESS_SECONDS,
+        db=settings.STAGE_TIMEOUT_DB_SECONDS,
+        extraction=settings.STAGE_TIMEOUT_EXTRACTION_SECONDS,
+        render=settings.STAGE_TIMEOUT_RENDER_SECONDS,
+        save=settings.STAGE_TIMEOUT_SAVE_SECONDS,
+    )
+    use_case = GeneratePDFUseCase(
+        MetadataPracticeService(metadata_repo),
+        PosturalErrorService(postural_repo),
+        MusicalErrorService(musical_repo),
+        PracticeService(practice_repo),
+        StudentService(student_repo),
+        PDFService(pdf_repo, video_repo, deadlines, document_repo),
+        deadlines,
+        lease_service=PracticeLeaseService(
+            InMemoryPracticeLeaseRepo(), "bench", settings.REPORT_LEASE_TTL_SECONDS
+        ) if settings.REPORT_LEASE_ENABLED else None,
+        output_formats=output_formats,
+    )
+    cost_estimator = CostEstimatorService(postural_repo, musical_repo, video_repo)
+    scheduler = ReportScheduler(
+        max_concurrency=settings.SCHEDULER_MAX_CONCURRENCY,
+        memory_budget_bytes=settings.SCHEDULER_MEMORY_BUDGET_MB * 1024 * 1024,
+        max_wait_seconds=settings.SCHEDULER_MAX_WAIT_SECONDS,
+    )
+    queued = asyncio.Semaphore(settings.SCHEDULER_MAX_QUEUED)
+    lag_policy = LagDegradationPolicy(
+        text_only_seconds=settings.DEGRADE_TEXT_ONLY_LAG_SECONDS,
+        summary_seconds=settings.DEGRADE_SUMMARY_LAG_SECONDS,
+        text_only_messages=settings.DEGRADE_TEXT_ONLY_LAG_MESSAGES,
+        summary_messages=settings.DEGRADE_SUMMARY_LAG_MESSAGES,
+    )
+    feed = FakeRecordFeed(messages)
+
+    stages = _record_stages()
+    pdf_paths: List[str] = []
+    failures = 0
+
+    async def process_message(dto):
+        nonlocal failures
+        try:
+            cost = await cost_estimator.estimate(dto.uid, dto.practice_id)
+            pdf_path = await scheduler.submit(cost, lambda: use_case.execute(dto), key=dto.practice_id)
+            await feed.commit()
+            if pdf_path != "None":
+                pdf_paths.append(pdf_path)
+        except Exception as e:
+            failures += 1
+            logger.error("Report failed for practice %s: %s", dto.practice_id, e)
+        finally:
+            queued.release()
+
+    if settings.PRELOAD_HEAVY_MODULES:
+        # The service does this at startup; measured here it would land on the first reports
+        await asyncio.to_thread(_preload_heavy_modules)
+
+    sampler = RSSSampler()
+    sampler.start()
+    start = time.perf_counter()
+
+    tasks = []
+    async for record in feed:
+        dto = _dto_from_record(record.value, _report_mode_for(feed, record, lag_policy))
+        if scenario.mode is not None:
+            dto.report_mode = scenario.mode
+        await queued.acquire()
+        tasks.append(asyncio.create_task(process_message(dto)))
+    await asyncio.gather(*tasks)
+
+    wall_seconds = time.perf_counter() - start
+    peak_tree_rss = sampler.stop()
+    # Deferred PDFs (REPORT_OUTPUT_FORMATS without pdf) are not stored
+    pdf_stats = [await pdf_repo.stat_pdf(path) for path in pdf_paths]
+    pdf_sizes = [stat[0] for stat in pdf_stats if stat]
+    storage = {"backend": settings.STORAGE_BACKEND.lower()}
+    if stand_in:
+        storage.update(requests=dict(stand_in.requests), bytes_read=stand_in.bytes_sent)
+        await stand_in.close()
+
+    return {
+        "scenario": scenario.name,
+        "resolution": scenario.resolution,
+        "video_seconds": scenario.video_seconds,
+        "postural_errors": scenario.postural_errors,
+        "musical_errors": scenario.musical_errors,
+        "mode": scenario.mode.value if scenario.mode else "auto",
+        "reports": scenario.reports,
+        "committed": feed.commits,
+        "failures": failures,
+        "wall_seconds": wall_seconds,
+        "reports_per_second": scenario.reports / wall_seconds if wall_seconds > 0 else 0.0,
+        "stages": {stage: _summary(values) for stage, values in sorted(stages.items())},
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "peak_tree_rss_bytes": peak_tree_rss,
+        "pdf_size_bytes": {
+            "mean": sum(pdf_sizes) / len(pdf_sizes) if pdf_sizes else 0,
+            "max": max(pdf_sizes, default=0),
+        },
+        "storage": storage,
+    }
+
+
+def _run_child(name: str, workdir: str) -> dict:
+    """Run one scenario in a fresh interpreter and read its JSON result from stdout."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", name, "--workdir", workdir],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        return {"scenario": name, "error": f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_results(results: List[dict], baseline: Dict[str, dict]):
+    header = f"{'scenario':<24}{'reports/s':>11}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'peak RSS MB':>13}{'PDF KB':>9}"
+    print(header)
+    for result in results:
+        if "error" in result:
+            print(f"{result['scenario']:<24} {result['error']}")
+            continue
+        execute = result["stages"].get("execute", {})
+        line = (
+            f"{result['scenario']:<24}{result['reports_per_second']:>11.2f}"
+            f"{execute.get('p50', 0):>9.3f}{execute.get('p95', 0):>9.3f}{execute.get('p99', 0):>9.3f}"
+            f"{result['peak_tree_rss_bytes'] / 2**20:>13.1f}{result['pdf_size_bytes']['max'] / 1024:>9.1f}"
+        )
+        previous = baseline.get(result["scenario"])
+        if previous and "error" not in previous and previous["reports_per_second"] > 0:
+            change = result["reports_per_second"] / previous["reports_per_second"] - 1
+            line += f"   {change:+.1%} reports/s vs baseline"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the report pipeline")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Run only the quick subset of scenarios")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--workdir", help="Directory for synthetic videos and reports (kept between runs)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    workdir = args.workdir or os.path.join(tempfile.gettempdir(), "reports-service-bench")
+
+    if args.child:
+        logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+        print(json.dumps(asyncio.run(run_scenario(SCENARIOS[args.child], workdir))))
+        return
+
+    names = args.scenario or (list(QUICK) if args.quick else list(SCENARIOS))
+    results = []
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results.append(_run_child(name, workdir))
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as out_file:
+        json.dump(report, out_file, indent=2)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = {result["scenario"]: result for result in json.load(baseline_file)["scenarios"]}
+    _print_results(results, baseline)
+    print(f"Results saved to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""In-process stand-in for an S3-compatible object store, so the S3 storage backend runs without one."""
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import unquote
+from app.infrastructure.http.http_server import HttpRequest, HttpResponse, HttpServer
+
+CHUNK_BYTES = 64 * 1024
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class StoredObject:
+    content: bytes
+    modified_at: float
+
+    @property
+    def etag(self) -> str:
+        return f'"{id(self.content):x}-{len(self.content):x}"'
+
+
+def _error(status: int, code: str, message: str = "") -> HttpResponse:
+    body = f"<Error><Code>{code}</Code><Message>{message}</Message></Error>".encode()
+    return HttpResponse(status, "application/xml", body)
+
+
+def _byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end exclusive) of a single bytes range, None for the whole object."""
+    if not header or not header.startswith("bytes="):
+        return None
+    first, _, last = header[len("bytes="):].partition("-")
+    if not first:
+        return max(size - int(last), 0), size
+    return int(first), min(int(last) + 1 if last else size, size)
+
+
+class InMemoryS3Server(HttpServer):
+    """
+    Path-style S3 API over objects kept in memory: GET (ranges included), HEAD,
+    PUT, DELETE and multipart uploads. Signatures are not checked.
+
+    Counts requests and the object bytes sent, so tests and benchmarks can see
+    how much of an object a reader actually fetched.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(
+            host, port, name="S3 stand-in", methods=("GET", "HEAD", "PUT", "POST", "DELETE"),
+            max_body_bytes=MAX_BODY_BYTES, keep_alive=True,
+        )
+        self.objects: Dict[Tuple[str, str], StoredObject] = {}
+        self.uploads: Dict[str, Dict[int, bytes]] = {}
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+        self.add_route("/", self._object, prefix=True)
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def put_object(self, bucket: str, key: str, content: bytes):
+        self.objects[(bucket, key)] = StoredObject(content, time.time())
+
+    async def _object(self, request: HttpRequest) -> HttpResponse:
+        bucket, _, key = unquote(request.path).lstrip("/").partition("/")
+        self.requests[request.method] += 1
+        handler = getattr(self, f"_{request.method.lower()}")
+        return handler(request, bucket, key)
+
+    def _head(self, request: HttpRequest, bucket: str, key: str) -> HttpResponse:
+        return self._get(request, bucket, key, send=False)
+
+    def _get(self, request: HttpRequest, bucket: str, key: str, send: bool = True) -> HttpResponse:
+        stored = self.objects.get((bucket, key))
+        if stored is None:
+            return _error(404, "NoSuchKey", key)
+        size = len(stored.content)
+        headers = {
+            "ETag": stored.etag,
+            "Last-Modified": formatdate(stored.modified_at, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+        byte_range = _byte_range(request.headers.get("range"), size)
+        if byte_range and byte_range[0] >= size:
+            return _error(416, "InvalidRange")
+        start, end = byte_range or (0, size)
+        headers["Content-Length"] = str(end - start)
+        if byte_range:
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        return HttpResponse(
+            206 if byte_range else 200,
+            "application/octet-stream",
+            headers=headers,
+            stream=self._chunks(memoryview(stored.content)[start:end]) if send else None,
+        )
+
+    async def _chunks(self, content: memoryview) -> AsyncIterator[bytes]:
+        # Counted as written: readers such as FFmpeg ask for open ranges and hang up once they have enough
+        for offset in range(0, len(content), CHUNK_BYTES):
+            chunk = content[offset:offset + CHUNK_BYTES]
+            self.bytes_sent += len(chunk)
+            yield chunk
+
+    def _put(self, request: HttpRequest, bucket: str, key: str) -> HttpResponse:
+        upload_id = request.query.get("uploadId")
+        if upload_id is None:
+            self.put_object(bucket, key, request.body)
+            return HttpResponse(200, headers={"ETag": self.objects[(bucket, key)].etag})
+        parts = self.uploads.get(upload_id)
+        if parts is None:
+            return _error(404, "NoSuchUpload", upload_id)
+        parts[int(request.query["partNumber"])] = request.body
+        return HttpResponse(200, headers={"ETag": f'"{upload_id}-{request.query["partNumber"]}"'})
+
+    def _post(self, request: HttpRequest, bucket: str, key: str) -> HttpResponse:
+        if "uploads" in request.query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {}
+            body = f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            return HttpResponse(200, "application/xml", body.encode())
+
+        upload_id = request.query.get("uploadId", "")
+        parts = self.uploads.pop(upload_id, None)
+        if parts is None:
+            return _error(404, "NoSuchUpload", upload_id)
+        numbers = [int(element.text) for element in ET.fromstring(request.body).iter("PartNumber")]
+        if any(number not in parts for number in numbers):
+            return _error(400, "InvalidPart")
+        self.put_object(bucket, key, b"".join(parts[number] for number in numbers))
+        body = f"<CompleteMultipartUploadResult><Key>{key}</Key></CompleteMultipartUploadResult>"
+        return HttpResponse(200, "application/xml", body.encode())
+
+    def _delete(self, request: HttpRequest, bucket: str, key: str) -> HttpResponse:
+        if "uploadId" in request.query:
+            self.uploads.pop(request.query["uploadId"], None)
+        else:
+            self.objects.pop((bucket, key), None)
+        return HttpResponse(204)
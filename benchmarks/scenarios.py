@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+from app.shared.enums import ReportMode
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    resolution: str
+    video_seconds: int
+    postural_errors: int
+    musical_errors: int
+    reports: int
+    # None lets the lag policy pick the mode, as the consumer does
+    mode: Optional[ReportMode] = None
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in (
+    Scenario("no_errors", "480p", 10, 0, 0, reports=20),
+    Scenario("small_480p", "480p", 30, 10, 20, reports=10),
+    Scenario("typical_720p", "720p", 60, 30, 60, reports=10),
+    Scenario("typical_1080p", "1080p", 60, 30, 60, reports=10),
+    Scenario("burst_720p", "720p", 30, 20, 40, reports=50),
+    Scenario("heavy_1080p", "1080p", 120, 200, 500, reports=3),
+    Scenario("typical_4k", "4k", 30, 30, 60, reports=3),
+    Scenario("max_errors_1080p", "1080p", 120, 2000, 2000, reports=1),
+    Scenario("max_errors_text_only", "1080p", 120, 2000, 2000, reports=1, mode=ReportMode.TEXT_ONLY),
+    Scenario("max_errors_summary", "1080p", 120, 2000, 2000, reports=1, mode=ReportMode.SUMMARY),
+)}
+
+QUICK = ("no_errors", "small_480p", "typical_720p", "max_errors_summary")
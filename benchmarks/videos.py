@@ -0,0 +1,55 @@
+"""Synthetic practice videos, written once per (resolution, length) and shared between practices."""
+import os
+from typing import Tuple
+import cv2
+import numpy as np
+
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+DEFAULT_FPS = 15
+
+
+def synthetic_video(cache_dir: str, resolution: str, seconds: int, fps: int = DEFAULT_FPS) -> Tuple[str, int]:
+    """Return (path, frame count) of a video with moving shapes, so frames differ and seeking decodes real data."""
+    width, height = RESOLUTIONS[resolution]
+    frame_count = seconds * fps
+    path = os.path.join(cache_dir, f"synthetic_{resolution}_{seconds}s_{fps}fps.mp4")
+    if os.path.exists(path):
+        return path, frame_count
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp.mp4"
+    writer = cv2.VideoWriter(tmp_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {tmp_path}")
+
+    # Horizontal gradient background, redrawn under the moving shapes
+    gradient = np.tile(np.linspace(40, 200, width, dtype=np.uint8), (height, 1))
+    background = cv2.merge([gradient, np.full_like(gradient, 90), gradient[:, ::-1]])
+    radius = max(height // 10, 8)
+    try:
+        for i in range(frame_count):
+            frame = background.copy()
+            x = int((i / max(frame_count - 1, 1)) * (width - 2 * radius)) + radius
+            cv2.circle(frame, (x, height // 2), radius, (255, 255, 255), -1)
+            cv2.putText(frame, f"frame {i}", (20, height - 20), cv2.FONT_HERSHEY_SIMPLEX, height / 600, (0, 0, 0), 2)
+            writer.write(frame)
+    finally:
+        writer.release()
+    os.replace(tmp_path, path)
+    return path, frame_count
+
+
+def link_practice_video(base_dir: str, uid: str, practice_id: int, video_path: str):
+    """Expose a shared synthetic video at the path LocalVideoRepository reads for a practice."""
+    videos_dir = os.path.join(base_dir, uid, "videos")
+    os.makedirs(videos_dir, exist_ok=True)
+    target = os.path.join(videos_dir, f"practice_{practice_id}.mp4")
+    if os.path.lexists(target):
+        os.remove(target)
+    os.symlink(os.path.abspath(video_path), target)
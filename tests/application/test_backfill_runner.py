@@ -0,0 +1,43 @@
+import asyncio
+from typing import List
+
+from app.application.backfill.backfill_runner import BackfillRunner
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.domain.entities.practice import Practice
+from app.domain.entities.practice_filter import PracticeFilter
+from app.domain.services.metadata_service import MetadataPracticeService
+from benchmarks.fakes import InMemoryMetadataRepo, InMemoryPracticeRepo
+
+
+def practice(practice_id: int, uid: str = "uid") -> Practice:
+    return Practice(
+        id=practice_id, date="2025-01-01", time="10:00", num_postural_errors=1, num_musical_errors=1,
+        duration=60, id_student=uid, student_name="Ana", scale="", scale_type="", bpm=90, figure=1.0, octaves=1,
+    )
+
+
+def test_backfilled_requests_take_the_scale_from_the_metadata(tmp_path):
+    async def main():
+        practice_repo = InMemoryPracticeRepo()
+        metadata_repo = InMemoryMetadataRepo()
+        for practice_id in (1, 2):
+            practice_repo.practices[practice_id] = practice(practice_id)
+            metadata_repo.add_practice("uid", practice_id)
+        await metadata_repo.save_pdf_path_if_ready("uid", 1, "/reports/1.pdf", scale=("C", "major"))
+        rendered: List[PracticeDataDTO] = []
+
+        async def render_chunk(requests: List[PracticeDataDTO]):
+            rendered.extend(requests)
+            return [(request.practice_id, "generated", 0.0) for request in requests]
+
+        runner = BackfillRunner(
+            practice_repo, MetadataPracticeService(metadata_repo), render_chunk, PracticeFilter(uid="uid"),
+            str(tmp_path / "checkpoint.json"), batch_size=10, workers=1, rate_per_second=0,
+        )
+        await runner.run()
+
+        assert [(request.practice_id, request.scale, request.scale_type) for request in rendered] == [
+            (1, "C", "major"), (2, "", ""),
+        ]
+
+    asyncio.run(main())
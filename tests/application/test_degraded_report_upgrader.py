@@ -0,0 +1,105 @@
+import asyncio
+
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.scheduler.degraded_report_upgrader import DegradedReportUpgrader
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.domain.entities.practice import Practice
+from app.domain.entities.job_cost import JobCost
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.practice_service import PracticeService
+from app.infrastructure.kafka.lag_policy import LagDegradationPolicy
+from app.shared.enums import ReportMode
+from benchmarks.fakes import InMemoryMetadataRepo, InMemoryPracticeRepo
+
+
+def practice(practice_id: int, uid: str = "uid") -> Practice:
+    """Practice as read from MySQL, which does not store the scale."""
+    return Practice(
+        id=practice_id, date="2025-01-01", time="10:00", num_postural_errors=1, num_musical_errors=1,
+        duration=60, id_student=uid, student_name="Ana", scale="", scale_type="", bpm=90, figure=1.0, octaves=1,
+    )
+
+
+class FixedCostEstimator:
+    async def estimate(self, uid: str, practice_id: int) -> JobCost:
+        return JobCost(1, 0, 1, 1.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def policy(clock: FakeClock, idle_reset_seconds: float = 60.0) -> LagDegradationPolicy:
+    return LagDegradationPolicy(600, 1800, 500, 2000, idle_reset_seconds=idle_reset_seconds, clock=clock)
+
+
+def test_lag_clears_after_idle_timeout():
+    clock = FakeClock()
+    lag_policy = policy(clock)
+
+    assert lag_policy.mode_for(900, None) is ReportMode.TEXT_ONLY
+    clock.now += 30
+    assert lag_policy.lagging
+    clock.now += 30
+    assert not lag_policy.lagging
+
+
+def test_lag_clears_when_caught_up_until_a_lagging_record_comes():
+    lag_policy = policy(FakeClock(), idle_reset_seconds=0)
+
+    lag_policy.mode_for(None, 3000)
+    assert lag_policy.lagging
+    lag_policy.caught_up()
+    assert not lag_policy.lagging
+    lag_policy.mode_for(None, 600)
+    assert lag_policy.lagging
+
+
+def test_restores_degraded_reports_and_upgrades_them_at_full_detail():
+    async def main():
+        metadata_repo = InMemoryMetadataRepo()
+        practice_repo = InMemoryPracticeRepo()
+        for practice_id in (1, 2):
+            metadata_repo.add_practice("uid", practice_id)
+            await metadata_repo.save_pdf_path_if_ready(
+                "uid", practice_id, f"report_{practice_id}.pdf", degraded=True, scale=("C", "major")
+            )
+        metadata_repo.add_practice("uid", 3)
+        # Degraded report stored without its scale: upgrading it would lose the title
+        metadata_repo.add_practice("uid", 4)
+        await metadata_repo.save_pdf_path("uid", 4, "report_4.pdf", degraded=True)
+        practice_repo.practices[1] = practice(1)
+        practice_repo.practices[4] = practice(4)
+        # Practice 2 was deleted from MySQL meanwhile
+
+        upgraded = []
+
+        async def run_report(practice_data: PracticeDataDTO):
+            upgraded.append((practice_data.practice_id, practice_data.report_mode, practice_data.scale_type))
+
+        async def is_lagging() -> bool:
+            return False
+
+        upgrader = DegradedReportUpgrader(
+            ReportScheduler(1, 10**12, 60),
+            FixedCostEstimator(),
+            run_report,
+            is_lagging,
+            interval_seconds=0.01,
+            max_queued=10,
+            metadata_service=MetadataPracticeService(metadata_repo),
+            practice_service=PracticeService(practice_repo),
+        )
+        task = asyncio.create_task(upgrader.run())
+        while upgrader.queued:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert upgraded == [(1, ReportMode.FULL, "major")]
+
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import asyncio
+from typing import List
+
+from app.application.dto.practice_data_dto import PracticeDataDTO
+from app.application.scheduler.report_scheduler import ReportScheduler
+from app.application.use_cases.fetch_report_use_case import FetchReportUseCase
+from app.domain.entities.job_cost import JobCost
+from app.domain.entities.practice import Practice
+from app.domain.services.metadata_service import MetadataPracticeService
+from app.domain.services.practice_service import PracticeService
+from benchmarks.fakes import InMemoryMetadataRepo, InMemoryPracticeRepo
+
+
+class FixedCostEstimator:
+    async def estimate(self, uid: str, practice_id: int) -> JobCost:
+        return JobCost(1, 0, 1, 1.0)
+
+
+def test_on_demand_requests_take_the_scale_from_the_metadata():
+    async def main():
+        practice_repo = InMemoryPracticeRepo()
+        metadata_repo = InMemoryMetadataRepo()
+        practice_repo.practices[1] = Practice(
+            id=1, date="2025-01-01", time="10:00", num_postural_errors=1, num_musical_errors=1,
+            duration=60, id_student="uid", student_name="Ana", scale="", scale_type="", bpm=90, figure=1.0, octaves=1,
+        )
+        metadata_repo.add_practice("uid", 1)
+        metadata_repo.practices[("uid", 1)]["report_scale"] = ("C", "major")
+        requested: List[PracticeDataDTO] = []
+
+        async def run_report(practice_data: PracticeDataDTO):
+            requested.append(practice_data)
+            return "/reports/1.pdf"
+
+        use_case = FetchReportUseCase(
+            MetadataPracticeService(metadata_repo), PracticeService(practice_repo), None,
+            ReportScheduler(1, 10**12, 60), FixedCostEstimator(), run_report,
+        )
+        await use_case.fetch("uid", 1, wait_seconds=5)
+
+        assert [(request.scale, request.scale_type) for request in requested] == [("C", "major")]
+
+    asyncio.run(main())
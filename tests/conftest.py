@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# Settings are read when app.core.config is imported; tests never connect to these services
+_TEST_ENV = {
+    "KAFKA_BROKER": "localhost:9092",
+    "KAFKA_INPUT_TOPIC": "practices",
+    "KAFKA_GROUP_ID": "reports-service-tests",
+    "MYSQL_HOST": "localhost",
+    "MYSQL_PORT": "3306",
+    "MYSQL_USER": "test",
+    "MYSQL_PASSWORD": "test",
+    "MYSQL_DB": "test",
+    "MONGO_HOST": "localhost",
+    "MONGO_PORT": "27017",
+    "MONGO_USER": "test",
+    "MONGO_PASSWORD": "test",
+    "MONGO_DB": "test",
+    "HOST_PATH": tempfile.gettempdir(),
+    "CONTAINER_PATH": tempfile.gettempdir(),
+}
+
+for name, value in _TEST_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,35 @@
+from app.domain.entities.video_info import VideoInfo
+from app.domain.services.cost_estimator_service import CostEstimatorService
+from app.shared import constants
+
+
+def test_practice_without_errors_costs_nothing():
+    cost = CostEstimatorService.compute(0, 0, VideoInfo(1920, 1080, 30.0, 9000))
+
+    assert not cost.renders
+    assert cost.estimated_memory_bytes == 0
+
+
+def test_higher_resolution_costs_more_per_screenshot():
+    small = CostEstimatorService.compute(10, 0, VideoInfo(854, 480, 30.0, 900))
+    large = CostEstimatorService.compute(10, 0, VideoInfo(3840, 2160, 30.0, 900))
+
+    assert large.estimated_memory_bytes > small.estimated_memory_bytes
+    assert large.estimated_seconds > small.estimated_seconds
+
+
+def test_longer_video_adds_its_frame_index_but_no_time():
+    short = CostEstimatorService.compute(10, 0, VideoInfo(1280, 720, 30.0, 30 * 60))
+    long = CostEstimatorService.compute(10, 0, VideoInfo(1280, 720, 30.0, 30 * 3600))
+
+    assert long.estimated_memory_bytes - short.estimated_memory_bytes == (
+        (30 * 3600 - 30 * 60) * constants.COST_INDEX_BYTES_PER_FRAME
+    )
+    assert long.estimated_seconds == short.estimated_seconds
+
+
+def test_unknown_video_falls_back_to_1080p():
+    unknown = CostEstimatorService.compute(10, 0, None)
+    full_hd = CostEstimatorService.compute(10, 0, VideoInfo(1920, 1080, 30.0, 0))
+
+    assert unknown == full_hd
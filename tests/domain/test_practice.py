@@ -0,0 +1,7 @@
+from app.domain.entities.practice import report_title
+
+
+def test_report_title_leaves_out_an_unknown_scale():
+    assert report_title("C", "major") == "Reporte de practica: Escala C, major"
+    assert report_title("C", "") == "Reporte de practica: Escala C"
+    assert report_title("", "") == "Reporte de practica"
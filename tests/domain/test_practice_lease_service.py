@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import LeaseLostException, PracticeLeasedException
+from app.domain.services.practice_lease_service import PracticeLeaseService
+from benchmarks.fakes import InMemoryMetadataRepo, InMemoryPracticeLeaseRepo
+
+TTL_SECONDS = 30.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def replicas(count: int = 2):
+    """Lease services of several replicas sharing one lease store, and its clock."""
+    clock = FakeClock()
+    repo = InMemoryPracticeLeaseRepo(clock)
+    return clock, repo, [PracticeLeaseService(repo, f"replica-{i}", TTL_SECONDS) for i in range(count)]
+
+
+def test_acquire_grants_increasing_tokens():
+    async def main():
+        clock, repo, _ = replicas()
+
+        first = await repo.acquire(1, "a", TTL_SECONDS)
+        await repo.release(first)
+        second = await repo.acquire(1, "b", TTL_SECONDS)
+
+        assert second.token > first.token
+        assert await repo.is_current(second)
+
+    asyncio.run(main())
+
+
+def test_acquire_fails_while_another_owner_holds_the_lease():
+    async def main():
+        clock, repo, _ = replicas()
+
+        assert await repo.acquire(1, "a", TTL_SECONDS) is not None
+        assert await repo.acquire(1, "b", TTL_SECONDS) is None
+        # Other practices are independent
+        assert await repo.acquire(2, "b", TTL_SECONDS) is not None
+
+    asyncio.run(main())
+
+
+def test_expired_lease_is_taken_over_and_the_stale_token_rejected():
+    async def main():
+        clock, repo, _ = replicas()
+        stalled = await repo.acquire(1, "a", TTL_SECONDS)
+
+        clock.now += TTL_SECONDS + 1
+        assert not await repo.is_current(stalled)
+        successor = await repo.acquire(1, "b", TTL_SECONDS)
+
+        assert successor is not None and successor.token > stalled.token
+        assert not await repo.renew(stalled)
+        # Releasing with the stale token leaves the successor's lease alone
+        await repo.release(stalled)
+        assert await repo.is_current(successor)
+
+    asyncio.run(main())
+
+
+def test_renew_extends_the_lease():
+    async def main():
+        clock, repo, _ = replicas()
+        lease = await repo.acquire(1, "a", TTL_SECONDS)
+
+        clock.now += TTL_SECONDS * 2 / 3
+        assert await repo.renew(lease)
+        clock.now += TTL_SECONDS * 2 / 3
+
+        assert await repo.is_current(lease)
+        assert await repo.acquire(1, "b", TTL_SECONDS) is None
+
+    asyncio.run(main())
+
+
+def test_hold_raises_when_the_practice_is_leased_by_another_replica():
+    async def main():
+        clock, repo, (first, second) = replicas()
+
+        async with first.hold(1):
+            with pytest.raises(PracticeLeasedException):
+                async with second.hold(1):
+                    pass
+
+        # Released on exit
+        async with second.hold(1) as lease:
+            assert lease.owner == "replica-1"
+
+    asyncio.run(main())
+
+
+def test_ensure_held_fails_after_takeover():
+    async def main():
+        clock, repo, (first, second) = replicas()
+
+        async with first.hold(1) as stalled:
+            await first.ensure_held(stalled)
+            clock.now += TTL_SECONDS + 1
+            async with second.hold(1) as successor:
+                with pytest.raises(LeaseLostException):
+                    await first.ensure_held(stalled)
+                await second.ensure_held(successor)
+
+    asyncio.run(main())
+
+
+def test_stale_token_cannot_overwrite_a_newer_report():
+    async def main():
+        metadata = InMemoryMetadataRepo()
+        metadata.add_practice("uid", 1)
+
+        assert await metadata.save_pdf_path_if_ready("uid", 1, "new.pdf", fencing_token=2)
+        assert not await metadata.save_pdf_path_if_ready("uid", 1, "old.pdf", fencing_token=1)
+
+        assert await metadata.get_report("uid", 1) == ("new.pdf", False)
+
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Optional
+
+from app.core import metrics
+from app.domain.entities.student import Student
+from app.infrastructure.repositories.cached_student_repo import CachedStudentRepository
+from app.shared.cache import LRUTTLCache
+from benchmarks.fakes import InMemoryStudentRepo
+
+
+class SlowStudentRepo(InMemoryStudentRepo):
+    """Counts the queries; each one waits until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+        self.release = asyncio.Event()
+
+    async def get_by_uid(self, uid: str) -> Optional[Student]:
+        self.queries += 1
+        await self.release.wait()
+        return await super().get_by_uid(uid)
+
+
+def test_concurrent_misses_share_one_query():
+    async def main():
+        source = SlowStudentRepo()
+        source.students["uid"] = Student("uid", "Ana")
+        repo = CachedStudentRepository(source, LRUTTLCache(10, 60, name="test_coalesced"))
+
+        lookups = [asyncio.create_task(repo.get_by_uid("uid")) for _ in range(5)]
+        await asyncio.sleep(0)
+        source.release.set()
+
+        assert [student.name for student in await asyncio.gather(*lookups)] == ["Ana"] * 5
+        assert source.queries == 1
+        # Later lookups are hits
+        assert (await repo.get_by_uid("uid")).name == "Ana"
+        assert source.queries == 1
+        assert _sample("cache_loads_coalesced_total", ("test_coalesced",)) == 4
+
+    asyncio.run(main())
+
+
+def test_cancelled_lookup_does_not_cancel_the_shared_query():
+    async def main():
+        source = SlowStudentRepo()
+        source.students["uid"] = Student("uid", "Ana")
+        repo = CachedStudentRepository(source, LRUTTLCache(10, 60, name="test_cancelled"))
+
+        first = asyncio.create_task(repo.get_by_uid("uid"))
+        second = asyncio.create_task(repo.get_by_uid("uid"))
+        await asyncio.sleep(0)
+        first.cancel()
+        source.release.set()
+
+        assert (await second).name == "Ana"
+        assert source.queries == 1
+
+    asyncio.run(main())
+
+
+def test_student_invalidated_during_the_query_is_not_cached():
+    async def main():
+        source = SlowStudentRepo()
+        source.students["uid"] = Student("uid", "Ana")
+        repo = CachedStudentRepository(source, LRUTTLCache(10, 60, name="test_invalidated"))
+
+        lookup = asyncio.create_task(repo.get_by_uid("uid"))
+        await asyncio.sleep(0)
+        repo.invalidate("uid")
+        source.release.set()
+        await lookup
+
+        assert len(repo.cache) == 0
+
+    asyncio.run(main())
+
+
+def test_unknown_students_are_not_cached():
+    async def main():
+        source = InMemoryStudentRepo()
+        repo = CachedStudentRepository(source, LRUTTLCache(10, 60, name="test_unknown"))
+
+        assert await repo.get_by_uid("uid") is None
+        source.students["uid"] = Student("uid", "Ana")
+
+        assert (await repo.get_by_uid("uid")).name == "Ana"
+
+    asyncio.run(main())
+
+
+def test_lookups_and_evictions_are_exported_as_metrics():
+    cache = LRUTTLCache(1, 60, name="test_metrics")
+
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.put("b", 2)
+
+    assert _sample("cache_lookups_total", ("test_metrics", "hit")) == 1
+    assert _sample("cache_lookups_total", ("test_metrics", "miss")) == 1
+    assert _sample("cache_evictions_total", ("test_metrics",)) == 1
+    assert _sample("cache_entries", ("test_metrics",)) == 1
+    assert 'cache_lookups_total{cache="test_metrics",result="hit"} 1' in metrics.render_text()
+
+
+def _sample(name: str, labels: tuple) -> float:
+    metric = next(metric for metric in metrics.REGISTRY.metrics() if metric.name == name)
+    return metric.samples().get(labels, 0.0)
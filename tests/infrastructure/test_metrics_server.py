@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.profiling import job_profiler, profile_handler
+from app.infrastructure.http.http_server import HttpRequest
+from app.infrastructure.http.metrics_server import MetricsServer
+
+TOKEN = "secret"
+
+
+@pytest.fixture
+def profile_route(monkeypatch):
+    monkeypatch.setattr(job_profiler, "_armed", {})
+    server = MetricsServer("127.0.0.1", 0)
+    server.admin_route("/profile", profile_handler, TOKEN)
+    return server._routes["/profile"]
+
+
+def call(route, method: str, query: dict, token: str = TOKEN):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    return asyncio.run(route(HttpRequest(method, "/profile", query, headers)))
+
+
+def test_profile_requires_the_token(profile_route):
+    assert call(profile_route, "POST", {"jobs": "1"}, token="").status == 401
+    assert call(profile_route, "POST", {"jobs": "1"}, token="wrong").status == 401
+    assert job_profiler.status()["armed"] == {}
+
+
+def test_profile_is_armed_only_by_post(profile_route):
+    assert call(profile_route, "GET", {"jobs": "2"}).status == 405
+
+    response = call(profile_route, "POST", {"jobs": "2", "uid": "uid1"})
+
+    assert response.status == 200
+    assert json.loads(response.body)["armed"] == {"uid1": 2}
+
+
+@pytest.mark.parametrize("jobs", ["0", "-5", "abc", str(10 ** 9)])
+def test_profile_rejects_jobs_out_of_range(profile_route, jobs):
+    assert call(profile_route, "POST", {"jobs": jobs}).status == 400
+    assert job_profiler.status()["armed"] == {}
+
+
+def test_armed_jobs_add_up_to_the_cap(profile_route):
+    for _ in range(3):
+        call(profile_route, "POST", {"jobs": str(job_profiler.max_armed)})
+
+    assert job_profiler.status()["armed"] == {"*": job_profiler.max_armed}
+
+
+def test_profile_is_not_served_without_a_token():
+    server = MetricsServer("127.0.0.1", 0)
+    server.admin_route("/profile", profile_handler, "")
+
+    assert "/profile" not in server._routes
+
+
+def test_scrape_routes_reject_post():
+    server = MetricsServer("127.0.0.1", 0)
+
+    assert asyncio.run(server._routes["/metrics"](HttpRequest("POST", "/metrics", {}, {}))).status == 405
@@ -0,0 +1,18 @@
+from app.infrastructure.database.migrations import MongoIndex, _covers, _mongo_covers
+
+TTL_INDEX = MongoIndex("report_leases", "ix_report_leases_expires_at", (("expires_at", 1),), expire_after_seconds=0)
+
+
+def test_a_plain_index_does_not_cover_a_ttl_index():
+    assert not _mongo_covers({"key": [("expires_at", 1)]}, TTL_INDEX)
+    assert not _mongo_covers({"key": [("expires_at", 1)], "expireAfterSeconds": 3600}, TTL_INDEX)
+    assert not _mongo_covers({"key": [("expires_at", 1), ("owner", 1)], "expireAfterSeconds": 0}, TTL_INDEX)
+    assert _mongo_covers({"key": [("expires_at", 1)], "expireAfterSeconds": 0}, TTL_INDEX)
+
+
+def test_uniqueness_needs_a_unique_index_on_exactly_the_columns():
+    assert _covers(["uid", "id_practice"], ["uid"])
+    assert _covers(["uid", "id_practice"], ["uid"], existing_unique=True)
+    assert not _covers(["uid"], ["uid"], unique=True)
+    assert not _covers(["uid", "id_practice"], ["uid"], existing_unique=True, unique=True)
+    assert _covers(["uid"], ["uid"], existing_unique=True, unique=True)
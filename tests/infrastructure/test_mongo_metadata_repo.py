@@ -0,0 +1,41 @@
+from app.infrastructure.repositories.mongo_metadata_repo import _practice_filter, _report_update
+
+
+def test_filter_without_conditions_positions_on_the_practice():
+    assert _practice_filter("uid", 7) == {"uid": "uid", "practices.id_practice": 7}
+
+
+def test_ready_filter_requires_both_analyses_done():
+    assert _practice_filter("uid", 7, if_ready=True) == {
+        "uid": "uid",
+        "practices": {"$elemMatch": {"id_practice": 7, "audio_done": True, "video_done": True}},
+    }
+
+
+def test_fenced_filter_rejects_reports_stored_with_a_newer_token():
+    practice = _practice_filter("uid", 7, if_ready=True, fencing_token=3)["practices"]["$elemMatch"]
+
+    assert practice["$or"] == [
+        {"report_token": {"$exists": False}},
+        {"report_token": {"$lte": 3}},
+    ]
+    assert practice["audio_done"] and practice["video_done"]
+
+
+def test_fenced_update_stores_the_token_with_the_report():
+    assert _report_update("r.pdf", False, 3) == {"$set": {
+        "practices.$.report": "r.pdf",
+        "practices.$.report_degraded": False,
+        "practices.$.report_token": 3,
+    }}
+    assert "practices.$.report_token" not in _report_update("r.pdf", False)["$set"]
+
+
+def test_update_stores_the_scale_only_when_known():
+    assert _report_update("r.pdf", True, scale=("C", "major"))["$set"] == {
+        "practices.$.report": "r.pdf",
+        "practices.$.report_degraded": True,
+        "practices.$.report_scale": "C",
+        "practices.$.report_scale_type": "major",
+    }
+    assert "practices.$.report_scale" not in _report_update("r.pdf", False)["$set"]
@@ -0,0 +1,43 @@
+import asyncio
+
+from app.domain.entities.error_batch import PosturalErrorBatch
+from app.infrastructure.repositories.prefetched_error_repo import PrefetchedPosturalErrorRepository
+from benchmarks.fakes import InMemoryPosturalErrorRepo
+
+
+def errors(practice_id: int, count: int) -> PosturalErrorBatch:
+    return PosturalErrorBatch.from_rows(
+        (i, "00:01", "00:02", 30, "Muñeca baja", practice_id) for i in range(count)
+    )
+
+
+def test_prefetched_errors_are_handed_out_once():
+    async def main():
+        source = InMemoryPosturalErrorRepo()
+        source.errors[1] = errors(1, 2)
+        repo = PrefetchedPosturalErrorRepository(source)
+
+        await repo.prefetch([1])
+        source.errors[1] = errors(1, 3)
+
+        assert len(await repo.get_by_practice(1)) == 2
+        # The next read goes to the wrapped repository
+        assert len(await repo.get_by_practice(1)) == 3
+
+    asyncio.run(main())
+
+
+def test_prefetching_a_chunk_drops_what_the_previous_one_left():
+    async def main():
+        source = InMemoryPosturalErrorRepo()
+        source.errors[1] = errors(1, 2)
+        repo = PrefetchedPosturalErrorRepository(source)
+
+        await repo.prefetch([1, 2])
+        await repo.prefetch([3])
+        source.errors[1] = errors(1, 4)
+
+        assert list(repo._prefetched) == [3]
+        assert await repo.count_by_practice(1) == 4
+
+    asyncio.run(main())
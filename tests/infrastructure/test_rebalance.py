@@ -0,0 +1,21 @@
+import pytest
+
+from app.core.config import settings
+from app.infrastructure.kafka.rebalance import DRAIN_COMMIT_MARGIN_SECONDS, drain_timeout_within
+
+
+def test_default_drain_and_commit_fit_in_the_rebalance_timeout():
+    drain_timeout = settings.KAFKA_REBALANCE_DRAIN_TIMEOUT_SECONDS
+
+    assert drain_timeout_within(drain_timeout, settings.KAFKA_REBALANCE_TIMEOUT_SECONDS) == drain_timeout
+    assert drain_timeout + DRAIN_COMMIT_MARGIN_SECONDS <= settings.KAFKA_REBALANCE_TIMEOUT_SECONDS
+
+
+@pytest.mark.parametrize("drain_timeout", [25.0, 0.0])
+def test_drain_timeout_is_clamped_below_the_rebalance_timeout(drain_timeout):
+    assert drain_timeout_within(drain_timeout, 30.0) == 30.0 - DRAIN_COMMIT_MARGIN_SECONDS
+
+
+def test_rebalance_timeout_without_room_for_the_commit_is_rejected():
+    with pytest.raises(ValueError):
+        drain_timeout_within(5.0, DRAIN_COMMIT_MARGIN_SECONDS)